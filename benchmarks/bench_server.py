@@ -0,0 +1,128 @@
+"""
+HTTP Service Load Benchmark
+
+Starts server.py in a subprocess and drives it with concurrent keep-alive
+clients, each playing one chat session. Reports throughput and latency
+percentiles for the chosen endpoint.
+
+Usage:
+    python -m benchmarks.bench_server [--clients 32] [--requests 50] [--workers 0]
+                                      [--endpoint chat|statement]
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MESSAGES = [
+    "Hi, my order has not arrived yet",
+    "This is really frustrating, I paid for express shipping!",
+    "Thanks, that actually helps a lot",
+    "Can you check the status again?",
+    "The replacement works great, I love it",
+    "ok",
+    "I'm not happy with how long this took, but the support was kind",
+    "What are your opening hours?",
+]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def _client(port: int, session: int, requests: int, endpoint: str,
+                  latencies: List[float]):
+    """One keep-alive connection sending sequential requests"""
+    rng = random.Random(session)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(requests):
+            # A ticket number keeps messages distinct so the statement cache cannot help
+            message = f"{rng.choice(MESSAGES)} (ticket {rng.randrange(10 ** 6)})"
+            if endpoint == "chat":
+                path = "/chat"
+                payload = {"session_id": f"bench-{session}", "message": message}
+            else:
+                path = "/analyze/statement"
+                payload = {"text": message}
+            body = json.dumps(payload).encode()
+
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def drive(port: int, clients: int, requests: int, endpoint: str) -> Dict[str, float]:
+    """Run all clients concurrently and summarize the latencies"""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(port, session, requests, endpoint, latencies) for session in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load against server.py")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent sessions")
+    parser.add_argument("--requests", type=int, default=50, help="requests per session")
+    parser.add_argument("--workers", type=int, default=0, help="server scoring processes")
+    parser.add_argument("--endpoint", default="chat", choices=["chat", "statement"])
+    args = parser.parse_args(argv)
+
+    server = subprocess.Popen(
+        [sys.executable, "server.py", "--port", "0", "--workers", str(args.workers)],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        port = int(server.stdout.readline().rsplit(":", 1)[1])
+        stats = asyncio.run(drive(port, args.clients, args.requests, args.endpoint))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.endpoint}: {args.clients} clients x {args.requests} requests, "
+          f"server workers={args.workers}")
+    print(f"  throughput {stats['throughput_rps']:8.1f} req/s")
+    print(f"  latency    p50 {stats['p50_ms']:.1f} ms   p95 {stats['p95_ms']:.1f} ms   "
+          f"p99 {stats['p99_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
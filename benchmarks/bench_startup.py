@@ -0,0 +1,91 @@
+"""
+Startup Benchmark
+
+Measures, in fresh interpreter processes, how long it takes from importing
+sentiment_analyzer to the first SentimentResult:
+- import: importing the module
+- construct: SentimentAnalyzer(...)
+- prepare: loading lexicons and engine modules
+- first_result: the first analyze_statement call
+
+Usage:
+    python -m benchmarks.bench_startup [--runs N] [--engine both|vader|textblob]
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import sentiment_analyzer
+imported = time.perf_counter()
+analyzer = sentiment_analyzer.SentimentAnalyzer(engine={engine!r})
+constructed = time.perf_counter()
+analyzer.prepare()
+prepared = time.perf_counter()
+analyzer.analyze_statement("The support team was really helpful, thanks!")
+first = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "construct": constructed - imported,
+    "prepare": prepared - constructed,
+    "first_result": first - prepared,
+    "total": first - start,
+}}))
+"""
+
+
+def measure_startup(engine: str = "both") -> Dict[str, float]:
+    """
+    Time one cold start in a fresh interpreter
+
+    Args:
+        engine: Engine mode passed to SentimentAnalyzer
+
+    Returns:
+        Seconds spent in each startup stage
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(engine=engine)],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int, engine: str) -> Dict[str, Dict[str, float]]:
+    """Repeat measure_startup and summarize each stage by median and minimum"""
+    samples: List[Dict[str, float]] = [measure_startup(engine) for _ in range(runs)]
+    return {
+        stage: {
+            "median": statistics.median(sample[stage] for sample in samples),
+            "min": min(sample[stage] for sample in samples),
+        }
+        for stage in samples[0]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-to-first-result startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument("--engine", default="both", choices=["both", "vader", "textblob"])
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.engine)
+    print(f"Startup ({args.engine}, {args.runs} runs)")
+    for stage, stats in results.items():
+        print(f"  {stage:<13} median {stats['median'] * 1000:8.1f} ms   min {stats['min'] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
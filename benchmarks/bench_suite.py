@@ -0,0 +1,282 @@
+"""
+Hot Path Benchmark Suite
+
+Times the analyzer, chatbot and export hot paths on synthetic corpora and
+stores the numbers in a JSON results file that later runs are compared to:
+- statement_short / statement_long: analyze_statement, one message per op
+- batch_short: analyze_batch over 1000 messages
+- conversation_N: analyze_conversation with N user turns
+- trend_N: _analyze_trend over N results
+- export_indented_N / export_compact_N / export_lines_N: export_results to
+  memory, with the default indent (what the REPL export command writes),
+  compact and as JSON Lines
+- generate_response: response selection
+- chat_turn: one end-to-end turn (history, scoring, aggregate, reply)
+
+Each case reports throughput (items/s), p50/p99 latency per op and the
+peak traced memory of one op (measured in a separate, untimed pass).
+The analyzer keeps no result or preprocessing caches, so the numbers are
+cold-cache even where a case repeats its inputs.
+
+Usage:
+    python -m benchmarks.bench_suite run [--sizes 10,1000,10000] [--cases REGEX]
+                                         [--output results.json]
+    python -m benchmarks.bench_suite compare BASELINE CURRENT [--threshold 0.10]
+
+compare exits with status 1 when any case regressed by more than the
+threshold in p50 latency, throughput or peak memory.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import io
+import itertools
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_server import percentile
+from benchmarks.corpus import make_conversation, make_messages
+
+DEFAULT_SIZES = (10, 1000, 10000)
+
+
+@dataclass
+class BenchCase:
+    """A named operation processing `items` items per call"""
+    name: str
+    items: int
+    setup: Callable[[], Callable[[], object]]
+
+
+def build_cases(sizes: List[int], engine: str) -> List[BenchCase]:
+    """Create every benchmark case for the given conversation sizes"""
+    from chatbot import Chatbot
+    from sentiment_analyzer import (
+        ConversationAggregator, SentimentAnalyzer, SentimentResult, export_results
+    )
+
+    # No result or preprocessing caches, so repeated inputs measure cold scoring
+    analyzer = SentimentAnalyzer(engine=engine, cache_size=0, preprocess_cache_size=0).prepare()
+
+    def statements(length: str, count: int):
+        def setup():
+            messages = itertools.cycle(make_messages(count, length))
+            return lambda: analyzer.analyze_statement(next(messages))
+        return setup
+
+    def batch():
+        messages = make_messages(1000, "short", seed=1)
+        return lambda: analyzer.analyze_batch(messages, workers=1)
+
+    def conversation(turns: int):
+        def setup():
+            messages = make_conversation(turns)
+            return lambda: analyzer.analyze_conversation(messages)
+        return setup
+
+    def fake_results(count: int) -> List[SentimentResult]:
+        scores = [((index * 7919) % 200 - 100) / 100 for index in range(count)]
+        return [
+            SentimentResult(f"message {index}", analyzer._label_for(score), score, abs(score),
+                            {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": score}, score, 0.5)
+            for index, score in enumerate(scores)
+        ]
+
+    def trend(count: int):
+        def setup():
+            results = fake_results(count)
+            return lambda: analyzer._analyze_trend(results)
+        return setup
+
+    def export(count: int, indent: Optional[int], lines: bool):
+        def setup():
+            aggregator = ConversationAggregator(analyzer)
+            for result in fake_results(count):
+                aggregator.add_result(result)
+            analysis = aggregator.snapshot()
+            return lambda: export_results(analysis, io.StringIO(), indent=indent, lines=lines)
+        return setup
+
+    def responses():
+        chatbot = Chatbot(seed=0)
+        inputs = itertools.cycle(zip(make_messages(500, "short", seed=2),
+                                     itertools.cycle(["POSITIVE", "NEGATIVE", "NEUTRAL", None])))
+
+        def op():
+            text, label = next(inputs)
+            return chatbot.generate_response(text, label)
+        return op
+
+    def chat_turn():
+        chatbot = Chatbot(seed=0)
+        conversation = ConversationAggregator(analyzer)
+        inputs = itertools.cycle(make_messages(500, "short", seed=3))
+
+        def op():
+            text = next(inputs)
+            chatbot.add_message("user", text)
+            result = conversation.add_message({"role": "user", "content": text})
+            reply = chatbot.generate_response(text, result.label.upper())
+            chatbot.add_message("assistant", reply)
+        return op
+
+    cases = [
+        BenchCase("statement_short", 1, statements("short", 2000)),
+        BenchCase("statement_long", 1, statements("long", 200)),
+        BenchCase("batch_short", 1000, batch),
+    ]
+    for size in sizes:
+        cases.append(BenchCase(f"conversation_{size}", size, conversation(size)))
+    for size in sizes:
+        cases.append(BenchCase(f"trend_{size}", size, trend(size)))
+    for size in sizes:
+        cases.append(BenchCase(f"export_indented_{size}", size, export(size, 2, False)))
+        cases.append(BenchCase(f"export_compact_{size}", size, export(size, None, False)))
+        cases.append(BenchCase(f"export_lines_{size}", size, export(size, None, True)))
+    cases.append(BenchCase("generate_response", 1, responses))
+    cases.append(BenchCase("chat_turn", 1, chat_turn))
+    return cases
+
+
+def measure(case: BenchCase, min_time: float = 1.0, min_runs: int = 5,
+            max_runs: int = 10000) -> Dict[str, float]:
+    """
+    Time a case until min_time has passed and at least min_runs ops ran
+
+    Ops slower than min_time are run once. Peak memory is traced in a
+    separate op so that tracing does not distort the timings.
+    """
+    op = case.setup()
+    op()  # warm up
+
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < max_runs:
+        start = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time and (len(samples) >= min_runs or samples[0] >= min_time):
+            break
+
+    tracemalloc.start()
+    op()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(samples)
+    return {
+        "ops": len(samples),
+        "items_per_op": case.items,
+        "throughput": case.items * len(samples) / total,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run(sizes: List[int], engine: str = "both", pattern: Optional[str] = None,
+        min_time: float = 1.0, log=sys.stderr) -> Dict:
+    """Run the selected cases and return the results document"""
+    results = {}
+    for case in build_cases(sizes, engine):
+        if pattern and not re.search(pattern, case.name):
+            continue
+        results[case.name] = stats = measure(case, min_time=min_time)
+        print(f"  {case.name:<24} {stats['throughput']:12.1f} items/s   "
+              f"p50 {stats['p50_ms']:9.3f} ms   p99 {stats['p99_ms']:9.3f} ms   "
+              f"peak {stats['peak_kib']:9.1f} KiB", file=log)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": engine,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """
+    Find cases that got slower or bigger than the baseline
+
+    Args:
+        baseline: Results document of the reference run
+        current: Results document of the new run
+        threshold: Tolerated relative change (0.10 = 10%)
+
+    Returns:
+        One description per regression; cases and metrics missing from
+        either document, and zero baseline metrics, are not compared
+    """
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric, key, higher_is_better in (("p50 latency", "p50_ms", False),
+                                              ("throughput", "throughput", True),
+                                              ("peak memory", "peak_kib", False)):
+            before, after = old.get(key), new.get(key)
+            if not before or after is None:
+                continue
+            change = 1 - after / before if higher_is_better else after / before - 1
+            if change > threshold:
+                regressions.append(f"{name}: {metric} worse by {change:.0%}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SentimentBot hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save the results")
+    run_parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                            help="conversation sizes in user turns (e.g. 10,1000,100000)")
+    run_parser.add_argument("--cases", default=None, help="regex selecting case names")
+    run_parser.add_argument("--engine", default="both", choices=["both", "vader", "textblob"])
+    run_parser.add_argument("--min-time", type=float, default=1.0,
+                            help="seconds spent timing each case (default: 1.0)")
+    run_parser.add_argument("--output", default="bench_results.json",
+                            help="results file (default: bench_results.json)")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="tolerated relative change (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+        document = run(sizes, args.engine, args.cases, args.min_time)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
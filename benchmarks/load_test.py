@@ -0,0 +1,606 @@
+"""
+Multi-Session Load Test
+
+Drives many simultaneous chat sessions through the service and reports
+how it holds up, for sizing hardware:
+- traffic is synthesized from a message-length and sentiment mix, or
+  replayed from recorded histories (JSON Lines conversation or message
+  records, and any session file the fleet analytics job reads)
+- each session sends its user messages as /chat turns, with an optional
+  think time, and every N turns posts its history to
+  /analyze/conversation
+- the target is a SentimentServer in this process (no sockets), a
+  server.py subprocess started for the run, or a server already running
+  locally
+
+The report holds throughput, p50/p95/p99 latency of turns and analyses,
+and CPU and RSS of the serving process tree sampled over time (read from
+/proc, so resource figures need Linux). Nothing outside this machine is
+contacted.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 200] [--concurrency 32] [--turns 5-20]
+                                   [--lengths short=0.7,medium=0.25,long=0.05]
+                                   [--sentiment positive=0.3,negative=0.3,neutral=0.3,mixed=0.1]
+                                   [--replay PATH ...] [--analysis-every 5] [--think-time 0]
+                                   [--target inprocess|spawn] [--url URL --pid PID]
+                                   [--workers 0] [--output report.json]
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.bench_server import REPO_ROOT, percentile
+from benchmarks.corpus import make_message
+
+# Words per message for each length class
+LENGTHS = {"short": (3, 12), "medium": (15, 40), "long": (150, 300)}
+
+# Probability of a positive, negative or modifier word for each message tone
+TONES = {
+    "positive": (0.35, 0.04, 0.10),
+    "negative": (0.04, 0.35, 0.10),
+    "neutral": (0.03, 0.03, 0.05),
+    "mixed": (0.15, 0.15, 0.10),
+}
+
+
+@dataclass
+class SessionScript:
+    """The user messages one simulated session sends, in order"""
+    session_id: str
+    messages: List[str]
+
+
+@dataclass
+class TrafficMix:
+    """Shape of synthesized traffic"""
+    lengths: Dict[str, float] = field(
+        default_factory=lambda: {"short": 0.7, "medium": 0.25, "long": 0.05})
+    sentiment: Dict[str, float] = field(
+        default_factory=lambda: {"positive": 0.3, "negative": 0.3, "neutral": 0.3, "mixed": 0.1})
+    turns: Tuple[int, int] = (5, 20)
+
+    def __post_init__(self):
+        for name, weights, known in (("length", self.lengths, LENGTHS),
+                                     ("sentiment", self.sentiment, TONES)):
+            unknown = set(weights) - set(known)
+            if unknown:
+                raise ValueError(f"Unknown {name} classes: {', '.join(sorted(unknown))}")
+            if any(weight < 0 for weight in weights.values()) or not sum(weights.values()):
+                raise ValueError(f"{name.capitalize()} weights must be non-negative "
+                                 "and not all zero")
+        low, high = self.turns
+        if low < 1 or high < low:
+            raise ValueError("turns must be a range of at least 1")
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse 'name=weight,name=weight' into a dictionary"""
+    weights = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected name=weight, got {item!r}")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def synthesize(sessions: int, mix: TrafficMix, seed: int = 0) -> List[SessionScript]:
+    """
+    Generate session scripts from a traffic mix
+
+    Args:
+        sessions: Number of sessions
+        mix: Length, tone and turn-count distribution
+        seed: Random seed
+
+    Returns:
+        One script per session
+    """
+    rng = random.Random(seed)
+    lengths, length_weights = zip(*mix.lengths.items())
+    tones, tone_weights = zip(*mix.sentiment.items())
+    scripts = []
+    for index in range(sessions):
+        messages = []
+        for _ in range(rng.randint(*mix.turns)):
+            low, high = LENGTHS[rng.choices(lengths, length_weights)[0]]
+            tone = TONES[rng.choices(tones, tone_weights)[0]]
+            messages.append(make_message(rng, rng.randint(low, high), tone))
+        scripts.append(SessionScript(f"load-{index}", messages))
+    return scripts
+
+
+def _user_texts(messages: Iterable) -> List[str]:
+    """User message contents of a recorded history"""
+    return [
+        message["content"].strip() for message in messages
+        if isinstance(message, dict) and message.get("role", "user") == "user"
+        and isinstance(message.get("content"), str) and message["content"].strip()
+    ]
+
+
+def load_recorded(paths: Iterable[str]) -> List[SessionScript]:
+    """
+    Read recorded histories to replay
+
+    Whole-file sessions (chat histories, saved chatbots, exports) become
+    one session each. Other JSON Lines files may hold conversation records
+    ({"messages": [...]}, one session per line) or message records
+    ({"session_id": ..., "content" or "text": ...}, grouped by session_id,
+    or one session per file without it). Sessions without an ID of their
+    own are named by the file's path relative to the common root of the
+    inputs.
+
+    Args:
+        paths: Files, directories or globs
+
+    Returns:
+        Sessions in file order
+
+    Raises:
+        ValueError: If no replayable session was found
+    """
+    from fleet_analytics import _open_session_file, find_session_files, load_session
+
+    files = find_session_files(paths)
+    # Name sessions by their path below the common input root, so that
+    # same-named files in different directories stay separate sessions
+    absolute = [os.path.abspath(path) for path in files]
+    if len(absolute) > 1:
+        root = os.path.commonpath(absolute)
+    else:
+        root = os.path.dirname(absolute[0]) if absolute else ""
+    scripts: List[SessionScript] = []
+    for path, full_path in zip(files, absolute):
+        name = os.path.relpath(full_path, root).replace(os.sep, "/")
+        try:
+            kind, data = load_session(path)
+        except ValueError:
+            kind, data = None, None
+        if kind == "messages":
+            scripts.append(SessionScript(name, _user_texts(data)))
+            continue
+        if kind == "analysis":
+            texts = [entry.get("text", "") for entry in data.get("message_sentiments", [])]
+            scripts.append(SessionScript(name, [text for text in texts if text.strip()]))
+            continue
+
+        grouped: Dict[str, List[str]] = {}
+        with _open_session_file(path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict) and isinstance(record.get("messages"), list):
+                    session_id = str(record.get("session_id", record.get("id", f"{name}:{number}")))
+                    scripts.append(SessionScript(session_id, _user_texts(record["messages"])))
+                    continue
+                if isinstance(record, str):
+                    record = {"content": record}
+                if not isinstance(record, dict):
+                    raise ValueError(f"{path}:{number}: expected a JSON object or string")
+                text = record.get("content", record.get("text"))
+                if record.get("role", "user") != "user" or not isinstance(text, str):
+                    continue
+                grouped.setdefault(str(record.get("session_id", name)), []).append(text)
+        scripts.extend(SessionScript(session_id, texts) for session_id, texts in grouped.items())
+
+    scripts = [script for script in scripts if script.messages]
+    if not scripts:
+        raise ValueError("No user messages found in the recorded histories")
+    return scripts
+
+
+# TARGETS
+
+class TargetError(Exception):
+    """A request the target answered with an error"""
+
+
+class InProcessTarget:
+    """Sends requests straight to a SentimentServer's router, without sockets"""
+
+    def __init__(self, server):
+        self.server = server
+
+    async def open(self) -> "InProcessTarget":
+        return self
+
+    async def request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        from server import HTTPError
+
+        body = json.dumps(payload).encode() if payload is not None else b""
+        try:
+            return await self.server.dispatch(method, path, body)
+        except HTTPError as e:
+            raise TargetError(f"{e.status}: {e}") from None
+        except ValueError as e:
+            raise TargetError(f"400: {e}") from None
+
+    async def close(self):
+        pass
+
+
+class HttpTarget:
+    """Keep-alive HTTP/1.1 connections to a running server, one per session"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    async def open(self) -> "_HttpConnection":
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return _HttpConnection(reader, writer)
+
+
+class _HttpConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise TargetError("Connection closed by server")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        data = json.loads(await self.reader.readexactly(length)) if length else {}
+        if status != 200:
+            raise TargetError(f"{status}: {data.get('error', '')}")
+        return data
+
+    async def close(self):
+        self.writer.close()
+
+
+# RESOURCE SAMPLING
+
+class ResourceSampler:
+    """
+    Samples CPU and RSS of a process and its descendants on a thread
+
+    CPU is reported as a percentage of one core over each interval, so a
+    busy process tree on several cores exceeds 100.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self.available = os.path.exists(f"/proc/{pid}/stat")
+        self._ticks = os.sysconf("SC_CLK_TCK") if self.available else 100
+        self._page = os.sysconf("SC_PAGE_SIZE") if self.available else 4096
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_tree(self) -> Tuple[float, int]:
+        """CPU seconds and resident bytes of the process tree"""
+        stats = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # The command name may contain spaces; fields follow its ')'
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            stats[int(entry)] = (int(fields[1]), int(fields[11]) + int(fields[12]),
+                                 int(fields[21]))
+        tree = {self.pid}
+        # Parents may have larger pids than their children, so repeat until stable
+        while True:
+            children = {pid for pid, (ppid, _, _) in stats.items()
+                        if ppid in tree and pid not in tree}
+            if not children:
+                break
+            tree |= children
+        ticks = sum(stats[pid][1] for pid in tree if pid in stats)
+        pages = sum(stats[pid][2] for pid in tree if pid in stats)
+        return ticks / self._ticks, pages * self._page
+
+    def _run(self):
+        started = time.perf_counter()
+        last_time, (last_cpu, _) = started, self._read_tree()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            cpu, rss = self._read_tree()
+            self.samples.append({
+                "t": round(now - started, 3),
+                # Exited children take their CPU time with them
+                "cpu_percent": max(0.0, (cpu - last_cpu) / (now - last_time) * 100),
+                "rss_mib": rss / 2 ** 20,
+            })
+            last_time, last_cpu = now, cpu
+
+    def start(self):
+        if self.available:
+            self._thread = threading.Thread(target=self._run, name="load-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> Dict:
+        if not self.samples:
+            return {"available": self.available, "samples": []}
+        cpu = [sample["cpu_percent"] for sample in self.samples]
+        return {
+            "available": True,
+            "cpu_percent_mean": sum(cpu) / len(cpu),
+            "cpu_percent_max": max(cpu),
+            "rss_mib_peak": max(sample["rss_mib"] for sample in self.samples),
+            "samples": self.samples,
+        }
+
+
+# DRIVER
+
+def _latency_stats(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+async def _play(target, script: SessionScript, analysis_every: int, think_time: float,
+                rng: random.Random, turns: List[float], analyses: List[float], errors: List[str]):
+    """Play one session script on its own connection"""
+    connection = await target.open()
+    history: List[Dict[str, str]] = []
+    try:
+        for turn, message in enumerate(script.messages, 1):
+            if think_time > 0:
+                await asyncio.sleep(rng.expovariate(1 / think_time))
+            start = time.perf_counter()
+            try:
+                reply = await connection.request(
+                    "POST", "/chat", {"session_id": script.session_id, "message": message})
+            except TargetError as e:
+                errors.append(f"chat: {e}")
+                continue
+            turns.append(time.perf_counter() - start)
+            history.append({"role": "user", "content": message})
+            history.append({"role": "assistant", "content": reply["response"]})
+
+            if analysis_every and turn % analysis_every == 0:
+                start = time.perf_counter()
+                try:
+                    await connection.request("POST", "/analyze/conversation",
+                                             {"messages": history})
+                except TargetError as e:
+                    errors.append(f"analysis: {e}")
+                    continue
+                analyses.append(time.perf_counter() - start)
+    finally:
+        await connection.close()
+
+
+async def drive(target, scripts: List[SessionScript], concurrency: int = 32,
+                analysis_every: int = 5, think_time: float = 0.0,
+                seed: int = 0) -> Dict:
+    """
+    Play every session script, at most `concurrency` at a time
+
+    Args:
+        target: InProcessTarget or HttpTarget
+        scripts: Sessions to play
+        concurrency: Sessions in flight at once
+        analysis_every: Turns between conversation analyses (0 disables)
+        think_time: Mean pause before each turn in seconds (exponential)
+        seed: Random seed for think times
+
+    Returns:
+        Counts, throughput and latency percentiles
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    pending = iter(scripts)
+    turns: List[float] = []
+    analyses: List[float] = []
+    errors: List[str] = []
+
+    async def worker(index: int):
+        rng = random.Random(seed * 1000003 + index)
+        for script in pending:
+            await _play(target, script, analysis_every, think_time, rng,
+                        turns, analyses, errors)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(index) for index in range(min(concurrency, len(scripts)))])
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": len(scripts),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "turns_per_second": len(turns) / elapsed,
+        "requests_per_second": (len(turns) + len(analyses)) / elapsed,
+        "turn_latency": _latency_stats(turns),
+        "analysis_latency": _latency_stats(analyses),
+        "errors": len(errors),
+        "error_examples": errors[:5],
+    }
+
+
+async def run_in_process(scripts: List[SessionScript], workers: int = 0, sample_interval: float = 0.5,
+                         **options) -> Dict:
+    """
+    Load a SentimentServer created in this process
+
+    Args:
+        scripts: Sessions to play
+        workers: Scoring processes of the server (0: thread pool)
+        sample_interval: Seconds between resource samples
+        options: Passed to drive()
+
+    Returns:
+        drive() results plus the resource summary
+    """
+    from sentiment_analyzer import SentimentAnalyzer
+    from server import SentimentServer
+
+    server = SentimentServer(SentimentAnalyzer(cache_size=10000, long_text_threshold=20000),
+                             workers=workers)
+    server.analyzer.prepare()
+    await server.score(["warm up"])
+    sampler = ResourceSampler(os.getpid(), sample_interval)
+    sampler.start()
+    try:
+        report = await drive(InProcessTarget(server), scripts, **options)
+    finally:
+        sampler.stop()
+        await server.close()
+    report["resources"] = sampler.summary()
+    return report
+
+
+async def run_over_http(scripts: List[SessionScript], host: str, port: int,
+                        pid: Optional[int] = None, sample_interval: float = 0.5,
+                        **options) -> Dict:
+    """Load a server listening on host:port, sampling pid when given"""
+    sampler = ResourceSampler(pid, sample_interval) if pid else None
+    if sampler is not None:
+        sampler.start()
+    try:
+        report = await drive(HttpTarget(host, port), scripts, **options)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+    report["resources"] = sampler.summary() if sampler else {"available": False, "samples": []}
+    return report
+
+
+def print_report(report: Dict, out=sys.stdout):
+    """Human-readable summary of a report"""
+    print(f"{report['target']}: {report['sessions']} sessions, "
+          f"concurrency {report['concurrency']}, {report['seconds']:.1f} s", file=out)
+    print(f"  throughput  {report['turns_per_second']:8.1f} turns/s   "
+          f"{report['requests_per_second']:8.1f} req/s", file=out)
+    for name in ("turn_latency", "analysis_latency"):
+        stats = report[name]
+        if stats["count"]:
+            print(f"  {name.split('_')[0]:<9}   p50 {stats['p50_ms']:8.1f} ms   "
+                  f"p95 {stats['p95_ms']:8.1f} ms   p99 {stats['p99_ms']:8.1f} ms   "
+                  f"({stats['count']})", file=out)
+    resources = report["resources"]
+    if resources.get("samples"):
+        print(f"  cpu         mean {resources['cpu_percent_mean']:.0f}%   "
+              f"max {resources['cpu_percent_max']:.0f}%", file=out)
+        print(f"  rss         peak {resources['rss_mib_peak']:.1f} MiB", file=out)
+    if report["errors"]:
+        print(f"  errors      {report['errors']} (e.g. {report['error_examples'][0]})", file=out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test")
+    parser.add_argument("--sessions", type=int, default=200,
+                        help="synthesized sessions (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="sessions in flight at once (default: 32)")
+    parser.add_argument("--turns", default="5-20", help="user turns per session, MIN-MAX")
+    parser.add_argument("--lengths", default="short=0.7,medium=0.25,long=0.05",
+                        help=f"message length mix over {', '.join(LENGTHS)}")
+    parser.add_argument("--sentiment", default="positive=0.3,negative=0.3,neutral=0.3,mixed=0.1",
+                        help=f"message tone mix over {', '.join(TONES)}")
+    parser.add_argument("--replay", nargs="+", default=None,
+                        help="recorded histories to replay instead of synthesizing")
+    parser.add_argument("--analysis-every", type=int, default=5,
+                        help="turns between /analyze/conversation calls (0 disables)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean seconds between a session's turns (default: 0)")
+    parser.add_argument("--target", default="inprocess", choices=["inprocess", "spawn"],
+                        help="server in this process, or server.py started for the run")
+    parser.add_argument("--url", default=None,
+                        help="load a server already running locally instead")
+    parser.add_argument("--pid", type=int, default=None,
+                        help="process to sample when using --url")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="server scoring processes (default: 0)")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="seconds between resource samples (default: 0.5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.replay:
+            scripts = load_recorded(args.replay)
+        else:
+            low, _, high = args.turns.partition("-")
+            mix = TrafficMix(parse_weights(args.lengths), parse_weights(args.sentiment),
+                             (int(low), int(high or low)))
+            scripts = synthesize(args.sessions, mix, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    options = {"concurrency": args.concurrency, "analysis_every": args.analysis_every,
+               "think_time": args.think_time, "seed": args.seed,
+               "sample_interval": args.interval}
+    if args.url:
+        url = urlsplit(args.url if "//" in args.url else f"//{args.url}")
+        report = asyncio.run(run_over_http(scripts, url.hostname or "127.0.0.1",
+                                           url.port or 80, args.pid, **options))
+        target = args.url
+    elif args.target == "spawn":
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--port", "0", "--workers", str(args.workers)],
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            port = int(server.stdout.readline().rsplit(":", 1)[1])
+            report = asyncio.run(run_over_http(scripts, "127.0.0.1", port, server.pid, **options))
+        finally:
+            server.terminate()
+            server.wait()
+        target = f"server.py (workers={args.workers})"
+    else:
+        report = asyncio.run(run_in_process(scripts, args.workers, **options))
+        target = f"in-process (workers={args.workers})"
+
+    report["target"] = target
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,495 @@
 
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
 import random
+import re
+import time
+from array import array
+from bisect import bisect_left
 from datetime import datetime
 
+# Known role names; messages store the index into this fixed table
+_ROLE_NAMES: Tuple[str, ...] = ('user', 'assistant', 'system')
+_ROLE_CODES: Dict[str, int] = {name: code for code, name in enumerate(_ROLE_NAMES)}
+_USER = _ROLE_CODES['user']
+
+
+def _role_code(role: str) -> int:
+    """Return the code of a known role, rejecting any other role"""
+    code = _ROLE_CODES.get(role)
+    if code is None:
+        raise ValueError(f"Unknown message role: {role!r}")
+    return code
+
+
+def _timestamp_ns(value: str) -> int:
+    """Convert an isoformat timestamp to integer nanoseconds since the epoch"""
+    moment = datetime.fromisoformat(value)
+    seconds = int(moment.replace(microsecond=0).timestamp())
+    return seconds * 1_000_000_000 + moment.microsecond * 1000
+
+
+def _isoformat(timestamp_ns: int) -> str:
+    """Convert integer nanoseconds since the epoch to an isoformat timestamp"""
+    seconds, nanoseconds = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000).isoformat()
+
+
+class ConversationHistory:
+    """
+    Compact message store with a list-of-dicts compatible view
+
+    Messages live in parallel arrays: interned role codes, content strings
+    and integer nanosecond timestamps. The positions of user messages and
+    the per-role counts are maintained on insert, so the latest user
+    message and the role totals are available in O(1).
+
+    Indexing or iterating yields {'role', 'content', 'timestamp'} dicts
+    built on demand, as the old list-based history stored them.
+
+    With max_messages the history rolls: only the last max_messages
+    messages are visible, and older ones are reduced to the role counts
+    and the number of rolled-up messages. Up to half as many again are
+    kept in storage, so dropping them is one slice per max_messages / 2
+    messages instead of a shift per message. Positions passed to and
+    returned from add(), content() and timestamp_ns() count every
+    message of the session, rolled up or not. An attached
+    rolled_up_sentiment aggregator receives each user message as it rolls
+    out of view, so it holds the sentiment of exactly the rolled-up part.
+    """
+
+    __slots__ = ('_roles', '_contents', '_timestamps', '_user_positions', '_role_counts',
+                 '_max_messages', '_dropped', '_rolled_up_sentiment')
+
+    def __init__(self, messages: Iterable[Dict] = (), max_messages: Optional[int] = None,
+                 rolled_up: Optional[Dict] = None, rolled_up_sentiment=None):
+        """
+        Args:
+            messages: Initial messages in the dict form
+            max_messages: Visible messages in rolling mode (None keeps all)
+            rolled_up: Summary of earlier messages that are not in messages,
+                as returned by rolled_up_summary()
+            rolled_up_sentiment: Empty ConversationAggregator (ideally with
+                max_messages set too) that scores each user message as it
+                rolls out of view
+        """
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        self._roles = array('H')
+        self._contents: List[str] = []
+        self._timestamps = array('q')
+        self._user_positions = array('q')
+        self._role_counts: Dict[str, int] = {}
+        self._max_messages = max_messages
+        # Messages removed from the front of the arrays
+        self._dropped = 0
+        self._rolled_up_sentiment = rolled_up_sentiment
+        if rolled_up:
+            self._dropped = rolled_up['messages']
+            self._role_counts.update(rolled_up['role_counts'])
+        for message in messages:
+            self.append(message)
+
+    def add(self, role: str, content: str, timestamp_ns: Optional[int] = None) -> int:
+        """
+        Store a message
+
+        Args:
+            role: Message role ('user', 'assistant' or 'system')
+            content: Message text
+            timestamp_ns: Nanoseconds since the epoch (default: now, to the
+                microsecond so that it survives the isoformat view)
+
+        Returns:
+            Position of the new message in the session
+
+        Raises:
+            ValueError: If the role is not one of the known roles
+        """
+        position = self._dropped + len(self._contents)
+        code = _role_code(role)
+        self._roles.append(code)
+        self._contents.append(content)
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns() // 1000 * 1000
+        self._timestamps.append(timestamp_ns)
+        if code == _USER:
+            self._user_positions.append(position)
+        self._role_counts[role] = self._role_counts.get(role, 0) + 1
+        if self._max_messages is not None:
+            hidden = len(self._contents) - self._max_messages - 1
+            if (hidden >= 0 and self._rolled_up_sentiment is not None
+                    and self._roles[hidden] == _USER):
+                self._rolled_up_sentiment.add_message(self._message(hidden))
+            if len(self._contents) >= self._max_messages + max(1, self._max_messages // 2):
+                self._trim()
+        return position
+
+    def append(self, message: Dict):
+        """Store a message given in the dict form"""
+        timestamp = message.get('timestamp')
+        self.add(message['role'], message['content'],
+                 _timestamp_ns(timestamp) if timestamp else None)
+
+    @property
+    def max_messages(self) -> Optional[int]:
+        """Visible messages in rolling mode, None if the history keeps all"""
+        return self._max_messages
+
+    @property
+    def total_messages(self) -> int:
+        """Messages added over the whole session, including rolled-up ones"""
+        return self._dropped + len(self._contents)
+
+    @property
+    def rolled_up(self) -> int:
+        """Messages no longer visible"""
+        return self.total_messages - len(self)
+
+    @property
+    def rolled_up_sentiment(self):
+        """Aggregator holding the sentiment of the rolled-up user messages, if attached"""
+        return self._rolled_up_sentiment
+
+    def rolled_up_summary(self) -> Dict:
+        """Number and role counts of the rolled-up messages"""
+        role_counts = dict(self._role_counts)
+        for position in range(self._start(), len(self._contents)):
+            role_counts[_ROLE_NAMES[self._roles[position]]] -= 1
+        return {'messages': self.rolled_up,
+                'role_counts': {role: count for role, count in role_counts.items() if count}}
+
+    def role_count(self, role: str) -> int:
+        """Number of messages with the given role, rolled-up ones included"""
+        return self._role_counts.get(role, 0)
+
+    def last_user_content(self) -> Optional[str]:
+        """Content of the most recent visible user message, if any"""
+        positions = self._visible_user_positions()
+        if not positions:
+            return None
+        return self._contents[positions[-1] - self._dropped]
+
+    def user_positions(self) -> List[int]:
+        """Positions of all visible user messages, in order"""
+        return self._visible_user_positions().tolist()
+
+    def content(self, position: int) -> str:
+        """Content of the message at a position"""
+        return self._contents[self._index(position)]
+
+    def user_contents(self) -> List[str]:
+        """Contents of all visible user messages, in order"""
+        contents = self._contents
+        dropped = self._dropped
+        return [contents[position - dropped] for position in self._visible_user_positions()]
+
+    def timestamp_ns(self, position: int) -> int:
+        """Integer timestamp of the message at a position"""
+        return self._timestamps[self._index(position)]
+
+    def clear(self):
+        """Remove all messages"""
+        if self._rolled_up_sentiment is not None:
+            self._rolled_up_sentiment.reset()
+        self.__init__(max_messages=self._max_messages,
+                      rolled_up_sentiment=self._rolled_up_sentiment)
+
+    def __len__(self) -> int:
+        return len(self._contents) - self._start()
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        start = self._start()
+        if isinstance(index, slice):
+            return [self._message(start + position)
+                    for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._message(start + index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self._message(position) for position in range(self._start(), len(self._contents)))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ConversationHistory):
+            other = list(other)
+        return isinstance(other, list) and list(self) == other
+
+    def _start(self) -> int:
+        """Array index of the first visible message"""
+        if self._max_messages is None:
+            return 0
+        return max(0, len(self._contents) - self._max_messages)
+
+    def _index(self, position: int) -> int:
+        """Array index of a session position (negative positions count from the end)"""
+        if position < 0:
+            index = len(self._contents) + position
+            if index < self._start():
+                raise IndexError("history index out of range")
+            return index
+        index = position - self._dropped
+        if index < self._start():
+            raise IndexError("message has been rolled up")
+        return index
+
+    def _visible_user_positions(self) -> array:
+        first = bisect_left(self._user_positions, self._dropped + self._start())
+        return self._user_positions[first:] if first else self._user_positions
+
+    def _trim(self):
+        """Drop the stored messages that are no longer visible"""
+        drop = self._start()
+        del self._roles[:drop]
+        del self._contents[:drop]
+        del self._timestamps[:drop]
+        self._dropped += drop
+        del self._user_positions[:bisect_left(self._user_positions, self._dropped)]
+
+    def _message(self, position: int) -> Dict:
+        return {
+            'role': _ROLE_NAMES[self._roles[position]],
+            'content': self._contents[position],
+            'timestamp': _isoformat(self._timestamps[position])
+        }
+
+
+# Response templates for different sentiment categories
+DEFAULT_TEMPLATES: Dict[str, List[str]] = {
+    'negative_empathy': [
+        "I’m sorry to hear that. I’ll make sure your concern is addressed.",
+        "I understand this didn’t meet your expectations. I’m here to help fix it.",
+        "I’m sorry you feel this way. Let me try to make things better.",
+    ],
+    'negative_support': [
+        "I hear your disappointment. Let me help you find a solution.",
+        "I’m sorry things didn’t go well. What can we improve?",
+        "Your concern is valid. Tell me how I can support you.",
+    ],
+    'positive_celebration': [
+        "I’m glad to hear that! I’ll continue to keep up that standard.",
+        "That’s wonderful! I’m happy your experience was better.",
+        "Great! I’m happy things are improving for you.",
+    ],
+    'positive_encouragement': [
+        "That’s great! I appreciate the positive feedback.",
+        "Awesome! I’m glad things are moving in the right direction.",
+        "Good to hear! Let me know how else I can help.",
+    ],
+    'neutral_inquiry': [
+        "I see. Could you tell me more?",
+        "Alright. What would you like to discuss further?",
+        "Okay. How can I assist you next?",
+    ],
+    'neutral_acknowledge': [
+        "Thank you for sharing that.",
+        "Got it. Let me know what you'd like to do next.",
+        "Okay, I understand.",
+    ],
+    'default': [
+        "I’m here to help. Tell me more.",
+        "Alright. How would you like to continue?",
+        "I’m listening. Go ahead.",
+    ]
+}
+
+# Keyword rules per sentiment label: the first rule with a keyword among the
+# input's tokens picks the category, else the label's default category.
+# The None entry applies to any other label, including no label at all.
+DEFAULT_RULES: Dict[Optional[str], Tuple[List[Tuple[List[str], str]], str]] = {
+    'NEGATIVE': ([
+        (['help', 'can', 'support', 'fix', 'solve'], 'negative_support'),
+    ], 'negative_empathy'),
+    'POSITIVE': ([
+        (['excited', 'happy', 'love', 'amazing', 'fantastic', 'wonderful'], 'positive_celebration'),
+    ], 'positive_encouragement'),
+    'NEUTRAL': ([
+        (['?', 'what', 'how', 'why', 'when', 'where'], 'neutral_inquiry'),
+    ], 'neutral_acknowledge'),
+    None: ([
+        (['hello', 'hi', 'hey', 'greetings'], 'neutral_inquiry'),
+        (['bad', 'terrible', 'awful', 'hate', 'disappointing', 'frustrated'], 'negative_empathy'),
+        (['good', 'great', 'love', 'excellent', 'wonderful', 'amazing', 'fantastic'],
+         'positive_celebration'),
+    ], 'default'),
+}
+
+# Words (with apostrophes, so "can't" is not "can") and question marks;
+# hyphens separate words, so "hi-five" holds the keyword "hi"
+_TOKEN_PATTERN = re.compile(r"[\w'’]+|\?")
+
+
+class ResponseEngine:
+    """
+    Precompiled response selection
+
+    Keyword rules are compiled once into a token -> rule priority table per
+    sentiment label, so choosing a category is a single pass over the
+    input's tokens, independent of the number of keywords. Keywords match
+    whole tokens; multi-word keywords match consecutive tokens.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, List[str]]] = None,
+                 rules: Optional[Dict] = None):
+        """
+        Compile templates and keyword rules
+
+        Args:
+            templates: Category -> response templates (default: DEFAULT_TEMPLATES)
+            rules: Label -> (list of (keywords, category), default category),
+                in the DEFAULT_RULES format; the None entry is the fallback
+
+        Raises:
+            ValueError: If a rule refers to a category without templates
+        """
+        self.templates = {
+            category: tuple(options)
+            for category, options in (templates or DEFAULT_TEMPLATES).items()
+        }
+        rules = rules if rules is not None else DEFAULT_RULES
+        if None not in rules:
+            raise ValueError("Rules need a fallback entry under None")
+
+        self._tables: Dict[Optional[str], Tuple[Dict[Tuple[str, ...], int], List[str], str]] = {}
+        self._phrase_lengths = {1}
+        for label, (label_rules, default) in rules.items():
+            keyword_table: Dict[Tuple[str, ...], int] = {}
+            categories = []
+            for priority, (keywords, category) in enumerate(label_rules):
+                categories.append(category)
+                for keyword in keywords:
+                    phrase = tuple(_TOKEN_PATTERN.findall(keyword.lower()))
+                    if phrase:
+                        keyword_table.setdefault(phrase, priority)
+                        self._phrase_lengths.add(len(phrase))
+            for category in categories + [default]:
+                if not self.templates.get(category):
+                    raise ValueError(f"No templates for category: {category}")
+            self._tables[label] = (keyword_table, categories, default)
+        self._phrase_lengths = sorted(self._phrase_lengths)
+
+    def select_category(self, user_input: str, sentiment_label: Optional[str] = None) -> str:
+        """
+        Choose the response category for an input
+
+        Args:
+            user_input: User message
+            sentiment_label: 'POSITIVE', 'NEGATIVE', 'NEUTRAL' or None
+
+        Returns:
+            Template category name
+        """
+        keyword_table, categories, default = self._tables.get(sentiment_label,
+                                                              self._tables[None])
+        if not keyword_table:
+            return default
+
+        tokens = _TOKEN_PATTERN.findall(user_input.lower())
+        best = len(categories)
+        for length in self._phrase_lengths:
+            for start in range(len(tokens) - length + 1):
+                priority = keyword_table.get(tuple(tokens[start:start + length]))
+                if priority is not None and priority < best:
+                    best = priority
+                    if best == 0:
+                        return categories[0]
+        return categories[best] if best < len(categories) else default
+
+    def respond(self, user_input: str, sentiment_label: Optional[str] = None,
+                rng: Optional[random.Random] = None) -> str:
+        """
+        Pick a response template for an input
+
+        Args:
+            user_input: User message
+            sentiment_label: 'POSITIVE', 'NEGATIVE', 'NEUTRAL' or None
+            rng: Random generator choosing among templates (default: module random)
+
+        Returns:
+            Response text
+        """
+        options = self.templates[self.select_category(user_input, sentiment_label)]
+        return (rng or random).choice(options)
+
+
+_default_engine: Optional[ResponseEngine] = None
+
+
+def default_response_engine() -> ResponseEngine:
+    """Shared engine compiled from the default templates and rules"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = ResponseEngine()
+    return _default_engine
+
 
 class Chatbot:
     """Modular chatbot with conversation management"""
 
-    def __init__(self, name: str = "SentimentBot"):
+    def __init__(self, name: str = "SentimentBot", seed: Optional[int] = None,
+                 response_engine: Optional[ResponseEngine] = None,
+                 max_history: Optional[int] = None, rolled_up_sentiment=None):
         """
         Initialize the chatbot
         
         Args:
             name: Name of the chatbot
+            seed: Seed of this chatbot's response RNG, for reproducible replies
+            response_engine: Response selection (default: the shared default engine)
+            max_history: Keep only the last max_history messages verbatim,
+                for sessions that never end; older ones still count in
+                get_summary()
+            rolled_up_sentiment: Empty ConversationAggregator receiving the
+                user messages that roll out of the history, so that
+                analyze_conversation(chatbot.get_history()) covers the
+                whole session; it is not saved by to_dict()
         """
         self.name = name
-        self.conversation_history = []
+        self.rng = random.Random(seed)
+        self.response_engine = response_engine or default_response_engine()
+        self.max_history = max_history
+        self.conversation_history = ConversationHistory(max_messages=max_history,
+                                                        rolled_up_sentiment=rolled_up_sentiment)
         self.start_time = datetime.now()
+        # Optional append-only log (see conversation_log.py) and this chatbot's key in it
+        self.log = None
+        self.session_id = None
+
+    def attach_log(self, log, session_id: str):
+        """
+        Write every new message and sentiment of this chatbot to a log
+
+        Args:
+            log: ConversationLog receiving the records
+            session_id: Key of this conversation in the log
+        """
+        self.log = log
+        self.session_id = session_id
 
     def add_message(self, role: str, content: str) -> Dict:
         """
         Add a message to conversation history
         """
-        message = {
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.conversation_history.append(message)
-        return message
+        position = self.conversation_history.add(role, content)
+        if self.log is not None:
+            self.log.append_message(self.session_id, role, content,
+                                    self.conversation_history.timestamp_ns(position))
+        return self.conversation_history[-1]
+
+    def record_sentiment(self, position: int, sentiment: Dict):
+        """
+        Attach a sentiment result to a message in the log, if one is attached
 
-    def get_history(self) -> List[Dict]:
-        """Return conversation history"""
+        Args:
+            position: Index of the message in the history
+            sentiment: SentimentResult dictionary
+        """
+        if self.log is not None:
+            self.log.append_sentiment(self.session_id, position, sentiment)
+
+    def get_history(self) -> ConversationHistory:
+        """Return conversation history (a sequence of message dicts)"""
         return self.conversation_history
 
     def get_context(self) -> str:
@@ -39,105 +497,58 @@ class Chatbot:
         if len(self.conversation_history) < 2:
             return "Start of conversation"
 
-        user_messages = [
-            msg for msg in self.conversation_history if msg['role'] == 'user'
-        ]
-        
-        if user_messages:
-            return user_messages[-1]['content']
-        return ""
+        last_user_message = self.conversation_history.last_user_content()
+        return last_user_message if last_user_message is not None else ""
 
     def generate_response(self, user_input: str, sentiment_label: str = None) -> str:
         """
         Generate a contextually appropriate response with sentiment awareness
         """
-        # Response templates for different sentiment categories
-        responses = {
-            'negative_empathy': [
-                "I’m sorry to hear that. I’ll make sure your concern is addressed.",
-                "I understand this didn’t meet your expectations. I’m here to help fix it.",
-                "I’m sorry you feel this way. Let me try to make things better.",
-            ],
-            'negative_support': [
-                "I hear your disappointment. Let me help you find a solution.",
-                "I’m sorry things didn’t go well. What can we improve?",
-                "Your concern is valid. Tell me how I can support you.",
-            ],
-            'positive_celebration': [
-                "I’m glad to hear that! I’ll continue to keep up that standard.",
-                "That’s wonderful! I’m happy your experience was better.",
-                "Great! I’m happy things are improving for you.",
-            ],
-            'positive_encouragement': [
-                "That’s great! I appreciate the positive feedback.",
-                "Awesome! I’m glad things are moving in the right direction.",
-                "Good to hear! Let me know how else I can help.",
-            ],
-            'neutral_inquiry': [
-                "I see. Could you tell me more?",
-                "Alright. What would you like to discuss further?",
-                "Okay. How can I assist you next?",
-            ],
-            'neutral_acknowledge': [
-                "Thank you for sharing that.",
-                "Got it. Let me know what you'd like to do next.",
-                "Okay, I understand.",
-            ],
-            'default': [
-                "I’m here to help. Tell me more.",
-                "Alright. How would you like to continue?",
-                "I’m listening. Go ahead.",
-            ]
+        return self.response_engine.respond(user_input, sentiment_label, self.rng)
+
+    def to_dict(self) -> Dict:
+        """Serialize name, start time and history for persistence"""
+        data = {
+            'name': self.name,
+            'start_time': self.start_time.isoformat(),
+            'history': list(self.conversation_history)
         }
+        if self.max_history is not None:
+            data['max_history'] = self.max_history
+            data['rolled_up'] = self.conversation_history.rolled_up_summary()
+        return data
 
-        lower_input = user_input.lower()
-
-        # Sentiment-based selection
-        if sentiment_label == "NEGATIVE":
-            if any(word in lower_input for word in ['help', 'can', 'support', 'fix', 'solve']):
-                category = 'negative_support'
-            else:
-                category = 'negative_empathy'
-
-        elif sentiment_label == "POSITIVE":
-            if any(word in lower_input for word in ['excited', 'happy', 'love', 'amazing', 'fantastic', 'wonderful']):
-                category = 'positive_celebration'
-            else:
-                category = 'positive_encouragement'
-
-        elif sentiment_label == "NEUTRAL":
-            if any(word in lower_input for word in ['?', 'what', 'how', 'why', 'when', 'where']):
-                category = 'neutral_inquiry'
-            else:
-                category = 'neutral_acknowledge'
-
-        else:
-            # Fallback keyword-based detection
-            if any(word in lower_input for word in ['hello', 'hi', 'hey', 'greetings']):
-                category = 'neutral_inquiry'
-            elif any(word in lower_input for word in ['bad', 'terrible', 'awful', 'hate', 'disappointing', 'frustrated']):
-                category = 'negative_empathy'
-            elif any(word in lower_input for word in ['good', 'great', 'love', 'excellent', 'wonderful', 'amazing', 'fantastic']):
-                category = 'positive_celebration'
-            else:
-                category = 'default'
-
-        return random.choice(responses[category])
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Chatbot":
+        """Rebuild a chatbot saved with to_dict"""
+        chatbot = cls(name=data.get('name', "SentimentBot"), max_history=data.get('max_history'))
+        chatbot.start_time = datetime.fromisoformat(data['start_time'])
+        chatbot.conversation_history = ConversationHistory(
+            data.get('history', []), chatbot.max_history, data.get('rolled_up')
+        )
+        return chatbot
 
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        rolled_up_sentiment = self.conversation_history.rolled_up_sentiment
+        if rolled_up_sentiment is not None:
+            rolled_up_sentiment.reset()
+        self.conversation_history = ConversationHistory(max_messages=self.max_history,
+                                                        rolled_up_sentiment=rolled_up_sentiment)
+        if self.log is not None:
+            self.log.append_clear(self.session_id)
         self.start_time = datetime.now()
 
     def get_summary(self) -> Dict:
-        """Get conversation summary statistics"""
-        total_messages = len(self.conversation_history)
-        user_messages = sum(1 for msg in self.conversation_history if msg['role'] == 'user')
+        """Get conversation summary statistics over the whole session"""
+        total_messages = self.conversation_history.total_messages
+        user_messages = self.conversation_history.role_count('user')
         assistant_messages = total_messages - user_messages
 
         return {
             'total_messages': total_messages,
             'user_messages': user_messages,
             'assistant_messages': assistant_messages,
+            'retained_messages': len(self.conversation_history),
             'duration': str(datetime.now() - self.start_time)
         }
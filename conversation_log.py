@@ -0,0 +1,223 @@
+"""
+Append-Only Conversation Log
+Persists chat sessions turn by turn, without rewriting files
+
+Every record is one line: the JSON-encoded session ID, a tab, and a JSON
+record. Records are
+- a message:   {"role": ..., "content": ..., "ts": nanoseconds}
+- a sentiment: {"position": message index, "sentiment": SentimentResult dict}
+- a reset:     {"clear": true}
+
+Every record is handed to the operating system as it is appended, so a
+crash of the process loses nothing; fsyncs, which guard against a crash
+of the machine, are batched (every sync_every records or sync_interval
+seconds, the latter checked on append and by whoever owns the log calling
+sync() periodically, as the server does). On open the log is memory-mapped and scanned once
+to index the record offsets of every session; a session is then rebuilt
+from its own records only. A torn last line left by a crash is cut off
+before appending resumes.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from chatbot import Chatbot, ConversationHistory
+
+
+class ConversationLog:
+    """Append-only multi-session log with an in-memory offset index"""
+
+    def __init__(self, path: str, sync_every: int = 100, sync_interval: float = 1.0):
+        """
+        Open (or create) a log and index its sessions
+
+        Args:
+            path: Log file path
+            sync_every: Records written between fsyncs
+            sync_interval: Seconds after which pending records are fsync'ed
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._offsets: Dict[bytes, array] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+
+        self._size = self._recover()
+        self._file = open(path, 'ab')
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._index(0, self._size)
+
+    def __len__(self) -> int:
+        """Number of sessions in the log"""
+        return len(self._offsets)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._key(session_id) in self._offsets
+
+    def session_ids(self):
+        """IDs of all sessions in the log"""
+        return [json.loads(key) for key in self._offsets]
+
+    # WRITING
+
+    def append_message(self, session_id: str, role: str, content: str, timestamp_ns: int):
+        """Append one chat message"""
+        self._append(session_id, {'role': role, 'content': content, 'ts': timestamp_ns})
+
+    def append_sentiment(self, session_id: str, position: int, sentiment: Dict):
+        """Attach a sentiment result to the message at a position"""
+        self._append(session_id, {'position': position, 'sentiment': sentiment})
+
+    def append_clear(self, session_id: str):
+        """Record that a session's history was cleared"""
+        self._append(session_id, {'clear': True})
+
+    def flush(self):
+        """Hand buffered records to the operating system"""
+        with self._lock:
+            self._file.flush()
+
+    def sync(self):
+        """Flush and fsync all pending records; a no-op when none are pending"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Sync and close the log"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+    def __enter__(self) -> "ConversationLog":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _append(self, session_id: str, record: Dict):
+        key = self._key(session_id)
+        line = key + b'\t' + json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._offsets.setdefault(key, array('q')).append(self._size)
+            self._size += len(line)
+            self._pending += 1
+            if (self._pending >= self.sync_every
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        if self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    # READING
+
+    def load_session(self, session_id: str) -> Optional[Tuple[Chatbot, Dict[int, Dict]]]:
+        """
+        Rebuild a session from its records
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            (chatbot, sentiments by message position), or None if the
+            session is not in the log
+        """
+        with self._lock:
+            offsets = self._offsets.get(self._key(session_id))
+            if offsets is None:
+                return None
+            view = self._view()
+            lines = []
+            for offset in offsets:
+                end = view.find(b'\n', offset)
+                lines.append(view[view.find(b'\t', offset) + 1:end])
+
+        chatbot = Chatbot()
+        history = chatbot.conversation_history
+        sentiments: Dict[int, Dict] = {}
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'role' in record:
+                history.add(record['role'], record['content'], record['ts'])
+            elif 'sentiment' in record:
+                sentiments[record['position']] = record['sentiment']
+            elif record.get('clear'):
+                history = chatbot.conversation_history = ConversationHistory()
+                sentiments.clear()
+
+        if len(history):
+            chatbot.start_time = datetime.fromtimestamp(history.timestamp_ns(0) / 1e9)
+        return chatbot, sentiments
+
+    def _view(self) -> mmap.mmap:
+        """Memory map covering everything written so far"""
+        if self._map is None or self._mapped_size < self._size:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = len(self._map)
+        return self._map
+
+    def _recover(self) -> int:
+        """Cut off a torn last record and return the log size"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                end = view.rfind(b'\n') + 1
+            if end != size:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+            return end
+
+    def _index(self, start: int, end: int):
+        """Record the offset of every line between start and end under its session key"""
+        if end <= start:
+            return
+        view = self._view()
+        offsets = self._offsets
+        offset = start
+        while offset < end:
+            line_end = view.find(b'\n', offset, end)
+            tab = view.find(b'\t', offset, line_end)
+            if tab != -1:
+                key = view[offset:tab]
+                session_offsets = offsets.get(key)
+                if session_offsets is None:
+                    session_offsets = offsets[key] = array('q')
+                session_offsets.append(offset)
+            offset = line_end + 1
+
+    @staticmethod
+    def _key(session_id: str) -> bytes:
+        return json.dumps(str(session_id)).encode('utf-8')
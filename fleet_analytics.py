@@ -0,0 +1,535 @@
+"""
+Fleet-Wide Conversation Analytics
+Map-reduce statistics over many conversation files
+
+    python -m fleet_analytics PATH [PATH ...] [--workers N] [--checkpoint FILE]
+
+Each PATH is a file, a directory (searched recursively) or a glob. A file
+holds one session in any of these forms, optionally compressed (.gz,
+.bz2, .xz, .zst):
+- an export_results document, indented or compact
+- an export_results JSON Lines file (summary record first)
+- a raw history: a list of messages, {"messages": [...]}, a
+  Chatbot.to_dict() document or a SessionManager spill file
+
+Exported scores are reused as they are (use --rescore to score the
+messages again); raw histories are scored with analyze_conversation.
+
+The sorted file list is cut into shards that worker processes map into
+FleetAggregate partials: counts, sums, fixed-bin histograms and a
+bounded list of the worst sessions, all of which merge associatively.
+After every finished shard the merged aggregate and the set of finished
+shards are written atomically to the checkpoint file, so an interrupted
+job restarted with the same inputs and checkpoint skips finished shards.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import glob
+import hashlib
+import heapq
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sentiment_analyzer import (
+    EXPORT_COMPRESSION, MessageSentimentColumns, MissingResourceError, SentimentAnalyzer
+)
+
+CHECKPOINT_VERSION = 2
+SESSION_SUFFIXES = ('.json', '.jsonl')
+SCORE_BINS = 20
+TREND_FIELDS = ('trend', 'window_trend', 'ewma_trend')
+MAX_ERRORS = 20
+
+
+def _histogram_bin(score: float) -> int:
+    """Index of the fixed [-1, 1] bin holding a score"""
+    return min(max(int((score + 1) / 2 * SCORE_BINS), 0), SCORE_BINS - 1)
+
+
+class FleetAggregate:
+    """
+    Mergeable statistics over many sessions
+
+    Every field is a count, a sum, a fixed-bin histogram or a bounded
+    top-k list, so partial aggregates computed on separate shards can be
+    merged in any order into the same result.
+    """
+
+    def __init__(self, top_k: int = 10):
+        """
+        Args:
+            top_k: Number of worst (lowest scoring) sessions to keep
+        """
+        self.top_k = top_k
+        self.sessions = 0
+        self.messages = 0
+        self.errors = 0
+        self.error_samples: List[str] = []
+        self.score_sum = 0.0
+        self.confidence_sum = 0.0
+        self.session_labels: Dict[str, int] = {}
+        self.message_labels: Dict[str, int] = {}
+        self.trends: Dict[str, Dict[str, int]] = {name: {} for name in TREND_FIELDS}
+        self.session_histogram = [0] * SCORE_BINS
+        self.message_histogram = [0] * SCORE_BINS
+        # Max-heap by score via (-score, session): the root is the best of the worst
+        self._worst: List[Tuple[float, str]] = []
+
+    def add(self, session: str, analysis: Dict):
+        """
+        Add one session's conversation analysis
+
+        Args:
+            session: Session name, e.g. its file path
+            analysis: ConversationSentiment.to_dict() style document;
+                message_sentiments is optional and may be
+                MessageSentimentColumns
+        """
+        score = analysis['overall_score']
+        self.sessions += 1
+        self.messages += analysis['total_messages']
+        self.score_sum += score
+        self.confidence_sum += analysis['average_confidence'] * analysis['total_messages']
+        _increment(self.session_labels, analysis['overall_label'])
+        for name in TREND_FIELDS:
+            value = analysis.get(name)
+            if value:
+                _increment(self.trends[name], value)
+        self.session_histogram[_histogram_bin(score)] += 1
+
+        sentiments = analysis.get('message_sentiments')
+        if isinstance(sentiments, MessageSentimentColumns):
+            for label, score in zip(sentiments.labels(), sentiments.column('score')):
+                _increment(self.message_labels, label)
+                self.message_histogram[_histogram_bin(score)] += 1
+        elif sentiments:
+            for sentiment in sentiments:
+                _increment(self.message_labels, sentiment['label'])
+                self.message_histogram[_histogram_bin(sentiment['score'])] += 1
+        else:
+            for label, key in (('Positive', 'positive_count'), ('Negative', 'negative_count'),
+                               ('Neutral', 'neutral_count')):
+                if analysis.get(key):
+                    _increment(self.message_labels, label, analysis[key])
+
+        self._push_worst(-score, session)
+
+    def add_error(self, session: str, error: Exception):
+        """Count a session that could not be read or scored"""
+        self.errors += 1
+        if len(self.error_samples) < MAX_ERRORS:
+            self.error_samples.append(f"{session}: {error}")
+
+    def merge(self, other: "FleetAggregate") -> "FleetAggregate":
+        """Fold another partial aggregate into this one and return self"""
+        self.sessions += other.sessions
+        self.messages += other.messages
+        self.errors += other.errors
+        self.error_samples.extend(other.error_samples[:MAX_ERRORS - len(self.error_samples)])
+        self.score_sum += other.score_sum
+        self.confidence_sum += other.confidence_sum
+        for label, count in other.session_labels.items():
+            _increment(self.session_labels, label, count)
+        for label, count in other.message_labels.items():
+            _increment(self.message_labels, label, count)
+        for name, counts in other.trends.items():
+            for value, count in counts.items():
+                _increment(self.trends.setdefault(name, {}), value, count)
+        for index, count in enumerate(other.session_histogram):
+            self.session_histogram[index] += count
+        for index, count in enumerate(other.message_histogram):
+            self.message_histogram[index] += count
+        for negated_score, session in other._worst:
+            self._push_worst(negated_score, session)
+        return self
+
+    def worst_sessions(self) -> List[Dict]:
+        """The lowest scoring sessions, worst first"""
+        return [{'session': session, 'overall_score': -negated_score}
+                for negated_score, session in sorted(self._worst, reverse=True)]
+
+    def _push_worst(self, negated_score: float, session: str):
+        if self.top_k <= 0:
+            return
+        if len(self._worst) < self.top_k:
+            heapq.heappush(self._worst, (negated_score, session))
+        elif (negated_score, session) > self._worst[0]:
+            heapq.heapreplace(self._worst, (negated_score, session))
+
+    def to_dict(self) -> Dict:
+        """Serialize for checkpoints and inter-process transfer"""
+        return {
+            'top_k': self.top_k,
+            'sessions': self.sessions,
+            'messages': self.messages,
+            'errors': self.errors,
+            'error_samples': self.error_samples,
+            'score_sum': self.score_sum,
+            'confidence_sum': self.confidence_sum,
+            'session_labels': self.session_labels,
+            'message_labels': self.message_labels,
+            'trends': self.trends,
+            'session_histogram': self.session_histogram,
+            'message_histogram': self.message_histogram,
+            'worst': [list(entry) for entry in self._worst]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FleetAggregate":
+        """Rebuild an aggregate saved with to_dict"""
+        aggregate = cls(top_k=data['top_k'])
+        for name in ('sessions', 'messages', 'errors', 'error_samples', 'score_sum',
+                     'confidence_sum', 'session_labels', 'message_labels', 'trends',
+                     'session_histogram', 'message_histogram'):
+            setattr(aggregate, name, data[name])
+        aggregate._worst = [tuple(entry) for entry in data['worst']]
+        heapq.heapify(aggregate._worst)
+        return aggregate
+
+    def report(self) -> Dict:
+        """Final fleet statistics"""
+        edges = [round(-1 + 2 * index / SCORE_BINS, 3) for index in range(SCORE_BINS + 1)]
+        return {
+            'sessions': self.sessions,
+            'messages': self.messages,
+            'errors': self.errors,
+            'error_samples': self.error_samples,
+            'average_session_score': self.score_sum / self.sessions if self.sessions else 0.0,
+            'average_confidence': (self.confidence_sum / self.messages
+                                   if self.messages else 0.0),
+            'session_labels': self.session_labels,
+            'message_labels': self.message_labels,
+            'trends': self.trends,
+            'histogram_edges': edges,
+            'session_score_histogram': self.session_histogram,
+            'message_score_histogram': self.message_histogram,
+            'worst_sessions': self.worst_sessions()
+        }
+
+
+def _increment(counts: Dict[str, int], key: str, amount: int = 1):
+    counts[key] = counts.get(key, 0) + amount
+
+
+# INPUT
+
+def find_session_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expand files, directories and globs into a sorted, de-duplicated file list
+
+    Directories are searched recursively for .json/.jsonl files, plain or
+    compressed.
+    """
+    suffixes = tuple(
+        base + compressed
+        for base in SESSION_SUFFIXES
+        for compressed in [''] + [suffix for _, suffix in EXPORT_COMPRESSION.values()]
+    )
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.update(os.path.join(root, name) for name in names
+                             if name.endswith(suffixes))
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            found.update(match for match in glob.glob(path, recursive=True)
+                         if os.path.isfile(match))
+    return sorted(found)
+
+
+def _open_session_file(path: str):
+    """Open a session file for text reading, decompressing by suffix"""
+    for module_name, suffix in EXPORT_COMPRESSION.values():
+        if path.endswith(suffix):
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                raise ValueError(f"Cannot decompress {suffix} files in this Python") from None
+            return module.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def load_session(path: str) -> Tuple[str, object]:
+    """
+    Read one session file
+
+    Returns:
+        ('analysis', export document) or ('messages', raw message list)
+
+    Raises:
+        ValueError: If the file is not a recognized session format
+    """
+    with _open_session_file(path) as f:
+        text = f.read()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # JSON Lines export: a summary record followed by message records
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        if not records or not isinstance(records[0], dict) or records[0].get('type') != 'summary':
+            raise ValueError("Unrecognized JSON Lines file") from None
+        analysis = {key: value for key, value in records[0].items() if key != 'type'}
+        analysis['message_sentiments'] = [
+            {key: value for key, value in record.items() if key not in ('type', 'index')}
+            for record in records[1:]
+            if isinstance(record, dict) and record.get('type') == 'message'
+        ]
+        return 'analysis', analysis
+
+    if isinstance(data, list):
+        return 'messages', data
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object or list")
+    if 'overall_score' in data:
+        return 'analysis', data
+    if 'type' in data and data.get('type') == 'summary':
+        return 'analysis', {key: value for key, value in data.items() if key != 'type'}
+    if 'chatbot' in data:
+        data = data['chatbot']
+    for key in ('messages', 'history'):
+        if isinstance(data.get(key), list):
+            return 'messages', data[key]
+    raise ValueError("Unrecognized session file")
+
+
+# MAP
+
+# Analyzer owned by a worker process
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker(settings: Dict):
+    """Build the per-process analyzer once when a worker starts"""
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(cache_size=settings['cache_size'],
+                                         engine=settings['engine'],
+                                         lexicon_snapshot=settings['lexicon_snapshot'],
+                                         persistent_cache=settings['persistent_cache'])
+
+
+def analyze_shard(paths: List[str], analyzer: SentimentAnalyzer, rescore: bool = False,
+                  top_k: int = 10) -> FleetAggregate:
+    """
+    Map one shard of session files into a partial aggregate
+
+    Args:
+        paths: Session files
+        analyzer: Analyzer scoring raw histories (and exports, if rescore)
+        rescore: Score exported sessions again instead of reusing their scores
+        top_k: Worst sessions kept
+
+    Returns:
+        Partial FleetAggregate; unreadable files are counted as errors
+    """
+    aggregate = FleetAggregate(top_k)
+    for path in paths:
+        try:
+            kind, data = load_session(path)
+            if kind == 'analysis' and rescore:
+                texts = [sentiment['text'] for sentiment in data.get('message_sentiments') or []]
+                if not texts:
+                    raise ValueError("Export has no message texts to rescore")
+                kind, data = 'messages', [{'role': 'user', 'content': text} for text in texts]
+            if kind == 'messages':
+                analysis = analyzer.analyze_conversation(data, columnar=True)
+                data = {field.name: getattr(analysis, field.name) for field in fields(analysis)}
+            aggregate.add(path, data)
+        except (OSError, ValueError, KeyError, TypeError, EOFError) as e:
+            aggregate.add_error(path, e)
+    if analyzer.persistent_cache is not None:
+        # Commit the shard's new scores before it counts as finished
+        analyzer.persistent_cache.flush()
+    return aggregate
+
+
+def _analyze_shard_in_worker(index: int, paths: List[str], rescore: bool,
+                             top_k: int) -> Tuple[int, Dict]:
+    return index, analyze_shard(paths, _worker_analyzer, rescore, top_k).to_dict()
+
+
+# REDUCE, WITH CHECKPOINTS
+
+def _file_stamp(path: str) -> str:
+    """Size and modification time of a file, so that edited inputs are noticed"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _fingerprint(files: List[str], shard_size: int, scoring: Dict) -> str:
+    """Identifies the inputs, sharding and scoring settings a checkpoint belongs to"""
+    settings = dict(scoring, shard_size=shard_size)
+    if settings.get('lexicon_snapshot'):
+        settings['lexicon_stamp'] = _file_stamp(settings['lexicon_snapshot'])
+    digest = hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    for path in files:
+        digest.update(path.encode('utf-8', 'surrogateescape'))
+        digest.update(f"\0{_file_stamp(path)}\0".encode('ascii'))
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path: str, fingerprint: str, top_k: int):
+    """Finished shard indices and merged aggregate from a checkpoint, if any"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return set(), FleetAggregate(top_k)
+    if data.get('version') != CHECKPOINT_VERSION or data.get('fingerprint') != fingerprint:
+        raise ValueError(f"Checkpoint {path} belongs to different inputs or settings")
+    return set(data['done']), FleetAggregate.from_dict(data['aggregate'])
+
+
+def _save_checkpoint(path: str, fingerprint: str, shards: int, done, aggregate: FleetAggregate):
+    """Write the checkpoint atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': CHECKPOINT_VERSION,
+            'fingerprint': fingerprint,
+            'shards': shards,
+            'done': sorted(done),
+            'aggregate': aggregate.to_dict()
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def run_job(paths: Iterable[str], workers: int = 1, shard_size: int = 500,
+            checkpoint: Optional[str] = None, rescore: bool = False, top_k: int = 10,
+            engine: str = 'both', cache_size: int = 10000,
+            lexicon_snapshot: Optional[str] = None, score_cache: Optional[str] = None,
+            log=None) -> Dict:
+    """
+    Compute fleet statistics over session files
+
+    Args:
+        paths: Files, directories or globs
+        workers: Worker processes (1 runs in the current process)
+        shard_size: Files per shard
+        checkpoint: Checkpoint file; finished shards recorded there are skipped
+        rescore: Score exported sessions again instead of reusing their scores
+        top_k: Worst sessions to report
+        engine: Sentiment engine mode for scoring
+        cache_size: Statement cache entries per worker
+        lexicon_snapshot: Lexicon snapshot the workers map instead of
+            parsing the lexicons
+        score_cache: Persistent score cache shared by the workers
+        log: Text stream for progress lines (None for silence)
+
+    Returns:
+        FleetAggregate.report() of all sessions
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1")
+
+    files = find_session_files(paths)
+    if checkpoint:
+        # A checkpoint kept next to the sessions is not a session
+        ignored = {os.path.abspath(checkpoint), os.path.abspath(f"{checkpoint}.tmp")}
+        files = [path for path in files if os.path.abspath(path) not in ignored]
+    shards = [files[start:start + shard_size] for start in range(0, len(files), shard_size)]
+    # Anything that changes the merged result invalidates the checkpoint;
+    # cache sizes and the score cache only change the speed
+    fingerprint = _fingerprint(files, shard_size, {'rescore': rescore, 'top_k': top_k,
+                                                   'engine': engine,
+                                                   'lexicon_snapshot': lexicon_snapshot})
+    if checkpoint:
+        done, aggregate = _load_checkpoint(checkpoint, fingerprint, top_k)
+    else:
+        done, aggregate = set(), FleetAggregate(top_k)
+    todo = [index for index in range(len(shards)) if index not in done]
+
+    def finished(index: int, partial: FleetAggregate):
+        aggregate.merge(partial)
+        done.add(index)
+        if checkpoint:
+            _save_checkpoint(checkpoint, fingerprint, len(shards), done, aggregate)
+        if log is not None:
+            print(f"shard {len(done)}/{len(shards)}: {aggregate.sessions} sessions",
+                  file=log, flush=True)
+
+    settings = {'engine': engine, 'cache_size': cache_size,
+                'lexicon_snapshot': lexicon_snapshot, 'persistent_cache': score_cache}
+    if workers == 1:
+        _init_worker(settings)
+        for index in todo:
+            finished(index, analyze_shard(shards[index], _worker_analyzer, rescore, top_k))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(settings,)) as executor:
+            # Keep a bounded number of shards in flight
+            pending = set()
+            queue = iter(todo)
+            while True:
+                for index in queue:
+                    pending.add(executor.submit(_analyze_shard_in_worker, index,
+                                                shards[index], rescore, top_k))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    break
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    index, partial = future.result()
+                    finished(index, FleetAggregate.from_dict(partial))
+
+    return aggregate.report()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the fleet analytics job and return the exit status"""
+    parser = argparse.ArgumentParser(description="Fleet-wide sentiment statistics")
+    parser.add_argument('paths', nargs='+', help='session files, directories or globs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--shard-size', type=int, default=500,
+                        help='files per shard (default: 500)')
+    parser.add_argument('--checkpoint', default=None,
+                        help='checkpoint file used to resume an interrupted job')
+    parser.add_argument('--rescore', action='store_true',
+                        help='score exported sessions again instead of reusing their scores')
+    parser.add_argument('--top-k', type=int, default=10,
+                        help='worst sessions to report (default: 10)')
+    parser.add_argument('--output', default=None,
+                        help='report file (default: stdout)')
+    parser.add_argument('--lexicon-snapshot', default=None,
+                        help='memory-mapped lexicon snapshot shared by the workers')
+    parser.add_argument('--score-cache', default=None,
+                        help='SQLite file of scores kept across runs')
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_job(args.paths, workers=args.workers, shard_size=args.shard_size,
+                         checkpoint=args.checkpoint, rescore=args.rescore, top_k=args.top_k,
+                         lexicon_snapshot=args.lexicon_snapshot, score_cache=args.score_cache,
+                         log=sys.stderr)
+    except (ValueError, MissingResourceError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
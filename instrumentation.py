@@ -0,0 +1,225 @@
+"""
+Analyzer Instrumentation
+Low-overhead timing histograms and counters for SentimentAnalyzer
+
+- Per-stage timing histograms (VADER, preprocessing, TextBlob
+  sentiment, labelling, result serialization) and per-operation timings
+- Call counters and a message length distribution
+- Snapshot as a dict, or as Prometheus text exposition format
+- Optional cProfile sampling of every Nth instrumented call (sampled
+  calls from different threads are profiled one at a time)
+
+Instrumentation is off by default and can be switched at runtime with
+enable()/disable(); while off, instrumented code only tests one boolean.
+Each process keeps its own metrics, so scoring done in analyze_batch
+worker processes is counted as one analyze_batch operation only.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import bisect
+import cProfile
+import io
+import math
+import pstats
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# Histogram upper bounds, in seconds and in characters
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, math.inf)
+LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 4096, 16384, math.inf)
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus semantics"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Add one observation"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Observation count at or below each bound"""
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def to_dict(self) -> Dict:
+        """Count, sum and cumulative bucket counts keyed by bound"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {_format_bound(bound): count
+                        for bound, count in zip(self.bounds, self.cumulative())}
+        }
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == math.inf else repr(bound)
+
+
+class Metrics:
+    """Runtime-switchable metrics registry"""
+
+    def __init__(self, enabled: bool = False, profile_every: int = 0):
+        """
+        Args:
+            enabled: Start collecting immediately
+            profile_every: Run every Nth instrumented operation under
+                cProfile (0 disables profiling)
+        """
+        self.enabled = enabled
+        self.profile_every = profile_every
+        self._lock = threading.Lock()
+        # cProfile keeps one call stack per profiler, so profiled calls
+        # from different threads must not overlap
+        self._profile_lock = threading.Lock()
+        self.reset()
+
+    def enable(self, profile_every: Optional[int] = None):
+        """Start collecting, optionally changing the profiling rate"""
+        if profile_every is not None:
+            self.profile_every = profile_every
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting; collected data is kept"""
+        self.enabled = False
+
+    def reset(self):
+        """Discard all collected data"""
+        with self._lock:
+            self.counters: Dict[str, int] = {}
+            self.stages: Dict[str, Histogram] = {}
+            self.operations: Dict[str, Histogram] = {}
+            self.message_length = Histogram(LENGTH_BUCKETS)
+            self.profiler: Optional[cProfile.Profile] = None
+            self.profiled_calls = 0
+            self._operation_calls = 0
+
+    # RECORDING
+
+    def observe_stages(self, timings: Dict[str, float]):
+        """Add one observation to each named stage histogram"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                histogram = self.stages.get(stage)
+                if histogram is None:
+                    histogram = self.stages[stage] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(seconds)
+
+    def observe_operation(self, operation: str, seconds: float, messages: int = 1):
+        """Record one call of a public operation and how many messages it handled"""
+        with self._lock:
+            histogram = self.operations.get(operation)
+            if histogram is None:
+                histogram = self.operations[operation] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            self.counters[f'{operation}_calls'] = self.counters.get(f'{operation}_calls', 0) + 1
+            self.counters[f'{operation}_messages'] = (
+                self.counters.get(f'{operation}_messages', 0) + messages
+            )
+
+    def observe_length(self, characters: int):
+        """Record the length of one scored message"""
+        with self._lock:
+            self.message_length.observe(characters)
+
+    def should_profile(self) -> bool:
+        """Whether the next instrumented operation is a profiling sample"""
+        if not self.profile_every:
+            return False
+        with self._lock:
+            self._operation_calls += 1
+            return self._operation_calls % self.profile_every == 0
+
+    def profile_call(self, func, *args, **kwargs):
+        """Run func under the shared cProfile profiler, one thread at a time"""
+        with self._lock:
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+            profiler = self.profiler
+            self.profiled_calls += 1
+        with self._profile_lock:
+            return profiler.runcall(func, *args, **kwargs)
+
+    # REPORTING
+
+    def profile_report(self, limit: int = 20, sort: str = 'cumulative') -> str:
+        """pstats listing of the sampled calls (empty if none were sampled)"""
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        with self._profile_lock:
+            pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def snapshot(self) -> Dict:
+        """All collected data as plain dictionaries"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'counters': dict(self.counters),
+                'stages': {name: hist.to_dict() for name, hist in self.stages.items()},
+                'operations': {name: hist.to_dict() for name, hist in self.operations.items()},
+                'message_length': self.message_length.to_dict(),
+                'profiled_calls': self.profiled_calls
+            }
+
+    def prometheus(self, prefix: str = 'sentimentbot',
+                   gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Render the metrics in Prometheus text exposition format
+
+        Args:
+            prefix: Metric name prefix
+            gauges: Extra name -> value samples, e.g. cache statistics
+
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = []
+        with self._lock:
+            _histogram_lines(lines, f'{prefix}_stage_seconds', 'Time spent per analysis stage',
+                             'stage', self.stages)
+            _histogram_lines(lines, f'{prefix}_operation_seconds', 'Time spent per call',
+                             'operation', self.operations)
+            _histogram_lines(lines, f'{prefix}_message_length_chars',
+                             'Length of scored messages', None, {None: self.message_length})
+
+            lines.append(f'# HELP {prefix}_events_total Instrumented calls and messages')
+            lines.append(f'# TYPE {prefix}_events_total counter')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(lines: List[str], name: str, help_text: str, label: Optional[str],
+                     histograms: Dict[Optional[str], Histogram]):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for key, histogram in sorted(histograms.items(), key=lambda item: str(item[0])):
+        labels = f'{label}="{key}",' if label else ''
+        for bound, count in zip(histogram.bounds, histogram.cumulative()):
+            lines.append(f'{name}_bucket{{{labels}le="{_format_bound(bound)}"}} {count}')
+        selector = f'{{{labels.rstrip(",")}}}' if labels else ''
+        lines.append(f'{name}_sum{selector} {histogram.sum}')
+        lines.append(f'{name}_count{selector} {histogram.count}')
@@ -0,0 +1,404 @@
+"""
+Binary Lexicon Snapshot
+Compiles the VADER and TextBlob (pattern) lexicons into one memory-mapped file
+
+    python -m lexicon_snapshot build lexicons.bin
+    python -m lexicon_snapshot info lexicons.bin
+
+Building NLTK's SentimentIntensityAnalyzer parses the VADER lexicon text
+into a fresh dict, and TextBlob parses its sentiment XML on first use,
+in every process. A snapshot stores both lexicons as sorted key tables
+with offset and value arrays. SentimentAnalyzer(lexicon_snapshot=path)
+maps the file and looks words up by binary search, so loading is
+near-instant and worker processes share one page-cache copy. Words
+looked up are memoized per process, so repeated lookups cost one dict
+access.
+
+File layout: an 8-byte header (magic, metadata length), JSON metadata
+(section offsets, counts, part-of-speech tags, labels), then 8-byte
+aligned sections:
+- vader_keys / vader_offsets / vader_values: UTF-8 words sorted by their
+  bytes, uint32 start offsets (count + 1), float64 valences
+- pattern_keys / pattern_offsets: the same for pattern words
+- pattern_entries: uint32 start of each word's entries (count + 1)
+- pattern_pos / pattern_values: uint8 tag index and float64 (polarity,
+  subjectivity, intensity) per part-of-speech entry
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'SBLX'
+VERSION = 1
+_HEADER = struct.Struct('<4sI')
+# Memoized lookups per mapped lexicon before the memo is reset
+MEMO_SIZE = 65536
+_MISSING = object()
+
+
+class _KeyTable:
+    """Sorted UTF-8 keys in a mapped buffer, as a sequence of bytes"""
+
+    __slots__ = ('_buffer', '_base', '_offsets', '_count')
+
+    def __init__(self, buffer: mmap.mmap, base: int, offsets: memoryview):
+        self._buffer = buffer
+        self._base = base
+        self._offsets = offsets
+        self._count = len(offsets) - 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        base = self._base
+        return self._buffer[base + self._offsets[index]:base + self._offsets[index + 1]]
+
+    def find(self, word: str) -> int:
+        """Index of a word, or -1"""
+        key = word.encode('utf-8', 'surrogatepass')
+        index = bisect.bisect_left(self, key)
+        if index < self._count and self[index] == key:
+            return index
+        return -1
+
+
+class MappedLexicon(Mapping):
+    """Read-only word -> valence mapping over a snapshot (the VADER lexicon)"""
+
+    def __init__(self, keys: _KeyTable, values: memoryview):
+        self._keys = keys
+        self._values = values
+        self._memo: Dict[str, object] = {}
+
+    def _lookup(self, word: str):
+        value = self._memo.get(word)
+        if value is None:
+            index = self._keys.find(word)
+            value = self._values[index] if index >= 0 else _MISSING
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[word] = value
+        return value
+
+    def __getitem__(self, word: str) -> float:
+        value = self._lookup(word)
+        if value is _MISSING:
+            raise KeyError(word)
+        return value
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self._lookup(word) is not _MISSING
+
+    def get(self, word, default=None):
+        value = self._lookup(word) if isinstance(word, str) else _MISSING
+        return default if value is _MISSING else value
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self._keys)):
+            yield self._keys[index].decode('utf-8', 'surrogatepass')
+
+    def items(self):
+        return [(self._keys[index].decode('utf-8', 'surrogatepass'), self._values[index])
+                for index in range(len(self._keys))]
+
+
+class LexiconSnapshot:
+    """An opened snapshot file"""
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file
+
+        Args:
+            path: File written by build_snapshot()
+
+        Raises:
+            ValueError: If the file is not a compatible snapshot
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, meta_length = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a lexicon snapshot")
+            self.meta = json.loads(self._map[_HEADER.size:_HEADER.size + meta_length])
+            if self.meta.get('version') != VERSION:
+                raise ValueError(f"Unsupported lexicon snapshot version in {path}")
+            if self.meta.get('byteorder') != sys.byteorder:
+                raise ValueError(f"{path} was built on a machine with another byte order")
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+
+        view = memoryview(self._map)
+        layout = self.meta['sections']
+        sections = {name: view[offset:offset + length] for name, (offset, length) in layout.items()}
+        self.vader = MappedLexicon(
+            _KeyTable(self._map, layout['vader_keys'][0], sections['vader_offsets'].cast('I')),
+            sections['vader_values'].cast('d')
+        )
+        self.pattern: Optional[Tuple] = None
+        self._pattern_scorer = None
+        if 'pattern_keys' in sections:
+            self.pattern = (
+                _KeyTable(self._map, layout['pattern_keys'][0],
+                          sections['pattern_offsets'].cast('I')),
+                sections['pattern_entries'].cast('I'),
+                sections['pattern_pos'].cast('B'),
+                sections['pattern_values'].cast('d'),
+                [None] + self.meta['pattern_tags'],
+                self.meta['pattern_labels']
+            )
+
+    def pattern_sentiment(self):
+        """
+        TextBlob's pattern sentiment scorer backed by this snapshot, shared
+        by every caller in the process
+
+        Raises:
+            ValueError: If the snapshot was built without the pattern lexicon
+        """
+        if self.pattern is None:
+            raise ValueError(f"{self.path} has no pattern lexicon")
+        if self._pattern_scorer is None:
+            from textblob.en.sentiments import pattern_sentiment
+            self._pattern_scorer = _mapped_sentiment_class(type(pattern_sentiment))(
+                pattern_sentiment, self.pattern
+            )
+        return self._pattern_scorer
+
+
+_mapped_classes: Dict[type, type] = {}
+
+
+def _mapped_sentiment_class(base: type) -> type:
+    """Subclass of TextBlob's Sentiment that reads words from a snapshot"""
+    cls = _mapped_classes.get(base)
+    if cls is not None:
+        return cls
+
+    class MappedSentiment(base):
+        """Pattern sentiment scorer whose word table is memory-mapped"""
+
+        def __init__(self, template, tables):
+            # Copy the scorer settings (tokenizer, negations, modifiers)
+            self.__dict__.update(template.__dict__)
+            (self._keys, self._entries, self._pos, self._values,
+             self._tags, labels) = tables
+            self.labeler = dict(labels)
+            self._memo: Dict[str, object] = {}
+
+        def _word(self, word):
+            senses = self._memo.get(word)
+            if senses is None:
+                senses = _MISSING
+                index = self._keys.find(word) if isinstance(word, str) else -1
+                if index >= 0:
+                    senses = {}
+                    for entry in range(self._entries[index], self._entries[index + 1]):
+                        senses[self._tags[self._pos[entry]]] = list(
+                            self._values[entry * 3:entry * 3 + 3]
+                        )
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[word] = senses
+            return senses
+
+        def load(self, path=None):
+            pass
+
+        def __contains__(self, word):
+            return self._word(word) is not _MISSING
+
+        def __getitem__(self, word):
+            senses = self._word(word)
+            if senses is _MISSING:
+                raise KeyError(word)
+            return senses
+
+        def get(self, word, default=None):
+            senses = self._word(word)
+            return default if senses is _MISSING else senses
+
+        def __len__(self):
+            return len(self._keys)
+
+        def __iter__(self):
+            for index in range(len(self._keys)):
+                yield self._keys[index].decode('utf-8', 'surrogatepass')
+
+    _mapped_classes[base] = MappedSentiment
+    return MappedSentiment
+
+
+_open_snapshots: Dict[str, LexiconSnapshot] = {}
+_open_lock = threading.Lock()
+
+
+def open_snapshot(path: str) -> LexiconSnapshot:
+    """Map a snapshot once per process and share it between analyzers"""
+    key = os.path.abspath(path)
+    with _open_lock:
+        snapshot = _open_snapshots.get(key)
+        if snapshot is None:
+            snapshot = _open_snapshots[key] = LexiconSnapshot(path)
+        return snapshot
+
+
+# BUILDING
+
+def _sorted_keys(words) -> Tuple[List[bytes], bytes, array]:
+    keys = sorted(word.encode('utf-8', 'surrogatepass') for word in words)
+    offsets = array('I', [0])
+    for key in keys:
+        offsets.append(offsets[-1] + len(key))
+    return keys, b''.join(keys), offsets
+
+
+def build_snapshot(path: str, vader_lexicon: Dict[str, float],
+                   pattern_lexicon: Optional[Dict[str, Dict]] = None,
+                   pattern_labels: Optional[Dict[str, str]] = None,
+                   source: Optional[Dict] = None) -> Dict:
+    """
+    Write a snapshot file atomically
+
+    Args:
+        path: Output file
+        vader_lexicon: Word -> valence
+        pattern_lexicon: Word -> {part-of-speech tag or None: (polarity,
+            subjectivity, intensity)}, as loaded by TextBlob
+        pattern_labels: Word -> label (TextBlob's labeler)
+        source: Extra metadata to record
+
+    Returns:
+        The snapshot metadata
+    """
+    sections: Dict[str, bytes] = {}
+    meta: Dict = {'version': VERSION, 'byteorder': sys.byteorder, 'source': source or {},
+                  'vader_words': len(vader_lexicon)}
+
+    keys, blob, offsets = _sorted_keys(vader_lexicon)
+    sections['vader_keys'] = blob
+    sections['vader_offsets'] = offsets.tobytes()
+    sections['vader_values'] = array(
+        'd', (vader_lexicon[key.decode('utf-8', 'surrogatepass')] for key in keys)
+    ).tobytes()
+
+    if pattern_lexicon is not None:
+        tags = sorted({tag for senses in pattern_lexicon.values() for tag in senses
+                       if tag is not None})
+        tag_index = {tag: number + 1 for number, tag in enumerate(tags)}
+        tag_index[None] = 0
+        keys, blob, offsets = _sorted_keys(pattern_lexicon)
+        entries = array('I', [0])
+        pos = array('B')
+        values = array('d')
+        for key in keys:
+            senses = pattern_lexicon[key.decode('utf-8', 'surrogatepass')]
+            for tag, scores in senses.items():
+                pos.append(tag_index[tag])
+                values.extend(float(score) for score in scores[:3])
+            entries.append(len(pos))
+        sections['pattern_keys'] = blob
+        sections['pattern_offsets'] = offsets.tobytes()
+        sections['pattern_entries'] = entries.tobytes()
+        sections['pattern_pos'] = pos.tobytes()
+        sections['pattern_values'] = values.tobytes()
+        meta['pattern_words'] = len(pattern_lexicon)
+        meta['pattern_tags'] = tags
+        meta['pattern_labels'] = dict(pattern_labels or {})
+
+    # Section offsets depend on the metadata length, which depends on the
+    # offsets; reserve room for the offset digits and pad the JSON to fit
+    meta['sections'] = {name: [0, len(data)] for name, data in sections.items()}
+    reserved = len(json.dumps(meta).encode('utf-8')) + 16 * len(sections) + 64
+    position = _align(_HEADER.size + reserved)
+    for name, data in sections.items():
+        meta['sections'][name] = [position, len(data)]
+        position = _align(position + len(data))
+    encoded = json.dumps(meta).encode('utf-8')
+    encoded += b' ' * (reserved - len(encoded))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, reserved))
+        f.write(encoded)
+        for name, data in sections.items():
+            f.write(b'\0' * (meta['sections'][name][0] - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+    return meta
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def build_from_installed(path: str, include_pattern: bool = True) -> Dict:
+    """
+    Compile the lexicons of the installed NLTK data and TextBlob
+
+    Raises:
+        MissingResourceError: If the VADER lexicon is not installed
+    """
+    from sentiment_analyzer import _load_textblob, _load_vader
+
+    vader = _load_vader()
+    source = {'vader_lexicon': 'nltk:' + 'sentiment/vader_lexicon.zip'}
+    pattern_lexicon = pattern_labels = None
+    if include_pattern:
+        scorer = _load_textblob()
+        len(scorer)  # loads the XML lexicon
+        pattern_lexicon = {word: senses for word, senses in dict.items(scorer)}
+        pattern_labels = dict(scorer.labeler)
+        source['pattern_lexicon'] = scorer.path
+    return build_snapshot(path, vader.lexicon, pattern_lexicon, pattern_labels, source)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build or describe a snapshot and return the exit status"""
+    parser = argparse.ArgumentParser(description="Binary lexicon snapshots")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='compile the installed lexicons')
+    build.add_argument('output')
+    build.add_argument('--vader-only', action='store_true',
+                       help='leave out the TextBlob pattern lexicon')
+    info = commands.add_parser('info', help='show snapshot metadata')
+    info.add_argument('snapshot')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            meta = build_from_installed(args.output, include_pattern=not args.vader_only)
+            print(f"Wrote {args.output}: {meta['vader_words']} VADER words, "
+                  f"{meta.get('pattern_words', 0)} pattern words, "
+                  f"{os.path.getsize(args.output)} bytes")
+        else:
+            meta = dict(LexiconSnapshot(args.snapshot).meta)
+            meta.pop('pattern_labels', None)
+            print(json.dumps(meta, indent=2))
+    except (OSError, LookupError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
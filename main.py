@@ -1,15 +1,110 @@
 
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
 from chatbot import Chatbot
-from sentiment_analyzer import SentimentAnalyzer, export_results
+from sentiment_analyzer import (
+    ConversationAggregator, ConversationSentiment, MissingResourceError, SentimentAnalyzer,
+    export_results
+)
+
+
+class SentimentPipeline:
+    """
+    Scores user messages on a background thread, in submission order
+
+    A single worker folds each message into the aggregator, so Tier 1 output
+    only has to wait for messages still being scored. The conversation
+    snapshot is built when asked for and reused until the next message is
+    scored, so the cost per message stays constant. The interactive loop spends its time in
+    input(), which releases the GIL, so a thread is enough and the
+    aggregator does not have to be shipped to another process.
+    """
+
+    def __init__(self, conversation: ConversationAggregator):
+        """
+        Start the worker
+
+        Args:
+            conversation: Aggregator that receives the scored messages; it
+                must not be used from other threads while the pipeline runs
+        """
+        self.conversation = conversation
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment")
+        self._last: Optional[Future] = None
+        self._snapshot: Optional[ConversationSentiment] = None
+
+    def submit(self, message: Dict) -> Future:
+        """
+        Queue a message for scoring
+
+        Args:
+            message: Message dictionary with 'role' and 'content' keys
+
+        Returns:
+            Future of the message's SentimentResult (None if the message is
+            ignored by the aggregator)
+        """
+        self._last = self._executor.submit(self._score, message)
+        return self._last
+
+    def _score(self, message: Dict):
+        result = self.conversation.add_message(message)
+        if result is not None:
+            self._snapshot = None
+        return result
+
+    def drain(self):
+        """Wait until every submitted message is scored"""
+        if self._last is not None:
+            # One worker: the last future finishes after all earlier ones
+            self._last.exception()
+
+    def snapshot(self) -> ConversationSentiment:
+        """
+        Conversation-level analysis including every submitted message
+
+        Returns:
+            The snapshot, built once per scored message
+
+        Raises:
+            ValueError: If no user message has been scored
+        """
+        self.drain()
+        # The worker is idle now, so the aggregator can be read here
+        if self._snapshot is None:
+            self._snapshot = self.conversation.snapshot()
+        return self._snapshot
+
+    def close(self):
+        """Finish queued messages and stop the worker"""
+        self._executor.shutdown(wait=True)
 
 
 class ChatbotInterface:
     """Main interface for interactive chatbot session"""
 
-    def __init__(self):
-        self.chatbot = Chatbot(name="SentimentBot")
-        self.analyzer = SentimentAnalyzer()
+    def __init__(self, pipelined: bool = True, max_history: Optional[int] = None):
+        """
+        Args:
+            pipelined: Reply first and score each message in the background,
+                printing the Tier 2 panel when it is ready; False scores
+                every message before replying
+            max_history: Keep only this many recent messages (and message
+                sentiments) for always-on sessions; summaries still cover
+                the whole session
+        """
+        self.chatbot = Chatbot(name="SentimentBot", max_history=max_history)
+        self.analyzer = SentimentAnalyzer(cache_size=1024, long_text_threshold=20000).prepare()
+        # Running Tier 1 state, fed once per user message
+        self.conversation = ConversationAggregator(self.analyzer, max_messages=max_history)
+        self.pipeline = SentimentPipeline(self.conversation) if pipelined else None
         self.show_statement_sentiment = True  # Tier 2 enabled by default
+        # Background panels and the main loop take turns writing to stdout
+        self._output_lock = threading.Lock()
+        self._awaiting_input = False
 
     def display_welcome(self):
         print("\n===========================================================")
@@ -28,17 +123,52 @@ class ChatbotInterface:
    
     # TIER 2: STATEMENT LEVEL ANALYSIS
 
-    def display_statement_sentiment(self, text: str):
-        """Tier 2: Statement-level sentiment analysis"""
+    def record_user_message(self, text: str):
+        """Add a user message to the history and score it exactly once"""
+        message = self.chatbot.add_message("user", text)
         try:
-            result = self.analyzer.analyze_statement(text)
-            print("\n[TIER 2: Statement-Level Sentiment Analysis]")
-            print(f"  Sentiment:     {result.label}")
-            print(f"  Score:         {result.score:+.3f}")
-            print(f"  Confidence:    {result.confidence:.2%}")
-            print(f"  Subjectivity:  {result.textblob_subjectivity:.2%}\n")
+            return self.conversation.add_message(message)
         except ValueError as e:
             print(f"\nError analyzing statement: {e}\n")
+            return None
+
+    def submit_user_message(self, text: str) -> Future:
+        """Add a user message to the history and queue it for background scoring"""
+        message = self.chatbot.add_message("user", text)
+        return self.pipeline.submit(message)
+
+    def _on_scored(self, future: Future):
+        """Print the Tier 2 panel (or the error) of a background result"""
+        try:
+            result = future.result()
+        except ValueError as e:
+            with self._output_lock:
+                print(f"\nError analyzing statement: {e}\n")
+            return
+        except Exception as e:
+            # Anything else would be swallowed by the done-callback
+            with self._output_lock:
+                print(f"\nError analyzing statement: {type(e).__name__}: {e}\n")
+            return
+        if not self.show_statement_sentiment or result is None:
+            return
+        with self._output_lock:
+            self.display_statement_sentiment(result)
+            if self._awaiting_input:
+                # The panel landed after the prompt; show it again
+                print("You: ", end="", flush=True)
+
+    def display_statement_sentiment(self, result):
+        """Tier 2: Statement-level sentiment analysis"""
+        if result is None:
+            return
+        print("\n[TIER 2: Statement-Level Sentiment Analysis]")
+        print(f"  Sentiment:     {result.label}")
+        print(f"  Score:         {result.score:+.3f}")
+        print(f"  Confidence:    {result.confidence:.2%}")
+        if result.textblob_subjectivity is not None:
+            print(f"  Subjectivity:  {result.textblob_subjectivity:.2%}")
+        print()
   
     # TIER 1: CONVERSATION LEVEL ANALYSIS
     
@@ -50,40 +180,86 @@ class ChatbotInterface:
                 print("\nNo messages yet to analyze.\n")
                 return
 
-            analysis = self.analyzer.analyze_conversation(history)
-
-            
-            print("\n[TIER 1: Conversation-Level Sentiment Analysis]\n")
-
-            print(f"Overall Sentiment: {analysis.overall_label}")
-            print(f"Overall Score:     {analysis.overall_score:.3f}")
-            print(f"Avg Confidence:    {analysis.average_confidence:.2%}")
-
-            print("\nMessage Breakdown:")
-            print(f"  Total:    {analysis.total_messages}")
-            print(f"  Positive: {analysis.positive_count}")
-            print(f"  Negative: {analysis.negative_count}")
-            print(f"  Neutral:  {analysis.neutral_count}")
-
-            interpretation = {
-                "Positive": "overall positivity",
-                "Negative": "general dissatisfaction",
-                "Neutral": "balanced or mixed sentiment"
-            }
-
-            print("\nFinal Output:")
-            print(f"Overall conversation sentiment: {analysis.overall_label} – {interpretation.get(analysis.overall_label, '')}")
-
-            print("\nSentiment Trend:")
-            print(f"  {analysis.trend}")
-
-            print("\nEmotional Progression:")
-            print("  " + " → ".join(analysis.emotional_progression))
-
-            print()
-
+            # Taken before the output lock: it may wait for a background
+            # result whose panel needs the lock
+            analysis = self.conversation_snapshot()
         except ValueError as e:
             print(f"\nError analyzing conversation: {e}\n")
+            return
+
+        with self._output_lock:
+            self._print_conversation_sentiment(analysis)
+
+    def _print_conversation_sentiment(self, analysis: ConversationSentiment):
+        print("\n[TIER 1: Conversation-Level Sentiment Analysis]\n")
+        print(f"Overall Sentiment: {analysis.overall_label}")
+        print(f"Overall Score:     {analysis.overall_score:.3f}")
+        print(f"Avg Confidence:    {analysis.average_confidence:.2%}")
+
+        print("\nMessage Breakdown:")
+        print(f"  Total:    {analysis.total_messages}")
+        print(f"  Positive: {analysis.positive_count}")
+        print(f"  Negative: {analysis.negative_count}")
+        print(f"  Neutral:  {analysis.neutral_count}")
+
+        interpretation = {
+            "Positive": "overall positivity",
+            "Negative": "general dissatisfaction",
+            "Neutral": "balanced or mixed sentiment"
+        }
+
+        print("\nFinal Output:")
+        print(f"Overall conversation sentiment: {analysis.overall_label} – {interpretation.get(analysis.overall_label, '')}")
+
+        print("\nSentiment Trend:")
+        print(f"  {analysis.trend}")
+        print(f"  Last {analysis.window_size} messages: {analysis.window_trend}")
+        print(f"  Recent mood (EWMA {analysis.ewma_score:+.3f}): {analysis.ewma_trend}")
+
+        print("\nEmotional Progression:")
+        if analysis.rolled_up_messages:
+            print(f"  ({analysis.rolled_up_messages} earlier messages rolled up)")
+        print("  " + " → ".join(analysis.emotional_progression))
+
+        print()
+
+    def conversation_snapshot(self) -> ConversationSentiment:
+        """Current Tier 1 analysis, precomputed by the pipeline when it is on"""
+        if self.pipeline is not None:
+            return self.pipeline.snapshot()
+        return self.conversation.snapshot()
+
+    def respond(self, user_input: str):
+        """Score one user message, reply to it and print both"""
+        if self.pipeline is None:
+            result = self.record_user_message(user_input)
+
+            # Tier 2 output
+            if self.show_statement_sentiment:
+                self.display_statement_sentiment(result)
+
+            # Bot response
+            response = self.chatbot.generate_response(user_input)
+            self.chatbot.add_message("assistant", response)
+            print(f"\nBot: {response}\n")
+            return
+
+        # Scoring starts first but the reply does not wait for it
+        future = self.submit_user_message(user_input)
+        response = self.chatbot.generate_response(user_input)
+        self.chatbot.add_message("assistant", response)
+        with self._output_lock:
+            print(f"\nBot: {response}\n")
+        # Registered after the reply so the panel never prints above it
+        future.add_done_callback(self._on_scored)
+
+    def read_input(self) -> str:
+        """Prompt for the next line, noting that background output must re-prompt"""
+        self._awaiting_input = True
+        try:
+            return input("You: ").strip()
+        finally:
+            self._awaiting_input = False
 
     # MAIN LOOP
   
@@ -92,7 +268,7 @@ class ChatbotInterface:
 
         while True:
             try:
-                user_input = input("You: ").strip()
+                user_input = self.read_input()
                 if not user_input:
                     continue
 
@@ -114,26 +290,16 @@ class ChatbotInterface:
                     continue
 
                 if cmd == "export":
-                    history = self.chatbot.get_history()
-                    if history:
-                        analysis = self.analyzer.analyze_conversation(history)
-                        export_results(analysis)
-                        print("\nExport completed.\n")
-                    else:
+                    try:
+                        analysis = self.conversation_snapshot()
+                    except ValueError:
                         print("\nNo conversation to export.\n")
+                        continue
+                    export_results(analysis)
+                    print("\nExport completed.\n")
                     continue
 
-                # Add user message
-                self.chatbot.add_message("user", user_input)
-
-                # Tier 2 output
-                if self.show_statement_sentiment:
-                    self.display_statement_sentiment(user_input)
-
-                # Bot response
-                response = self.chatbot.generate_response(user_input)
-                self.chatbot.add_message("assistant", response)
-                print(f"\nBot: {response}\n")
+                self.respond(user_input)
 
             except KeyboardInterrupt:
                 print("\nConversation interrupted.")
@@ -152,12 +318,26 @@ class ChatbotInterface:
 
        
         self.display_conversation_sentiment()
+        if self.pipeline is not None:
+            self.pipeline.close()
 
         print("Thank you for using SentimentBot!")
 
 
-def main():
-    ChatbotInterface().run()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive SentimentBot session")
+    parser.add_argument("--max-history", type=int, default=None,
+                        help="keep only this many recent messages, for always-on sessions")
+    args = parser.parse_args(argv)
+    if args.max_history is not None and args.max_history < 1:
+        parser.error("--max-history must be at least 1")
+
+    try:
+        interface = ChatbotInterface(max_history=args.max_history)
+    except MissingResourceError as e:
+        print(f"Error: {e}")
+        return
+    interface.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+"""
+Persistent Score Cache
+Statement scores kept in SQLite so they survive restarts
+
+Scores are keyed by a 16-byte BLAKE2 hash of the scoring version (engine
+settings, library versions and a digest of the lexicons) and the text
+with its whitespace collapsed, which does not change VADER or TextBlob
+scores. A lexicon or settings change therefore misses every old entry,
+and those entries are compacted away over time.
+
+The database runs in WAL mode, so any number of processes can read while
+one writes. Lookups for a whole batch or conversation are one query;
+writes are buffered and committed in batches. Every row carries a
+sequence number that is renewed when the row is used; once the numbers
+span more than max_entries, compaction deletes the rows that were not
+written or used within the last max_entries numbers, which bounds the
+table to max_entries rows.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Host parameters per query, well below SQLite's limit
+_QUERY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    seq INTEGER PRIMARY KEY,
+    key BLOB NOT NULL UNIQUE,
+    result TEXT NOT NULL
+)
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Text as it is keyed: whitespace runs collapsed, ends stripped"""
+    return " ".join(text.split())
+
+
+def cache_key(version: str, text: str) -> bytes:
+    """Persistent key of a text under a scoring version"""
+    digest = hashlib.blake2b(version.encode('utf-8'), digest_size=16)
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+
+class PersistentScoreCache:
+    """SQLite-backed key -> score record store shared between processes"""
+
+    def __init__(self, path: str, max_entries: int = 1_000_000, write_batch: int = 256,
+                 timeout: float = 30.0):
+        """
+        Open (or create) a cache database
+
+        Args:
+            path: SQLite database file
+            max_entries: Size at which compaction removes the least
+                recently used entries
+            write_batch: Buffered writes committed together
+            timeout: Seconds to wait for another process's write lock
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.write_batch = write_batch
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False,
+                                           isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._pending: Dict[bytes, str] = {}
+        self._touched: Dict[bytes, None] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, Dict]:
+        """
+        Look up many keys at once
+
+        Args:
+            keys: Keys from cache_key()
+
+        Returns:
+            Stored records by key, for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[bytes, Dict] = {}
+        with self._lock:
+            for key in keys:
+                record = self._pending.get(key)
+                if record is not None:
+                    found[key] = json.loads(record)
+            remaining = [key for key in keys if key not in found]
+            for start in range(0, len(remaining), _QUERY_CHUNK):
+                chunk = remaining[start:start + _QUERY_CHUNK]
+                rows = self._connection.execute(
+                    f"SELECT key, result FROM scores WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for key, record in rows:
+                    found[key] = json.loads(record)
+                    self._touched[key] = None
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Look up one key"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[bytes, Dict]]):
+        """Buffer records for writing, committing once write_batch are pending"""
+        with self._lock:
+            for key, record in items:
+                self._pending[key] = json.dumps(record, separators=(',', ':'))
+            if len(self._pending) + len(self._touched) >= self.write_batch:
+                self._flush()
+
+    def put(self, key: bytes, record: Dict):
+        """Buffer one record for writing"""
+        self.put_many([(key, record)])
+
+    def flush(self):
+        """Commit buffered writes and usage updates"""
+        with self._lock:
+            self._flush()
+
+    def compact(self, vacuum: bool = False):
+        """
+        Delete the least recently used entries beyond max_entries
+
+        Args:
+            vacuum: Also rebuild the database file to return freed space
+        """
+        with self._lock:
+            self._flush()
+            self._compact()
+            if vacuum:
+                self._connection.execute("VACUUM")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM scores").fetchone()[0]
+
+    def info(self) -> Dict[str, int]:
+        """Hit, miss, write and compaction counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'pending': len(self._pending),
+                'compactions': self.compactions,
+                'max_entries': self.max_entries
+            }
+
+    def close(self):
+        """Commit buffered writes and close the database"""
+        with self._lock:
+            if self._connection is None:
+                return
+            self._flush()
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> "PersistentScoreCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _flush(self):
+        if not self._pending and not self._touched:
+            return
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            next_seq = connection.execute(
+                "SELECT coalesce(max(seq), 0) + 1 FROM scores"
+            ).fetchone()[0]
+            # Renew the sequence number of used rows, then upsert new ones
+            touched = [key for key in self._touched if key not in self._pending]
+            connection.executemany(
+                "UPDATE scores SET seq = ? WHERE key = ?",
+                [(next_seq + index, key) for index, key in enumerate(touched)]
+            )
+            next_seq += len(touched)
+            connection.executemany(
+                "INSERT INTO scores (seq, key, result) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET seq = excluded.seq, result = excluded.result",
+                [(next_seq + index, key, record)
+                 for index, (key, record) in enumerate(self._pending.items())]
+            )
+            next_seq += len(self._pending)
+            self.writes += len(self._pending)
+            # seq grows by one per write or use, so the span bounds the row count
+            oldest = connection.execute("SELECT min(seq) FROM scores").fetchone()[0]
+            if oldest is not None and next_seq - oldest > self.max_entries * 1.1:
+                self._compact()
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._pending.clear()
+        self._touched.clear()
+
+    def _compact(self):
+        newest = self._connection.execute("SELECT max(seq) FROM scores").fetchone()[0]
+        if newest is None:
+            return
+        deleted = self._connection.execute(
+            "DELETE FROM scores WHERE seq <= ?", (newest - self.max_entries,)
+        ).rowcount
+        if deleted:
+            self.compactions += 1
+
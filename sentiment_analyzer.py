@@ -6,28 +6,86 @@ This module provides robust sentiment analysis using dual-engine approach:
 - VADER: For social media and real-time text
 - TextBlob: For polarity and subjectivity scoring
 
+NLTK and TextBlob are imported, and the VADER lexicon is loaded, on first
+use rather than at import time. Nothing is downloaded automatically; call
+SentimentAnalyzer.prepare() to load everything up front and fail early if
+the data is missing.
+
 Author: Assignment Solution
 Date: 2025
 """
 
-from textblob import TextBlob
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
-from typing import Dict, List, Tuple
+from typing import Dict, IO, Iterator, List, Optional, Sequence, Tuple, Union
+import copy
+import functools
+import hashlib
+import importlib
 import json
-from dataclasses import dataclass, asdict
+import itertools
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass, asdict, field, fields, replace
 from enum import Enum
 
-# Download required NLTK data
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
+from instrumentation import Metrics
+
+VADER_LEXICON_RESOURCE = "sentiment/vader_lexicon.zip"
+
+
+class MissingResourceError(LookupError):
+    """Raised when NLTK data required by an engine is not installed"""
+
+
+def _load_vader(lexicon_snapshot: Optional[str] = None):
+    """
+    Import NLTK and build a SentimentIntensityAnalyzer, with a clear error if data is missing
+
+    With a lexicon snapshot (see lexicon_snapshot.py) the analyzer looks
+    words up in the memory-mapped snapshot instead of parsing the lexicon.
+    """
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    if lexicon_snapshot:
+        from nltk.sentiment.vader import VaderConstants
+        from lexicon_snapshot import open_snapshot
+
+        vader = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        vader.lexicon_file = None
+        vader.lexicon = open_snapshot(lexicon_snapshot).vader
+        vader.constants = VaderConstants()
+        return vader
+
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        raise MissingResourceError(
+            f"NLTK resource '{VADER_LEXICON_RESOURCE}' is not installed. "
+            "Install it with: python -m nltk.downloader vader_lexicon"
+        ) from None
 
-try:
-    nltk.data.find('punkt')
-except LookupError:
-    nltk.download('punkt')
+
+def _load_textblob(lexicon_snapshot: Optional[str] = None):
+    """
+    Import TextBlob's pattern sentiment scorer
+
+    TextBlob(text).sentiment tokenizes text with the scorer's tokenizer and
+    scores the lowercased tokens; calling the scorer on prepared tokens
+    gives the same result without building a TextBlob per message. With a
+    lexicon snapshot that includes the pattern lexicon, the scorer reads
+    words from the snapshot instead of parsing TextBlob's XML lexicon.
+    """
+    if lexicon_snapshot:
+        from lexicon_snapshot import open_snapshot
+        snapshot = open_snapshot(lexicon_snapshot)
+        if snapshot.pattern is not None:
+            return snapshot.pattern_sentiment()
+    from textblob.en.sentiments import pattern_sentiment
+    return pattern_sentiment
 
 
 class SentimentLabel(Enum):
@@ -37,6 +95,13 @@ class SentimentLabel(Enum):
     NEUTRAL = "Neutral"
 
 
+class EngineMode(Enum):
+    """Sentiment engines used by SentimentAnalyzer"""
+    VADER = "vader"
+    TEXTBLOB = "textblob"
+    BOTH = "both"
+
+
 @dataclass
 class SentimentResult:
     """Data class for individual sentiment analysis result"""
@@ -45,14 +110,26 @@ class SentimentResult:
     score: float
     confidence: float
     vader_scores: Dict[str, float]
-    textblob_polarity: float
-    textblob_subjectivity: float
+    textblob_polarity: Optional[float] = None
+    textblob_subjectivity: Optional[float] = None
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return asdict(self)
 
 
+@dataclass
+class ChunkedSentimentResult(SentimentResult):
+    """
+    Sentiment of a long text scored chunk by chunk
+
+    Scores are the chunk scores weighted by chunk length; chunks holds
+    per-chunk detail (offsets and scores) when it was requested.
+    """
+    chunk_count: int = 0
+    chunks: Optional[List[Dict]] = None
+
+
 @dataclass
 class ConversationSentiment:
     """Data class for overall conversation sentiment analysis"""
@@ -64,27 +141,452 @@ class ConversationSentiment:
     neutral_count: int
     average_confidence: float
     trend: str
-    message_sentiments: List[Dict]
+    # A list of SentimentResult.to_dict() dictionaries, or the same items
+    # held as MessageSentimentColumns
+    message_sentiments: Sequence[Dict]
     emotional_progression: List[str]
+    # Recent-mood trends: the last window_size messages against the ones
+    # before them, and an exponentially weighted average against the mean
+    window_size: int = 0
+    window_score: Optional[float] = None
+    window_trend: str = ""
+    ewma_half_life: float = 0.0
+    ewma_score: Optional[float] = None
+    ewma_trend: str = ""
+    # "Previous->Next" label changes between consecutive messages, counted
+    # over the whole session, and the messages missing from
+    # message_sentiments because a rolling aggregator dropped their detail
+    label_transitions: Dict[str, int] = field(default_factory=dict)
+    rolled_up_messages: int = 0
 
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
+        if isinstance(self.message_sentiments, MessageSentimentColumns):
+            document = asdict(replace(self, message_sentiments=[]))
+            document['message_sentiments'] = list(self.message_sentiments)
+            return document
         return asdict(self)
 
 
+_VADER_KEYS = ('neg', 'neu', 'pos', 'compound')
+_RESULT_FIELDS = frozenset(field.name for field in fields(SentimentResult))
+
+
+class MessageSentimentColumns(Sequence[Dict]):
+    """
+    Per-message sentiments of a conversation stored column by column
+
+    Labels are one-byte codes into LABELS, and scores, confidences, TextBlob
+    polarity and subjectivity and the four VADER scores are contiguous
+    array('d') columns, with NaN standing for None (or for missing VADER
+    scores); texts are referenced, not copied. Indexing or iterating builds
+    the SentimentResult.to_dict() dictionary of a message on demand, so
+    the dictionaries only exist while an analysis is being serialized.
+
+    Columns only grow. view() returns a read-only copy of the current
+    length that shares the columns, which is how snapshots avoid copying.
+    """
+
+    LABELS = tuple(label.value for label in SentimentLabel)
+    COLUMNS = ('label', 'score', 'confidence', 'textblob_polarity', 'textblob_subjectivity',
+               *_VADER_KEYS)
+
+    def __init__(self):
+        self._texts: List[str] = []
+        self._columns: Dict[str, array] = {
+            name: array('b' if name == 'label' else 'd') for name in self.COLUMNS
+        }
+        # Fields beyond SentimentResult's (e.g. chunk details), by position
+        self._extras: Dict[int, Dict] = {}
+        self._stop: Optional[int] = None
+
+    def append(self, result: SentimentResult):
+        """
+        Add the next message's result
+
+        Args:
+            result: SentimentResult (or subclass) of the message
+        """
+        if self._stop is not None:
+            raise ValueError("MessageSentimentColumns views are read-only")
+        columns = self._columns
+        columns['label'].append(self.LABELS.index(result.label))
+        columns['score'].append(result.score)
+        columns['confidence'].append(result.confidence)
+        for name in ('textblob_polarity', 'textblob_subjectivity'):
+            value = getattr(result, name)
+            columns[name].append(math.nan if value is None else value)
+        vader_scores = result.vader_scores
+        for key in _VADER_KEYS:
+            columns[key].append(vader_scores[key] if vader_scores else math.nan)
+        if type(result) is not SentimentResult:
+            extras = {name: value for name, value in result.to_dict().items()
+                      if name not in _RESULT_FIELDS}
+            if extras:
+                self._extras[len(self._texts)] = extras
+        self._texts.append(result.text)
+
+    def view(self) -> "MessageSentimentColumns":
+        """Read-only sequence of the messages added so far"""
+        view = MessageSentimentColumns.__new__(MessageSentimentColumns)
+        view._texts = self._texts
+        view._columns = self._columns
+        view._extras = self._extras
+        view._stop = len(self)
+        return view
+
+    def column(self, name: str) -> Union[array, List[str]]:
+        """
+        One column as a copy
+
+        Args:
+            name: 'text' or one of COLUMNS; 'label' holds indexes into
+                LABELS and VADER scores are named 'neg', 'neu', 'pos' and
+                'compound'
+
+        Returns:
+            array('b') or array('d'), or a list for 'text'
+        """
+        if name == 'text':
+            return self._texts[:len(self)]
+        if name not in self._columns:
+            raise ValueError(f"Unknown column: {name}")
+        return self._columns[name][:len(self)]
+
+    def labels(self) -> List[str]:
+        """Label of every message"""
+        return [self.LABELS[code] for code in self.column('label')]
+
+    def __len__(self) -> int:
+        return len(self._texts) if self._stop is None else self._stop
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(position) for position in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("message index out of range")
+        return self._item(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self._item(index)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (list, MessageSentimentColumns)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"<MessageSentimentColumns of {len(self)} messages>"
+
+    def _item(self, index: int) -> Dict:
+        columns = self._columns
+        compound = columns['compound'][index]
+        item = {
+            'text': self._texts[index],
+            'label': self.LABELS[columns['label'][index]],
+            'score': columns['score'][index],
+            'confidence': columns['confidence'][index],
+            'vader_scores': ({} if math.isnan(compound) else
+                             {key: columns[key][index] for key in _VADER_KEYS}),
+        }
+        for name in ('textblob_polarity', 'textblob_subjectivity'):
+            value = columns[name][index]
+            item[name] = None if math.isnan(value) else value
+        extras = self._extras.get(index)
+        if extras:
+            item.update(extras)
+        return item
+
+
+class PreparedText:
+    """
+    A message normalized and tokenized once for every consumer
+
+    - words: the text split on whitespace, as VADER splits it
+    - tokens: TextBlob's tokenization, lowercased, computed on first use;
+      scored by the TextBlob engine
+
+    Instances are shared through the analyzer's preprocessing cache and
+    must not be mutated.
+    """
+
+    __slots__ = ('text', 'lower', 'words', '_tokens', '_tokenizer')
+
+    def __init__(self, text: str, tokenizer):
+        self.text = text
+        self.lower = text.lower()
+        self.words = text.split()
+        self._tokens: Optional[List[str]] = None
+        self._tokenizer = tokenizer
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercased word and punctuation tokens"""
+        if self._tokens is None:
+            self._tokens = [token.lower() for token in " ".join(self._tokenizer(self.text)).split()]
+        return self._tokens
+
+
+# Sentence ends: terminal punctuation, optional closing quotes/brackets, whitespace
+_SENTENCE_END = re.compile(r'[.!?]+[\'")\]’”]*\s+')
+
+
+def iter_text_chunks(text: str, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split a text into spans of at most chunk_size characters
+
+    Each span ends at the last paragraph break in its window, else at the
+    last sentence end, else at the last whitespace, else it is cut hard.
+    A boundary is only used if it keeps the span at least half full, so
+    a break near the start does not produce a tiny chunk. Spans are
+    produced lazily and whitespace-only spans are skipped.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum span length in characters
+
+    Returns:
+        Iterator of (start, end) offsets into text
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            low = start + chunk_size // 2
+            cut = text.rfind('\n\n', low, end)
+            if cut == -1:
+                sentence_end = None
+                for sentence_end in _SENTENCE_END.finditer(text, low, end):
+                    pass
+                if sentence_end is not None:
+                    cut = sentence_end.end()
+            if cut == -1:
+                cut = max(text.rfind(' ', low, end), text.rfind('\n', low, end))
+            if cut > start:
+                end = cut
+        if not text[start:end].isspace():
+            yield start, end
+        start = end
+
+
+def _instrumented(operation: str, count_messages):
+    """
+    Time and count calls of an analyzer method while its metrics are enabled
+
+    Args:
+        operation: Operation name used in the metrics
+        count_messages: Maps the method's return value to the number of
+            messages it covered
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if not metrics.enabled:
+                return method(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            if metrics.should_profile():
+                result = metrics.profile_call(method, self, *args, **kwargs)
+            else:
+                result = method(self, *args, **kwargs)
+            metrics.observe_operation(operation, time.perf_counter() - start,
+                                      count_messages(result))
+            return result
+        return wrapper
+    return decorate
+
+
 class SentimentAnalyzer:
     """Production-grade sentiment analysis engine"""
 
-    def __init__(self):
-        """Initialize the sentiment analyzer with VADER and TextBlob"""
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, cache_size: int = 0, engine: str = EngineMode.BOTH.value,
+                 vectorized: bool = False, instrument: bool = False,
+                 preprocess_cache_size: int = 1024, long_text_threshold: int = 0,
+                 chunk_size: int = 2000, chunk_details: bool = False,
+                 lexicon_snapshot: Optional[str] = None,
+                 persistent_cache: Optional[str] = None):
+        """
+        Initialize the sentiment analyzer with VADER and TextBlob
+
+        Args:
+            cache_size: Maximum number of statement results kept in the
+                in-memory LRU cache (0 disables caching)
+            engine: Engine mode - 'vader', 'textblob' or 'both'. 'vader'
+                skips TextBlob entirely; 'textblob' labels and scores by
+                TextBlob polarity instead of the VADER compound score
+            vectorized: Score VADER for conversations and batches with the
+                NumPy engine in vader_vectorized (requires numpy)
+            instrument: Start with metrics collection enabled; it can be
+                switched at any time through self.metrics
+            preprocess_cache_size: Maximum number of PreparedText entries
+                kept for repeated inputs (0 disables the cache)
+            long_text_threshold: Texts longer than this many characters are
+                scored in chunks by analyze_long_text() (0 disables)
+            chunk_size: Maximum chunk length in characters for long texts
+            chunk_details: Keep per-chunk scores on long-text results
+            lexicon_snapshot: Binary lexicon snapshot built with
+                `python -m lexicon_snapshot build`; the lexicons are then
+                memory-mapped instead of parsed in every process
+            persistent_cache: SQLite file of the persistent score cache
+                (see score_cache.py), shared by processes and restarts
+        """
+        if cache_size < 0:
+            raise ValueError("cache_size cannot be negative")
+        if preprocess_cache_size < 0:
+            raise ValueError("preprocess_cache_size cannot be negative")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if long_text_threshold < 0:
+            raise ValueError("long_text_threshold cannot be negative")
+        if long_text_threshold and long_text_threshold < chunk_size:
+            raise ValueError("long_text_threshold cannot be smaller than chunk_size")
+
+        try:
+            self.engine = EngineMode(engine)
+        except ValueError:
+            valid = ", ".join(mode.value for mode in EngineMode)
+            raise ValueError(f"Unknown engine '{engine}', expected one of: {valid}") from None
+
+        self.lexicon_snapshot = lexicon_snapshot
+        self._vader_analyzer = None
+        self._textblob = None
+        self._resource_lock = threading.RLock()
+        self.vectorized = vectorized
+        self._vectorized_vader = None
         self.threshold_positive = 0.05
         self.threshold_negative = -0.05
+        # Defaults for the windowed and exponentially weighted trends
+        self.trend_window = 10
+        self.trend_half_life = 5.0
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, SentimentResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        self.long_text_threshold = long_text_threshold
+        self.chunk_size = chunk_size
+        self.chunk_details = chunk_details
+
+        # Scores that survive restarts, keyed under scoring_version()
+        self.persistent_cache_path = persistent_cache
+        self.persistent_cache = None
+        if persistent_cache:
+            from score_cache import PersistentScoreCache
+            self.persistent_cache = PersistentScoreCache(persistent_cache)
+        self._lexicon_digest: Optional[str] = None
 
+        self.preprocess_cache_size = preprocess_cache_size
+        self._preprocessed: "OrderedDict[str, PreparedText]" = OrderedDict()
+        self.preprocess_hits = 0
+        self.preprocess_misses = 0
+
+        # Process pool for analyze_batch, created on first use
+        self._executor = None
+        self._executor_config = None
+
+        self.metrics = Metrics(enabled=instrument)
+
+    @property
+    def vader_analyzer(self):
+        """NLTK SentimentIntensityAnalyzer, loaded on first use"""
+        if self._vader_analyzer is None:
+            with self._resource_lock:
+                if self._vader_analyzer is None:
+                    self._vader_analyzer = _load_vader(self.lexicon_snapshot)
+        return self._vader_analyzer
+
+    def prepare(self) -> "SentimentAnalyzer":
+        """
+        Load every resource the configured engines need
+
+        Call this at startup to move lexicon loading out of the first
+        request and to fail fast when NLTK data is missing.
+
+        Returns:
+            The analyzer itself, for chaining
+
+        Raises:
+            MissingResourceError: If required NLTK data is not installed
+        """
+        if self.engine is not EngineMode.TEXTBLOB:
+            self.vader_analyzer
+            if self.vectorized:
+                self.vectorized_vader
+        if self.engine is not EngineMode.VADER:
+            # The pattern scorer parses its lexicon on the first call
+            self._get_textblob()(self.preprocess("warm up").tokens)
+        return self
+
+    def _get_textblob(self):
+        """TextBlob's pattern sentiment scorer, imported on first use"""
+        if self._textblob is None:
+            self._textblob = _load_textblob(self.lexicon_snapshot)
+        return self._textblob
+
+    def _tokenize(self, text: str) -> List[str]:
+        """TextBlob's word tokenizer, loaded on first use"""
+        return self._get_textblob().tokenizer(text)
+
+    def preprocess(self, text: str) -> PreparedText:
+        """
+        Normalize and tokenize a message once for all consumers
+
+        Repeated inputs are served from the preprocessing LRU cache.
+
+        Args:
+            text: The message
+
+        Returns:
+            Shared PreparedText for the message
+        """
+        if not self.preprocess_cache_size:
+            return PreparedText(text, self._tokenize)
+
+        with self._cache_lock:
+            prepared = self._preprocessed.get(text)
+            if prepared is not None:
+                self._preprocessed.move_to_end(text)
+                self.preprocess_hits += 1
+                return prepared
+            self.preprocess_misses += 1
+
+        prepared = PreparedText(text, self._tokenize)
+        with self._cache_lock:
+            self._preprocessed[text] = prepared
+            while len(self._preprocessed) > self.preprocess_cache_size:
+                self._preprocessed.popitem(last=False)
+        return prepared
+
+    def preprocess_info(self) -> Dict[str, int]:
+        """Return preprocessing cache statistics"""
+        with self._cache_lock:
+            return {
+                'hits': self.preprocess_hits,
+                'misses': self.preprocess_misses,
+                'size': len(self._preprocessed),
+                'max_size': self.preprocess_cache_size
+            }
+
+    @_instrumented('analyze_statement', lambda result: 1)
     def analyze_statement(self, text: str) -> SentimentResult:
         """
         Analyze sentiment of a single statement (Tier 2 Feature)
         
+        Results are served from the LRU cache when enabled; cached
+        results are shared between callers and must not be mutated.
+
         Args:
             text: The text to analyze
             
@@ -94,103 +596,556 @@ class SentimentAnalyzer:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
+        if self.persistent_cache is not None:
+            return self._analyze_many([text])[0]
+        if not self.cache_size:
+            return self._score_statement(text)
+
+        key = self._cache_key(text)
+        result = self._cache_get(key)
+        if result is None:
+            result = self._score_statement(text)
+            self._cache_put(key, result)
+
+        return result
+
+    @_instrumented('analyze_long_text', lambda result: 1)
+    def analyze_long_text(self, text: str, workers: int = 1,
+                          details: Optional[bool] = None) -> ChunkedSentimentResult:
+        """
+        Analyze a long text in chunks with bounded memory
+
+        The text is split at paragraph and sentence boundaries into chunks
+        of at most chunk_size characters, which are scored a group at a
+        time, and the scores are combined weighted by chunk length.
+        analyze_statement() and the batch and conversation methods use
+        this automatically for texts over long_text_threshold.
+
+        Args:
+            text: The text to analyze
+            workers: Worker processes scoring the chunks in parallel (1
+                scores them in the current process, one group at a time)
+            details: Keep per-chunk scores (default: self.chunk_details)
+
+        Returns:
+            ChunkedSentimentResult combining the chunk scores
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        return self._score_long_text(text, workers,
+                                     self.chunk_details if details is None else details)
+
+    def _score_long_text(self, text: str, workers: int, details: bool) -> ChunkedSentimentResult:
+        """Score the chunks of a text and combine them weighted by chunk length"""
+        spans = iter_text_chunks(text, self.chunk_size)
+        group_size = max(64, workers * 16)
+        chunk_count = 0
+        total_weight = 0
+        score_sum = 0.0
+        vader_sums = {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+        polarity_sum = 0.0
+        subjectivity_sum = 0.0
+        chunk_records = [] if details else None
+
+        while True:
+            group = list(itertools.islice(spans, group_size))
+            if not group:
+                break
+            chunks = [text[start:end].strip() for start, end in group]
+            if workers > 1:
+                results = self._analyze_in_pool(chunks, workers, use_cache=False)
+            else:
+                results = self._analyze_many(chunks, use_cache=False)
+
+            for (start, end), chunk, result in zip(group, chunks, results):
+                weight = len(chunk)
+                chunk_count += 1
+                total_weight += weight
+                score_sum += result.score * weight
+                for key in vader_sums:
+                    vader_sums[key] += result.vader_scores.get(key, 0.0) * weight
+                if result.textblob_polarity is not None:
+                    polarity_sum += result.textblob_polarity * weight
+                    subjectivity_sum += result.textblob_subjectivity * weight
+                if details:
+                    chunk_records.append({
+                        'start': start, 'end': end, 'label': result.label,
+                        'score': result.score, 'confidence': result.confidence
+                    })
+
+        score = score_sum / total_weight
+        uses_vader = self.engine is not EngineMode.TEXTBLOB
+        uses_textblob = self.engine is not EngineMode.VADER
+        return ChunkedSentimentResult(
+            text=text,
+            label=self._label_for(score),
+            score=score,
+            confidence=abs(score),
+            vader_scores=({key: value / total_weight for key, value in vader_sums.items()}
+                          if uses_vader else {}),
+            textblob_polarity=polarity_sum / total_weight if uses_textblob else None,
+            textblob_subjectivity=subjectivity_sum / total_weight if uses_textblob else None,
+            chunk_count=chunk_count,
+            chunks=chunk_records
+        )
+
+    def _is_long(self, text: str) -> bool:
+        """Whether a text is scored in chunks"""
+        return bool(self.long_text_threshold) and len(text) > self.long_text_threshold
+
+    @_instrumented('analyze_batch', len)
+    def analyze_batch(self, texts: List[str], workers: Optional[int] = None,
+                      chunksize: Optional[int] = None) -> List[SentimentResult]:
+        """
+        Analyze many statements across a pool of worker processes
+
+        Each worker builds its own SentimentAnalyzer once and then scores
+        its share of the texts. The pool is kept for later calls until
+        close() is called.
+
+        Args:
+            texts: Statements to analyze
+            workers: Number of worker processes (defaults to the CPU count,
+                1 scores in the current process); the pool is keyed on this
+                count, so batches smaller than it reuse the same pool
+            chunksize: Number of texts sent to a worker at a time
+
+        Returns:
+            SentimentResult objects in the same order as texts
+        """
+        texts = list(texts)
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        if workers <= 1 or len(texts) <= 1:
+            return self._analyze_many(texts)
+
+        return self._analyze_in_pool(texts, workers, chunksize)
+
+    def _analyze_in_pool(self, texts: List[str], workers: int, chunksize: Optional[int] = None,
+                         use_cache: bool = True) -> List[SentimentResult]:
+        """Score texts on the worker pool; without use_cache the workers' caches are bypassed"""
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(texts) / (workers * 4)))
+
+        chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+        executor = self._get_executor(workers)
+        results = []
+        for chunk_results in executor.map(_analyze_chunk_in_worker, chunks,
+                                          itertools.repeat(use_cache)):
+            results.extend(chunk_results)
+        return results
+
+    def submit(self, texts: List[str], workers: int):
+        """
+        Schedule a chunk of statements on the analyze_batch worker pool
+
+        Unlike analyze_batch this returns immediately, which lets callers
+        such as the asyncio server await the result.
+
+        Args:
+            texts: Non-empty statements to analyze
+            workers: Size of the worker pool
+
+        Returns:
+            concurrent.futures.Future resolving to the SentimentResult list
+        """
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+        return self._get_executor(workers).submit(_analyze_chunk_in_worker, list(texts))
+
+    def close(self):
+        """Shut down the analyze_batch worker pool, if any, and commit persistent scores"""
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_config = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_executor(self, workers: int):
+        """Return a worker pool of the requested size configured like this analyzer"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        settings = self._worker_settings()
+        config = (workers, tuple(sorted(settings.items())))
+        if self._executor is not None and self._executor_config != config:
+            self.close()
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_batch_worker,
+                initargs=(settings,)
+            )
+            self._executor_config = config
+
+        return self._executor
+
+    def _worker_settings(self) -> Dict:
+        """Settings needed to rebuild an equivalent analyzer in a worker process"""
+        return {
+            'engine': self.engine.value,
+            'vectorized': self.vectorized,
+            'cache_size': self.cache_size,
+            'threshold_positive': self.threshold_positive,
+            'threshold_negative': self.threshold_negative,
+            'long_text_threshold': self.long_text_threshold,
+            'chunk_size': self.chunk_size,
+            'chunk_details': self.chunk_details,
+            'lexicon_snapshot': self.lexicon_snapshot,
+            'persistent_cache': self.persistent_cache_path
+        }
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return statement cache statistics"""
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'evictions': self.cache_evictions,
+                'size': len(self._cache),
+                'max_size': self.cache_size
+            }
+
+    def clear_cache(self):
+        """Drop all cached statement results and preprocessed texts and reset the counters"""
+        with self._cache_lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.cache_evictions = 0
+            self._preprocessed.clear()
+            self.preprocess_hits = 0
+            self.preprocess_misses = 0
+
+    def metrics_snapshot(self) -> Dict:
+        """Instrumentation data plus cache statistics, as a dictionary"""
+        snapshot = self.metrics.snapshot()
+        snapshot['cache'] = self.cache_info()
+        snapshot['preprocess_cache'] = self.preprocess_info()
+        if self.persistent_cache is not None:
+            snapshot['persistent_cache'] = self.persistent_cache.info()
+        return snapshot
+
+    def metrics_text(self) -> str:
+        """Instrumentation data plus cache statistics in Prometheus text format"""
+        gauges = {f'cache_{name}': value for name, value in self.cache_info().items()}
+        gauges.update({f'preprocess_cache_{name}': value
+                       for name, value in self.preprocess_info().items()})
+        if self.persistent_cache is not None:
+            gauges.update({f'persistent_cache_{name}': value
+                           for name, value in self.persistent_cache.info().items()})
+        return self.metrics.prometheus(gauges=gauges)
+
+    def _cache_key(self, text: str) -> Tuple:
+        """Cache key covering the text and every setting that affects the result"""
+        return (text, self.engine, self.vectorized,
+                self.threshold_positive, self.threshold_negative,
+                self.long_text_threshold, self.chunk_size, self.chunk_details)
+
+    def scoring_version(self) -> str:
+        """
+        Identifier of everything that determines a statement's scores
+
+        Covers the engine settings, the NLTK and TextBlob versions and a
+        digest of the lexicons in use, so persistent scores computed under
+        other settings or lexicons are never reused.
+        """
+        if self._lexicon_digest is None:
+            import nltk
+            import textblob
+
+            digest = hashlib.sha1(f"{nltk.__version__}|{textblob.__version__}".encode('utf-8'))
+            if self.engine is not EngineMode.TEXTBLOB:
+                digest.update(repr(sorted(self.vader_analyzer.lexicon.items())).encode('utf-8'))
+            if self.engine is not EngineMode.VADER:
+                scorer = self._get_textblob()
+                digest.update(repr(sorted((word, scorer[word]) for word in scorer))
+                              .encode('utf-8'))
+            self._lexicon_digest = digest.hexdigest()
+        return (f"{self._lexicon_digest}|{self.engine.value}|{self.vectorized}|"
+                f"{self.threshold_positive!r}|{self.threshold_negative!r}")
+
+    def _persistent_lookup(self, texts: List[str]) -> Dict[str, SentimentResult]:
+        """Results for texts found in the persistent cache, in one query"""
+        from score_cache import cache_key
+
+        version = self.scoring_version()
+        keys = {cache_key(version, text): text for text in texts}
+        return {
+            keys[key]: SentimentResult(text=keys[key], **record)
+            for key, record in self.persistent_cache.get_many(keys).items()
+        }
+
+    def _persistent_store(self, results: List[SentimentResult]):
+        """Buffer newly scored results for the persistent cache"""
+        from score_cache import cache_key
+
+        version = self.scoring_version()
+        self.persistent_cache.put_many(
+            (cache_key(version, result.text), {
+                'label': result.label,
+                'score': result.score,
+                'confidence': result.confidence,
+                'vader_scores': result.vader_scores,
+                'textblob_polarity': result.textblob_polarity,
+                'textblob_subjectivity': result.textblob_subjectivity
+            })
+            for result in results
+        )
+
+    def _cache_get(self, key: Tuple) -> Optional[SentimentResult]:
+        """Look up a cached result, counting the hit or miss"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return result
+
+    def _cache_put(self, key: Tuple, result: SentimentResult):
+        """Store a result, evicting the least recently used entries"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.cache_evictions += 1
+
+    @property
+    def vectorized_vader(self):
+        """NumPy VADER engine compiled from this analyzer's lexicon"""
+        if self._vectorized_vader is None:
+            with self._resource_lock:
+                if self._vectorized_vader is None:
+                    from vader_vectorized import VectorizedVader
+                    self._vectorized_vader = VectorizedVader(self.vader_analyzer)
+        return self._vectorized_vader
+
+    def _analyze_many(self, texts: List[str], use_cache: bool = True) -> List[SentimentResult]:
+        """
+        Analyze non-empty statements together, scoring each distinct
+        uncached text once
+
+        Args:
+            texts: Statements to analyze
+            use_cache: Look up and store results and preprocessed texts in
+                the caches; off for long-text chunks, which would only
+                crowd out reusable entries
+
+        Returns:
+            SentimentResult objects in the same order as texts
+        """
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+
+        for index, text in enumerate(texts):
+            if text in pending:
+                pending[text].append(index)
+                continue
+            if use_cache and self.cache_size:
+                cached = self._cache_get(self._cache_key(text))
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            pending[text] = [index]
+
+        persistent = use_cache and self.persistent_cache is not None
+        if persistent and pending:
+            # One query for everything the in-memory cache did not have
+            for text, result in self._persistent_lookup(
+                    [text for text in pending if not self._is_long(text)]).items():
+                if self.cache_size:
+                    self._cache_put(self._cache_key(text), result)
+                for index in pending.pop(text):
+                    results[index] = result
+
+        pending_texts = list(pending)
+        # Long texts are chunked by _score_statement instead
+        short = [index for index, text in enumerate(pending_texts) if not self._is_long(text)]
+        prepared: List[Optional[PreparedText]] = [None] * len(pending_texts)
+        for index in short:
+            text = pending_texts[index]
+            prepared[index] = (self.preprocess(text) if use_cache
+                               else PreparedText(text, self._tokenize))
+        vader_scores = [None] * len(pending_texts)
+        if self.vectorized and self.engine is not EngineMode.TEXTBLOB and short:
+            start = time.perf_counter()
+            batch_scores = self.vectorized_vader.polarity_scores_batch(
+                [pending_texts[index] for index in short], [prepared[index].words for index in short]
+            )
+            for index, scores in zip(short, batch_scores):
+                vader_scores[index] = scores
+            if self.metrics.enabled:
+                self.metrics.observe_stages({'vader_batch': time.perf_counter() - start})
+
+        for text, scores, item in zip(pending_texts, vader_scores, prepared):
+            result = self._score_statement(text, scores, item)
+            if use_cache and self.cache_size:
+                self._cache_put(self._cache_key(text), result)
+            for index in pending[text]:
+                results[index] = result
+
+        if persistent and short:
+            self._persistent_store([results[pending[pending_texts[index]][0]] for index in short])
+
+        return results
+
+    def _score_statement(self, text: str,
+                         vader_scores: Optional[Dict[str, float]] = None,
+                         prepared: Optional[PreparedText] = None) -> SentimentResult:
+        """
+        Run the configured sentiment engines on a non-empty statement
+
+        Args:
+            text: The text to analyze
+            vader_scores: Precomputed VADER scores for text, if any
+            prepared: Preprocessed text (looked up with preprocess() if omitted)
+        """
+        if self._is_long(text):
+            return self._score_long_text(text, 1, self.chunk_details)
+
+        polarity = None
+        subjectivity = None
+        timed = self.metrics.enabled
+        if timed:
+            timings = {}
+            start = time.perf_counter()
+
         # VADER Analysis
-        vader_scores = self.vader_analyzer.polarity_scores(text)
-        
-        # TextBlob Analysis
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        if self.engine is EngineMode.TEXTBLOB:
+            vader_scores = {}
+        elif vader_scores is None:
+            vader_scores = self.vader_analyzer.polarity_scores(text)
+            if timed:
+                timings['vader'] = time.perf_counter() - start
 
-        # Determine label based on VADER compound score
-        compound = vader_scores['compound']
-        
-        if compound >= self.threshold_positive:
-            label = SentimentLabel.POSITIVE.value
-        elif compound <= self.threshold_negative:
-            label = SentimentLabel.NEGATIVE.value
+        # TextBlob Analysis, on the shared tokens
+        if self.engine is not EngineMode.VADER:
+            if timed:
+                start = time.perf_counter()
+            if prepared is None:
+                prepared = self.preprocess(text)
+            tokens = prepared.tokens
+            if timed:
+                tokenized = time.perf_counter()
+                timings['preprocess'] = tokenized - start
+            polarity, subjectivity = self._get_textblob()(tokens)
+            if timed:
+                timings['textblob_sentiment'] = time.perf_counter() - tokenized
+
+        if timed:
+            start = time.perf_counter()
+
+        # Label follows the VADER compound score unless VADER is disabled
+        if self.engine is EngineMode.TEXTBLOB:
+            score = polarity
         else:
-            label = SentimentLabel.NEUTRAL.value
+            score = vader_scores['compound']
+
+        label = self._label_for(score)
 
         # Calculate confidence based on intensity
-        confidence = abs(compound)
+        confidence = abs(score)
         
-        return SentimentResult(
+        result = SentimentResult(
             text=text,
             label=label,
-            score=compound,
+            score=score,
             confidence=confidence,
             vader_scores=vader_scores,
             textblob_polarity=polarity,
             textblob_subjectivity=subjectivity
         )
 
-    def analyze_conversation(self, messages: List[Dict]) -> ConversationSentiment:
+        if timed:
+            timings['label'] = time.perf_counter() - start
+            self.metrics.observe_stages(timings)
+            self.metrics.observe_length(len(text))
+        return result
+
+    def _label_for(self, score: float) -> str:
+        """Map a score onto a sentiment label using the configured thresholds"""
+        if score >= self.threshold_positive:
+            return SentimentLabel.POSITIVE.value
+        elif score <= self.threshold_negative:
+            return SentimentLabel.NEGATIVE.value
+        else:
+            return SentimentLabel.NEUTRAL.value
+
+    @_instrumented('analyze_conversation', lambda result: result.total_messages)
+    def analyze_conversation(self, messages: List[Dict], columnar: bool = False,
+                             summary_only: bool = False,
+                             rolled_up: Optional["ConversationAggregator"] = None
+                             ) -> ConversationSentiment:
         """
         Analyze sentiment for entire conversation (Tier 1 Feature)
         
         Args:
             messages: List of message dictionaries with 'role' and 'content' keys
+            columnar: Return message_sentiments as MessageSentimentColumns,
+                which builds each message's dictionary only when read
+            summary_only: Return the aggregates without per-message detail
+            rolled_up: Aggregator holding only the part of the session
+                before messages; messages continue it and the result covers
+                both (its detail options apply, and it is not modified).
+                Defaults to the rolled_up_sentiment of a rolling
+                ConversationHistory passed as messages
             
         Returns:
             ConversationSentiment object with conversation-level analysis
+
+        Raises:
+            ValueError: If there are no user messages, or messages is a
+                history with rolled-up messages but no rolled_up_sentiment
         """
-        if not messages:
+        if rolled_up is None and getattr(messages, 'rolled_up', 0):
+            # A rolled history's visible messages are only the end of the session
+            rolled_up = messages.rolled_up_sentiment
+            if rolled_up is None:
+                raise ValueError(f"{messages.rolled_up} messages have rolled out of the history; "
+                                 "attach a rolled_up_sentiment aggregator to analyze the session")
+
+        # Continuing a rolled-up session, an empty window is still a session
+        if not messages and rolled_up is None:
             raise ValueError("Messages list cannot be empty")
 
         user_messages = [
             msg for msg in messages if msg.get('role') == 'user'
         ]
 
-        if not user_messages:
+        if not user_messages and rolled_up is None:
             raise ValueError("No user messages found in conversation")
 
-        # Analyze each user message
-        sentiments = []
-        emotional_progression = []
-        
-        for msg in user_messages:
-            content = msg.get('content', '').strip()
-            if content:
-                result = self.analyze_statement(content)
-                sentiments.append(result)
-                emotional_progression.append(result.label)
-
-        # Calculate statistics
-        positive_count = sum(1 for s in sentiments if s.label == SentimentLabel.POSITIVE.value)
-        negative_count = sum(1 for s in sentiments if s.label == SentimentLabel.NEGATIVE.value)
-        neutral_count = sum(1 for s in sentiments if s.label == SentimentLabel.NEUTRAL.value)
-
-        # Calculate overall sentiment
-        average_score = sum(s.score for s in sentiments) / len(sentiments)
-        average_confidence = sum(s.confidence for s in sentiments) / len(sentiments)
-
-        # Determine overall label
-        if average_score >= self.threshold_positive:
-            overall_label = SentimentLabel.POSITIVE.value
-        elif average_score <= self.threshold_negative:
-            overall_label = SentimentLabel.NEGATIVE.value
-        else:
-            overall_label = SentimentLabel.NEUTRAL.value
-
-        # Determine trend (Tier 2 Enhancement)
-        trend = self._analyze_trend(sentiments)
+        contents = [msg.get('content', '').strip() for msg in user_messages]
+        contents = [content for content in contents if content]
 
-        # Convert sentiments to dictionaries
-        message_sentiments = [s.to_dict() for s in sentiments]
+        if rolled_up is not None:
+            aggregator = rolled_up.copy()
+        else:
+            aggregator = ConversationAggregator(self, columnar=columnar, summary_only=summary_only)
+        for result in self._analyze_many(contents):
+            aggregator.add_result(result)
 
-        return ConversationSentiment(
-            overall_label=overall_label,
-            overall_score=average_score,
-            total_messages=len(sentiments),
-            positive_count=positive_count,
-            negative_count=negative_count,
-            neutral_count=neutral_count,
-            average_confidence=average_confidence,
-            trend=trend,
-            message_sentiments=message_sentiments,
-            emotional_progression=emotional_progression
-        )
+        return aggregator.snapshot()
 
     def _analyze_trend(self, sentiments: List[SentimentResult]) -> str:
         """
@@ -203,26 +1158,466 @@ class SentimentAnalyzer:
             Trend description (Improving, Declining, or Stable)
         """
         if len(sentiments) < 2:
-            return "Insufficient data for trend analysis"
+            return _INSUFFICIENT_TREND_DATA
+
+        scores = [s.score for s in sentiments]
+        prefix_sums = [0.0]
+        for score in scores:
+            prefix_sums.append(prefix_sums[-1] + score)
+
+        return _describe_trend(prefix_sums)
+
+
+# Analyzer owned by an analyze_batch worker process
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_batch_worker(settings: Dict):
+    """Build the per-process analyzer once when a batch worker starts"""
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(
+        cache_size=settings['cache_size'],
+        engine=settings['engine'],
+        vectorized=settings['vectorized'],
+        long_text_threshold=settings['long_text_threshold'],
+        chunk_size=settings['chunk_size'],
+        chunk_details=settings['chunk_details'],
+        lexicon_snapshot=settings['lexicon_snapshot'],
+        persistent_cache=settings['persistent_cache']
+    )
+    _worker_analyzer.threshold_positive = settings['threshold_positive']
+    _worker_analyzer.threshold_negative = settings['threshold_negative']
+
+
+def _analyze_chunk_in_worker(texts: List[str], use_cache: bool = True) -> List[SentimentResult]:
+    """Score a chunk of statements with the worker's analyzer"""
+    results = _worker_analyzer._analyze_many(texts, use_cache)
+    if use_cache and _worker_analyzer.persistent_cache is not None:
+        # Worker processes may exit without a chance to commit later
+        _worker_analyzer.persistent_cache.flush()
+    return results
+
+
+class ConversationAggregator:
+    """
+    Incremental conversation-level sentiment (Tier 1)
+
+    Receives each user message once and keeps running counts, score and
+    confidence sums and the trend state, so a snapshot never rescores
+    earlier messages.
+
+    With max_messages the aggregator rolls for sessions that never end:
+    per-message detail is kept for the last max_messages messages only,
+    while counts, sums, the moving averages and label transitions still
+    cover the whole session. The first-half/second-half trend then uses
+    prefix sums thinned to at most _PREFIX_SAMPLES points, interpolating
+    at the midpoint, so memory stays constant.
+    """
+
+    def __init__(self, analyzer: SentimentAnalyzer, window_size: Optional[int] = None,
+                 half_life: Optional[float] = None, columnar: bool = False,
+                 summary_only: bool = False, max_messages: Optional[int] = None):
+        """
+        Initialize an empty aggregator
+
+        Args:
+            analyzer: SentimentAnalyzer used to score new messages and
+                whose thresholds determine the overall label
+            window_size: Messages in the sliding trend window (default:
+                analyzer.trend_window)
+            half_life: Messages after which a score's weight in the moving
+                average halves (default: analyzer.trend_half_life)
+            columnar: Keep per-message sentiments as MessageSentimentColumns
+                instead of a list of dictionaries
+            summary_only: Keep no per-message detail; snapshots have empty
+                message_sentiments and emotional_progression
+            max_messages: Keep per-message detail for this many recent
+                messages only (None keeps all)
+        """
+        window_size = analyzer.trend_window if window_size is None else window_size
+        half_life = analyzer.trend_half_life if half_life is None else half_life
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        if max_messages is not None and columnar:
+            raise ValueError("Columnar results cannot be rolled; use max_messages "
+                             "with dictionaries or summary_only")
+
+        self.analyzer = analyzer
+        self.window_size = window_size
+        self.half_life = half_life
+        self.columnar = columnar
+        self.summary_only = summary_only
+        self.max_messages = max_messages
+        self._ewma_alpha = 1 - 0.5 ** (1 / half_life)
+        self._count = 0
+        self.positive_count = 0
+        self.negative_count = 0
+        self.neutral_count = 0
+        self.score_sum = 0.0
+        self.confidence_sum = 0.0
+        if max_messages is not None:
+            self.message_sentiments: Union[List[Dict], MessageSentimentColumns, deque] = deque(
+                maxlen=max_messages)
+            self.emotional_progression: Union[List[str], deque] = deque(maxlen=max_messages)
+        else:
+            self.message_sentiments = (
+                MessageSentimentColumns() if columnar and not summary_only else []
+            )
+            self.emotional_progression = []
+        # (previous label, label) -> count over the whole session
+        self.label_transitions: Dict[Tuple[str, str], int] = {}
+        self._last_label: Optional[str] = None
+        # prefix_sums[i] is the sum of the first i * prefix_stride scores;
+        # the half-split trend is then two subtractions instead of two
+        # slice sums. The stride only grows in rolling mode.
+        self._prefix_sums = [0.0]
+        self._prefix_stride = 1
+        self._window = deque(maxlen=window_size)
+        self._window_sum = 0.0
+        self.ewma: Optional[float] = None
+
+    @property
+    def total_messages(self) -> int:
+        """Number of scored user messages"""
+        return self._count
+
+    @property
+    def rolled_up_messages(self) -> int:
+        """Scored messages whose detail has rolled out of a rolling aggregator"""
+        if self.summary_only:
+            return 0
+        return self._count - len(self.emotional_progression)
+
+    def copy(self) -> "ConversationAggregator":
+        """Independent copy of the aggregated state, sharing the analyzer"""
+        return copy.deepcopy(self, {id(self.analyzer): self.analyzer})
+
+    def add_message(self, message: Dict) -> Optional[SentimentResult]:
+        """
+        Score and fold in a single conversation message
+
+        Non-user messages and messages with blank content are ignored.
+
+        Args:
+            message: Message dictionary with 'role' and 'content' keys
+
+        Returns:
+            SentimentResult for the message, or None if it was ignored
+        """
+        if message.get('role') != 'user':
+            return None
+
+        content = message.get('content', '').strip()
+        if not content:
+            return None
+
+        result = self.analyzer.analyze_statement(content)
+        self.add_result(result)
+        return result
+
+    def add_result(self, result: SentimentResult):
+        """
+        Fold in an already computed statement result
+
+        Args:
+            result: SentimentResult of the next user message
+        """
+        if result.label == SentimentLabel.POSITIVE.value:
+            self.positive_count += 1
+        elif result.label == SentimentLabel.NEGATIVE.value:
+            self.negative_count += 1
+        elif result.label == SentimentLabel.NEUTRAL.value:
+            self.neutral_count += 1
+
+        if self._last_label is not None:
+            transition = (self._last_label, result.label)
+            self.label_transitions[transition] = self.label_transitions.get(transition, 0) + 1
+        self._last_label = result.label
+
+        self._count += 1
+        self.score_sum += result.score
+        self.confidence_sum += result.confidence
+        if self._count % self._prefix_stride == 0:
+            self._prefix_sums.append(self.score_sum)
+            if self.max_messages is not None and len(self._prefix_sums) > _PREFIX_SAMPLES:
+                self._prefix_sums = self._prefix_sums[::2]
+                self._prefix_stride *= 2
+
+        if len(self._window) == self.window_size:
+            self._window_sum -= self._window[0]
+        self._window.append(result.score)
+        self._window_sum += result.score
+        if self.ewma is None:
+            self.ewma = result.score
+        else:
+            self.ewma += self._ewma_alpha * (result.score - self.ewma)
+
+        if self.summary_only:
+            return
+        metrics = self.analyzer.metrics
+        start = time.perf_counter() if metrics.enabled else None
+        if self.columnar:
+            self.message_sentiments.append(result)
+        else:
+            self.message_sentiments.append(result.to_dict())
+        if start is not None:
+            metrics.observe_stages({'serialize': time.perf_counter() - start})
+        self.emotional_progression.append(result.label)
+
+    def reset(self):
+        """Discard all aggregated state"""
+        self.__init__(self.analyzer, self.window_size, self.half_life, self.columnar,
+                      self.summary_only, self.max_messages)
+
+    def snapshot(self) -> ConversationSentiment:
+        """
+        Build the conversation-level analysis from the running state
+
+        Returns:
+            ConversationSentiment equal to a full analyze_conversation run
+        """
+        total = self.total_messages
+        if not total:
+            raise ValueError("No user messages found in conversation")
+
+        average_score = self.score_sum / total
+        average_confidence = self.confidence_sum / total
+
+        overall_label = self.analyzer._label_for(average_score)
+
+        window_count = len(self._window)
+        window_score = self._window_sum / window_count
+        if total > window_count:
+            earlier_score = (self.score_sum - self._window_sum) / (total - window_count)
+            window_trend = _trend_for(window_score - earlier_score)
+        else:
+            window_trend = _INSUFFICIENT_TREND_DATA
+        ewma_trend = (_trend_for(self.ewma - average_score) if total >= 2
+                      else _INSUFFICIENT_TREND_DATA)
+
+        return ConversationSentiment(
+            overall_label=overall_label,
+            overall_score=average_score,
+            total_messages=total,
+            positive_count=self.positive_count,
+            negative_count=self.negative_count,
+            neutral_count=self.neutral_count,
+            average_confidence=average_confidence,
+            trend=(_describe_trend(self._prefix_sums) if self._prefix_stride == 1
+                   else _halves_trend(total, self._prefix_sum_at(total // 2), self.score_sum)),
+            message_sentiments=(self.message_sentiments.view()
+                                if isinstance(self.message_sentiments, MessageSentimentColumns)
+                                else list(self.message_sentiments)),
+            emotional_progression=list(self.emotional_progression),
+            window_size=self.window_size,
+            window_score=window_score,
+            window_trend=window_trend,
+            ewma_half_life=self.half_life,
+            ewma_score=self.ewma,
+            ewma_trend=ewma_trend,
+            label_transitions={f"{previous}->{label}": count
+                               for (previous, label), count in self.label_transitions.items()},
+            rolled_up_messages=self.rolled_up_messages
+        )
+
+    def _prefix_sum_at(self, position: int) -> float:
+        """Sum of the first `position` scores, interpolated between thinned samples"""
+        index, offset = divmod(position, self._prefix_stride)
+        low = self._prefix_sums[index]
+        if not offset:
+            return low
+        if index + 1 < len(self._prefix_sums):
+            high, span = self._prefix_sums[index + 1], self._prefix_stride
+        else:
+            high, span = self.score_sum, self._count - index * self._prefix_stride
+        return low + (high - low) * offset / span
+
+
+_INSUFFICIENT_TREND_DATA = "Insufficient data for trend analysis"
+
+# Prefix sums kept by a rolling ConversationAggregator for the half-split trend
+_PREFIX_SAMPLES = 1024
+
+
+def _describe_trend(prefix_sums: List[float]) -> str:
+    """
+    Compare the average score of the first and second half of a conversation
+
+    Args:
+        prefix_sums: Running score sums, starting with 0.0
+
+    Returns:
+        Trend description (Improving, Declining, or Stable)
+    """
+    count = len(prefix_sums) - 1
+    if count < 2:
+        return _INSUFFICIENT_TREND_DATA
+
+    # Split conversation in half
+    return _halves_trend(count, prefix_sums[count // 2], prefix_sums[count])
+
+
+def _halves_trend(count: int, first_half_sum: float, total_sum: float) -> str:
+    """
+    Compare the average score of the two halves of `count` messages
+
+    Args:
+        count: Number of messages (at least 2)
+        first_half_sum: Sum of the first count // 2 scores
+        total_sum: Sum of all scores
+
+    Returns:
+        Trend description (Improving, Declining, or Stable)
+    """
+    midpoint = count // 2
+    first_half_score = first_half_sum / midpoint
+    second_half_score = (total_sum - first_half_sum) / (count - midpoint)
+
+    return _trend_for(second_half_score - first_half_score)
+
+
+def _trend_for(difference: float) -> str:
+    """
+    Describe a change in average score
+
+    Args:
+        difference: Recent average score minus the reference average
+
+    Returns:
+        Trend description (Improving, Declining, or Stable)
+    """
+    threshold = 0.1
+
+    if difference > threshold:
+        return "Improving - Sentiment became more positive"
+    elif difference < -threshold:
+        return "Declining - Sentiment became more negative"
+    else:
+        return "Stable - Sentiment remained consistent"
+
+
+# Export compression: name -> (module providing open(), file suffix)
+EXPORT_COMPRESSION = {
+    'gzip': ('gzip', '.gz'),
+    'bz2': ('bz2', '.bz2'),
+    'xz': ('lzma', '.xz'),
+    'zstd': ('compression.zstd', '.zst'),  # Python 3.14+
+}
+
+
+def iter_result_records(sentiment_analysis: ConversationSentiment) -> Iterator[Dict]:
+    """
+    Yield a conversation analysis as flat records
+
+    The first record holds the aggregates; each further record is one
+    message sentiment with its position. Nothing is deep-copied.
+    """
+    yield {
+        'type': 'summary',
+        'overall_label': sentiment_analysis.overall_label,
+        'overall_score': sentiment_analysis.overall_score,
+        'total_messages': sentiment_analysis.total_messages,
+        'positive_count': sentiment_analysis.positive_count,
+        'negative_count': sentiment_analysis.negative_count,
+        'neutral_count': sentiment_analysis.neutral_count,
+        'average_confidence': sentiment_analysis.average_confidence,
+        'trend': sentiment_analysis.trend,
+        'window_size': sentiment_analysis.window_size,
+        'window_score': sentiment_analysis.window_score,
+        'window_trend': sentiment_analysis.window_trend,
+        'ewma_half_life': sentiment_analysis.ewma_half_life,
+        'ewma_score': sentiment_analysis.ewma_score,
+        'ewma_trend': sentiment_analysis.ewma_trend,
+        'label_transitions': sentiment_analysis.label_transitions,
+        'rolled_up_messages': sentiment_analysis.rolled_up_messages
+    }
+    for index, sentiment in enumerate(sentiment_analysis.message_sentiments):
+        yield {'type': 'message', 'index': index, **sentiment}
+
+
+def _open_export(filename: str, compression: Optional[str]) -> IO:
+    """Open an export file for text writing, compressed if requested or implied by its suffix"""
+    if compression is None:
+        compression = next(
+            (name for name, (_, suffix) in EXPORT_COMPRESSION.items() if filename.endswith(suffix)),
+            None
+        )
+    if compression is None:
+        return open(filename, 'w', encoding='utf-8')
+    if compression not in EXPORT_COMPRESSION:
+        raise ValueError(f"Unknown compression: {compression}")
+
+    module_name = EXPORT_COMPRESSION[compression][0]
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        raise ValueError(f"{compression} compression is not available in this Python") from None
+    return module.open(filename, 'wt', encoding='utf-8')
+
+
+def export_results(sentiment_analysis: ConversationSentiment,
+                   filename: Union[str, IO] = "sentiment_analysis.json",
+                   indent: Optional[int] = 2, lines: bool = False,
+                   compression: Optional[str] = None):
+    """
+    Export sentiment analysis results to JSON
+
+    Args:
+        sentiment_analysis: Conversation analysis to export
+        filename: Output path, or an open text file object
+        indent: JSON indentation; None writes compact JSON
+        lines: Write JSON Lines instead of one document: a summary record,
+            then one record per message sentiment
+        compression: 'gzip', 'bz2', 'xz' or 'zstd'; inferred from the
+            filename suffix (.gz, .bz2, .xz, .zst) when omitted
+    """
+    if isinstance(filename, str):
+        with _open_export(filename, compression) as f:
+            _write_results(sentiment_analysis, f, indent, lines)
+        print(f"Results exported to {filename}")
+    else:
+        _write_results(sentiment_analysis, filename, indent, lines)
+
 
-        # Split conversation in half
-        midpoint = len(sentiments) // 2
-        first_half_score = sum(s.score for s in sentiments[:midpoint]) / len(sentiments[:midpoint])
-        second_half_score = sum(s.score for s in sentiments[midpoint:]) / len(sentiments[midpoint:])
+def _write_results(sentiment_analysis: ConversationSentiment, f: IO,
+                   indent: Optional[int], lines: bool):
+    if lines:
+        for record in iter_result_records(sentiment_analysis):
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+        return
 
-        difference = second_half_score - first_half_score
-        threshold = 0.1
+    # A shallow field mapping serializes like to_dict() without asdict's deep copy
+    document = {field.name: getattr(sentiment_analysis, field.name)
+                for field in fields(sentiment_analysis)}
+    if indent is not None:
+        if isinstance(sentiment_analysis.message_sentiments, MessageSentimentColumns):
+            document['message_sentiments'] = list(sentiment_analysis.message_sentiments)
+        json.dump(document, f, indent=indent)
+        return
 
-        if difference > threshold:
-            return "Improving - Sentiment became more positive"
-        elif difference < -threshold:
-            return "Declining - Sentiment became more negative"
+    # Compact: encode list items one at a time with the C encoder
+    separators = (',', ':')
+    f.write('{')
+    for number, (name, value) in enumerate(document.items()):
+        f.write(',' if number else '')
+        f.write(json.dumps(name) + ':')
+        if isinstance(value, (list, MessageSentimentColumns)):
+            f.write('[')
+            for index, item in enumerate(value):
+                f.write(',' if index else '')
+                f.write(json.dumps(item, separators=separators))
+            f.write(']')
         else:
-            return "Stable - Sentiment remained consistent"
+            f.write(json.dumps(value, separators=separators))
+    f.write('}')
 
 
-def export_results(sentiment_analysis: ConversationSentiment, filename: str = "sentiment_analysis.json"):
-    """Export sentiment analysis results to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(sentiment_analysis.to_dict(), f, indent=2)
-    print(f"Results exported to {filename}")
+if __name__ == "__main__":
+    import sys
+    from sentiment_cli import main
+    sys.exit(main())
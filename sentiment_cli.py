@@ -0,0 +1,238 @@
+"""
+Command-Line Scoring Interface
+
+Non-interactive entry point for bulk sentiment scoring:
+
+    python -m sentiment_analyzer score [FILE ...] [--workers N] [--engine MODE]
+
+Reads JSON Lines from the given files (or stdin) and writes one JSON result
+per input line to stdout, in input order, as soon as each batch is scored.
+Each input line is one of:
+- a message: {"text": "..."} (or "content"), or a bare JSON string
+- a conversation: {"messages": [{"role": "user", "content": "..."}, ...]}
+An optional "id" key is copied to the output. Lines that cannot be scored
+produce {"line": N, "error": "..."}.
+
+Only one batch is held in memory at a time, so memory use is independent
+of the input size.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sentiment_analyzer import (
+    ConversationAggregator, EngineMode, MissingResourceError, SentimentAnalyzer
+)
+
+
+def iter_lines(paths: List[str]) -> Iterator[str]:
+    """Yield lines from each path in turn, '-' meaning stdin"""
+    for path in paths or ['-']:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield from f
+
+
+def parse_record(line: str) -> Dict:
+    """
+    Parse one input line into a message or conversation record
+
+    Args:
+        line: A JSON Lines record
+
+    Returns:
+        Dictionary with 'kind' ('message' or 'conversation'), the texts to
+        score under 'texts' and the optional 'id'
+
+    Raises:
+        ValueError: If the line is not a scorable record
+    """
+    data = json.loads(line)
+    if isinstance(data, str):
+        data = {'text': data}
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object or string")
+
+    if 'messages' in data:
+        messages = data['messages']
+        if not isinstance(messages, list):
+            raise ValueError("'messages' must be a list")
+        texts = [
+            msg['content'].strip() for msg in messages
+            if isinstance(msg, dict) and msg.get('role') == 'user'
+            and isinstance(msg.get('content'), str)
+        ]
+        texts = [text for text in texts if text]
+        if not texts:
+            raise ValueError("No user messages found in conversation")
+        return {'kind': 'conversation', 'texts': texts, 'id': data.get('id')}
+
+    text = data.get('text', data.get('content'))
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("Text cannot be empty")
+    return {'kind': 'message', 'texts': [text], 'id': data.get('id')}
+
+
+# Conversation result fields holding per-message detail
+_DETAIL_FIELDS = {'message_sentiments', 'emotional_progression'}
+
+
+def select_fields(result: Dict, fields: Optional[List[str]]) -> Dict:
+    """Keep only the requested top-level fields of a result"""
+    if not fields:
+        return result
+    return {key: result[key] for key in fields if key in result}
+
+
+class StreamScorer:
+    """Scores parsed records in bounded batches and writes JSON Lines"""
+
+    def __init__(self, analyzer: SentimentAnalyzer, out: TextIO, workers: int = 1,
+                 batch_size: int = 1000, fields: Optional[List[str]] = None):
+        """
+        Args:
+            analyzer: Analyzer used for every record
+            out: Text stream receiving one JSON result per input line
+            workers: Worker processes passed to analyze_batch
+            batch_size: Input lines scored together
+            fields: Top-level result fields to output (all if empty)
+        """
+        self.analyzer = analyzer
+        self.out = out
+        self.workers = workers
+        self.batch_size = batch_size
+        self.fields = fields
+        # Per-message detail is not collected when no selected field needs it
+        self._summary_only = bool(fields) and not set(fields) & _DETAIL_FIELDS
+        self.errors = 0
+
+    def run(self, lines: Iterable[str]) -> int:
+        """
+        Score every line and write the results
+
+        Returns:
+            Number of lines that produced an error record
+        """
+        batch: List[Tuple[int, object]] = []
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                batch.append((line_number, parse_record(line)))
+            except ValueError as e:
+                batch.append((line_number, e))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        return self.errors
+
+    def _flush(self, batch: List[Tuple[int, object]]):
+        """Score all texts of a batch in one analyze_batch call and write the results"""
+        texts = []
+        for _, record in batch:
+            if isinstance(record, dict):
+                texts.extend(record['texts'])
+
+        results = iter(self.analyzer.analyze_batch(texts, workers=self.workers))
+
+        for line_number, record in batch:
+            if not isinstance(record, dict):
+                self.errors += 1
+                output = {'line': line_number, 'error': str(record)}
+            elif record['kind'] == 'message':
+                output = select_fields(next(results).to_dict(), self.fields)
+            else:
+                aggregator = ConversationAggregator(self.analyzer,
+                                                    summary_only=self._summary_only)
+                for _ in record['texts']:
+                    aggregator.add_result(next(results))
+                output = select_fields(aggregator.snapshot().to_dict(), self.fields)
+
+            if isinstance(record, dict) and record['id'] is not None:
+                output = {'id': record['id'], **output}
+            self.out.write(json.dumps(output))
+            self.out.write('\n')
+
+        self.out.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for python -m sentiment_analyzer"""
+    parser = argparse.ArgumentParser(
+        prog='python -m sentiment_analyzer',
+        description='Sentiment analysis tools'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    score = commands.add_parser('score', help='score JSON Lines messages or conversations')
+    score.add_argument('files', nargs='*', help="input files ('-' or none for stdin)")
+    score.add_argument('--workers', type=int, default=1,
+                       help='worker processes (default: 1, in-process)')
+    score.add_argument('--engine', default=EngineMode.BOTH.value,
+                       choices=[mode.value for mode in EngineMode], help='sentiment engine mode')
+    score.add_argument('--vectorized', action='store_true',
+                       help='use the NumPy VADER engine')
+    score.add_argument('--fields', default='',
+                       help='comma-separated result fields to output (default: all)')
+    score.add_argument('--batch-size', type=int, default=1000,
+                       help='input lines scored per batch (default: 1000)')
+    score.add_argument('--cache-size', type=int, default=10000,
+                       help='statement cache entries (default: 10000)')
+    score.add_argument('--long-text-threshold', type=int, default=0,
+                       help='score texts longer than this many characters in chunks '
+                            '(default: 0, disabled)')
+    score.add_argument('--chunk-size', type=int, default=2000,
+                       help='maximum chunk length for long texts (default: 2000)')
+    score.add_argument('--chunk-details', action='store_true',
+                       help='include per-chunk scores for long texts')
+    score.add_argument('--lexicon-snapshot', default=None,
+                       help='memory-mapped lexicon snapshot (python -m lexicon_snapshot build)')
+    score.add_argument('--score-cache', default=None,
+                       help='SQLite file of scores kept across runs')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line interface and return the exit status"""
+    args = build_parser().parse_args(argv)
+
+    if args.batch_size < 1:
+        print("Error: --batch-size must be at least 1", file=sys.stderr)
+        return 2
+    if args.workers < 1:
+        print("Error: --workers must be at least 1", file=sys.stderr)
+        return 2
+
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+    try:
+        analyzer = SentimentAnalyzer(cache_size=args.cache_size, engine=args.engine,
+                                     vectorized=args.vectorized,
+                                     long_text_threshold=args.long_text_threshold,
+                                     chunk_size=args.chunk_size,
+                                     chunk_details=args.chunk_details,
+                                     lexicon_snapshot=args.lexicon_snapshot,
+                                     persistent_cache=args.score_cache)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    with analyzer:
+        try:
+            analyzer.prepare()
+        except MissingResourceError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        scorer = StreamScorer(analyzer, sys.stdout, workers=args.workers,
+                              batch_size=args.batch_size, fields=fields)
+        errors = scorer.run(iter_lines(args.files))
+
+    return 1 if errors else 0
@@ -0,0 +1,463 @@
+"""
+Asyncio HTTP Service
+Serves Chatbot and SentimentAnalyzer to many concurrent sessions
+
+Endpoints (JSON in, JSON out):
+- GET  /health                       liveness check
+- POST /analyze/statement            {"text": ...} -> statement sentiment (Tier 2)
+- POST /analyze/conversation         {"messages": [...]} -> conversation sentiment (Tier 1);
+                                     "summary_only": true omits the per-message detail
+- POST /chat                         {"session_id": ..., "message": ...} -> bot reply
+- GET  /chat/<session_id>/analysis   conversation sentiment of a chat session
+
+Chat histories are held by a SessionManager, so idle sessions expire and
+memory stays bounded; a session reloaded from the spill directory has its
+running sentiment rebuilt from its history on first access. With a
+ConversationLog every turn and its sentiment is appended to disk, and a
+restarted server resumes logged sessions on their next request.
+
+Scoring is CPU-bound, so it never runs on the event loop: it goes to a
+thread pool (workers=0) or to the analyzer's process pool (workers>0).
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8080] [--workers N]
+                     [--session-ttl SECONDS] [--max-sessions N] [--max-messages N]
+                     [--max-bytes N] [--spill-dir DIR] [--log FILE]
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from chatbot import Chatbot
+from conversation_log import ConversationLog
+from sentiment_analyzer import ConversationAggregator, SentimentAnalyzer, SentimentResult
+from session_manager import SessionManager
+
+MAX_BODY_SIZE = 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Error that is reported to the client with a status code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatSession:
+    """Chatbot plus its incrementally maintained conversation sentiment"""
+
+    def __init__(self, session_id: str, analyzer: SentimentAnalyzer,
+                 chatbot: Optional[Chatbot] = None):
+        self.session_id = session_id
+        self.chatbot = chatbot or Chatbot()
+        self.conversation = ConversationAggregator(analyzer)
+        # Turns of one session are processed in order
+        self.lock = asyncio.Lock()
+
+
+class SentimentServer:
+    """Minimal HTTP/1.1 JSON server built on asyncio streams"""
+
+    def __init__(self, analyzer: Optional[SentimentAnalyzer] = None, host: str = "127.0.0.1",
+                 port: int = 8080, workers: int = 0,
+                 session_manager: Optional[SessionManager] = None,
+                 log: Optional[ConversationLog] = None):
+        """
+        Args:
+            analyzer: Shared analyzer (a cached one is created if omitted)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            workers: Scoring processes; 0 scores on a thread pool in-process
+            session_manager: Holds the chat histories (unbounded if omitted);
+                its on_evict hook is replaced by the server's
+            log: Append-only log receiving every chat turn; sessions missing
+                from the manager are resumed from it
+        """
+        self.analyzer = analyzer or SentimentAnalyzer(cache_size=10000)
+        self.host = host
+        self.port = port
+        self.workers = workers
+        if session_manager is None:
+            session_manager = SessionManager()
+        self.session_manager = session_manager
+        self.session_manager.on_evict = self._on_session_evicted
+        self.log = log
+        # Logged sentiments of resumed sessions, consumed when their aggregate is rebuilt
+        self._logged_sentiments: Dict[str, Dict[int, Dict]] = {}
+        if log is not None:
+            self.session_manager.loader = self._load_logged_session
+        # Resident sessions with their running sentiment, in step with the manager
+        self.sessions: Dict[str, ChatSession] = {}
+        self._threads = ThreadPoolExecutor(max_workers=4) if workers <= 0 else None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._log_syncer: Optional[asyncio.Task] = None
+
+    async def start(self) -> int:
+        """Start listening and return the bound port"""
+        self.analyzer.prepare()
+        if self.workers > 0:
+            # Fork the scoring processes before any socket exists, so that
+            # children never hold copies of client connections open
+            await self.score(["warm up"])
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.log is not None:
+            self._log_syncer = asyncio.create_task(self._sync_log())
+        return self.port
+
+    async def serve_forever(self):
+        """Start the server and run until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and release the scoring pools"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._log_syncer is not None:
+            self._log_syncer.cancel()
+            self._log_syncer = None
+        if self._threads is not None:
+            self._threads.shutdown()
+        if self.log is not None:
+            self.log.close()
+        self.analyzer.close()
+
+    # SCORING
+
+    async def score(self, texts: List[str]) -> List[SentimentResult]:
+        """Score statements off the event loop"""
+        if self.workers > 0:
+            return await asyncio.wrap_future(self.analyzer.submit(texts, self.workers))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._threads, self.analyzer.analyze_batch, texts, 1)
+
+    # ROUTES
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Dict:
+        """Route a request to its handler and return the JSON response body"""
+        if path == "/health":
+            self._require(method, "GET")
+            return {"status": "ok", **self.session_manager.stats()}
+
+        if path == "/analyze/statement":
+            self._require(method, "POST")
+            return await self.analyze_statement(self._json(body))
+
+        if path == "/analyze/conversation":
+            self._require(method, "POST")
+            return await self.analyze_conversation(self._json(body))
+
+        if path == "/chat":
+            self._require(method, "POST")
+            return await self.chat(self._json(body))
+
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "chat" and parts[2] == "analysis":
+            self._require(method, "GET")
+            return await self.session_analysis(parts[1])
+
+        raise HTTPError(404, f"Unknown path: {path}")
+
+    async def analyze_statement(self, data: Dict) -> Dict:
+        """Tier 2: sentiment of a single statement"""
+        text = data.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "Text cannot be empty")
+        results = await self.score([text])
+        return results[0].to_dict()
+
+    async def analyze_conversation(self, data: Dict) -> Dict:
+        """Tier 1: sentiment of a whole conversation"""
+        messages = data.get("messages")
+        if not isinstance(messages, list):
+            raise HTTPError(400, "'messages' must be a list")
+
+        texts = [
+            msg["content"].strip() for msg in messages
+            if isinstance(msg, dict) and msg.get("role") == "user"
+            and isinstance(msg.get("content"), str)
+        ]
+        texts = [text for text in texts if text]
+        if not texts:
+            raise HTTPError(400, "No user messages found in conversation")
+
+        summary_only = data.get("summary_only", False)
+        if not isinstance(summary_only, bool):
+            raise HTTPError(400, "'summary_only' must be a boolean")
+        aggregator = ConversationAggregator(self.analyzer, summary_only=summary_only)
+        for result in await self.score(texts):
+            aggregator.add_result(result)
+        return aggregator.snapshot().to_dict()
+
+    async def chat(self, data: Dict) -> Dict:
+        """One chat turn: score the user message, then generate the bot reply"""
+        message = data.get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Message cannot be empty")
+        message = message.strip()
+
+        session_id = str(data.get("session_id") or uuid.uuid4().hex)
+        # Pinned until the reply is stored, so the caps cannot evict the
+        # session while its turn waits for scoring
+        self.session_manager.pin(session_id)
+        try:
+            session = await self._session(session_id)
+
+            async with session.lock:
+                self.session_manager.add_message(session_id, "user", message)
+                position = len(session.chatbot.get_history()) - 1
+                result = (await self.score([message]))[0]
+                session.conversation.add_result(result)
+                session.chatbot.record_sentiment(position, result.to_dict())
+
+                response = session.chatbot.generate_response(message, result.label.upper())
+                self.session_manager.add_message(session_id, "assistant", response)
+        finally:
+            self.session_manager.unpin(session_id)
+
+        return {
+            "session_id": session_id,
+            "response": response,
+            "sentiment": {"label": result.label, "score": result.score,
+                          "confidence": result.confidence},
+        }
+
+    async def session_analysis(self, session_id: str) -> Dict:
+        """Tier 1 analysis of a chat session from its running aggregate"""
+        session = await self._session(session_id, create=False)
+        if session is None:
+            raise HTTPError(404, f"Unknown session: {session_id}")
+        try:
+            return session.conversation.snapshot().to_dict()
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+
+    # SESSIONS
+
+    async def _session(self, session_id: str, create: bool = True) -> Optional[ChatSession]:
+        """
+        Return the resident session, creating or reloading it if needed
+
+        A chatbot the manager reloaded from disk has no running aggregate
+        yet; it is rebuilt from its logged sentiments, rescoring the user
+        messages that have none.
+        """
+        chatbot = self.session_manager.get(session_id, create=create)
+        if chatbot is None:
+            return None
+
+        session = self.sessions.get(session_id)
+        if session is not None and session.chatbot is chatbot:
+            return session
+
+        if self.log is not None and chatbot.log is None:
+            chatbot.attach_log(self.log, session_id)
+        session = self.sessions[session_id] = ChatSession(session_id, self.analyzer, chatbot)
+
+        logged = self._logged_sentiments.pop(session_id, {})
+        history = chatbot.get_history()
+        positions = [
+            position for position in history.user_positions() if history.content(position).strip()
+        ]
+        missing = [history.content(position) for position in positions if position not in logged]
+        if positions:
+            async with session.lock:
+                scored = iter(await self.score(missing)) if missing else iter(())
+                for position in positions:
+                    if position in logged:
+                        result = SentimentResult(**logged[position])
+                    else:
+                        result = next(scored)
+                    session.conversation.add_result(result)
+        return session
+
+    def _load_logged_session(self, session_id: str) -> Optional[Chatbot]:
+        loaded = self.log.load_session(session_id)
+        if loaded is None:
+            return None
+        chatbot, sentiments = loaded
+        self._logged_sentiments[session_id] = sentiments
+        return chatbot
+
+    async def _sync_log(self):
+        """Fsync the log every sync_interval, so the last turns of idle sessions are durable too"""
+        while True:
+            await asyncio.sleep(self.log.sync_interval)
+            self.log.sync()
+
+    def _on_session_evicted(self, session_id: str, chatbot: Chatbot):
+        session = self.sessions.get(session_id)
+        if session is not None and session.chatbot is chatbot:
+            del self.sessions[session_id]
+
+    @staticmethod
+    def _require(method: str, expected: str):
+        if method != expected:
+            raise HTTPError(405, f"Use {expected}")
+
+    @staticmethod
+    def _json(body: bytes) -> Dict:
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    # HTTP
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+
+                try:
+                    status, payload = 200, await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            self._write_response(writer, e.status, {"error": str(e)}, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, bytes, bool]]:
+        """Parse one request; None when the client closed the connection"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if length < 0 or length > MAX_BODY_SIZE:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target.split("?", 1)[0], body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict,
+                        keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SentimentBot HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="scoring processes (default: 0, thread pool in-process)")
+    parser.add_argument("--session-ttl", type=float, default=None,
+                        help="evict chat sessions idle for this many seconds")
+    parser.add_argument("--max-sessions", type=int, default=None,
+                        help="chat sessions held in memory")
+    parser.add_argument("--max-messages", type=int, default=None,
+                        help="chat messages held in memory across all sessions")
+    parser.add_argument("--max-bytes", type=int, default=None,
+                        help="chat message bytes held in memory across all sessions")
+    parser.add_argument("--spill-dir", default=None,
+                        help="save evicted sessions here and reload them on access")
+    parser.add_argument("--log", default=None,
+                        help="append-only conversation log; sessions in it are resumed")
+    parser.add_argument("--long-text-threshold", type=int, default=20000,
+                        help="score messages longer than this many characters in chunks "
+                             "(default: 20000, 0 disables)")
+    parser.add_argument("--chunk-size", type=int, default=2000,
+                        help="maximum chunk length for long messages (default: 2000)")
+    parser.add_argument("--lexicon-snapshot", default=None,
+                        help="memory-mapped lexicon snapshot shared by the scoring processes")
+    parser.add_argument("--score-cache", default=None,
+                        help="SQLite file of scores kept across restarts")
+    args = parser.parse_args(argv)
+
+    session_manager = SessionManager(
+        idle_ttl=args.session_ttl, max_sessions=args.max_sessions,
+        max_messages=args.max_messages, max_bytes=args.max_bytes, spill_dir=args.spill_dir
+    )
+    log = ConversationLog(args.log) if args.log else None
+    analyzer = SentimentAnalyzer(cache_size=10000, long_text_threshold=args.long_text_threshold,
+                                 chunk_size=args.chunk_size,
+                                 lexicon_snapshot=args.lexicon_snapshot,
+                                 persistent_cache=args.score_cache)
+    server = SentimentServer(analyzer, host=args.host, port=args.port, workers=args.workers,
+                             session_manager=session_manager, log=log)
+
+    async def run():
+        port = await server.start()
+        print(f"Serving on http://{args.host}:{port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Session Management
+Keeps many concurrent Chatbot instances within a bounded memory budget
+
+- Sessions are created and looked up by session ID
+- Idle sessions are evicted after a TTL; the least recently used sessions
+  are evicted when the session, message or byte caps are exceeded
+- Sessions with a turn in flight are pinned and never evicted; the caps
+  are enforced again once they are released
+- Evicted sessions can be spilled to disk and are reloaded transparently
+  on their next access; a loader hook can rebuild sessions from elsewhere,
+  e.g. a ConversationLog
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from chatbot import Chatbot
+
+
+class _SessionEntry:
+    """Chatbot plus its accounting data"""
+
+    __slots__ = ('chatbot', 'last_access', 'messages', 'bytes', 'pins')
+
+    def __init__(self, chatbot: Chatbot, now: float):
+        self.chatbot = chatbot
+        self.last_access = now
+        self.messages = 0
+        self.bytes = 0
+        self.pins = 0
+        self.recount()
+
+    def recount(self):
+        """Recompute message and byte totals from the chatbot history"""
+        history = self.chatbot.get_history()
+        self.messages = len(history)
+        self.bytes = sum(_message_bytes(msg) for msg in history)
+
+
+def _message_bytes(message: Dict) -> int:
+    """UTF-8 size of a message's content"""
+    return len(message.get('content', '').encode('utf-8'))
+
+
+class SessionManager:
+    """LRU/TTL-managed registry of Chatbot sessions"""
+
+    def __init__(self, idle_ttl: Optional[float] = None, max_sessions: Optional[int] = None,
+                 max_messages: Optional[int] = None, max_bytes: Optional[int] = None,
+                 spill_dir: Optional[str] = None,
+                 factory: Callable[[], Chatbot] = Chatbot,
+                 on_evict: Optional[Callable[[str, Chatbot], None]] = None,
+                 loader: Optional[Callable[[str], Optional[Chatbot]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the session registry
+
+        Args:
+            idle_ttl: Seconds without access after which a session is evicted
+            max_sessions: Maximum number of sessions held in memory
+            max_messages: Maximum number of messages across all sessions
+            max_bytes: Maximum UTF-8 size of message content across all sessions
+            spill_dir: Directory where evicted sessions are saved; without
+                it evicted sessions are discarded
+            factory: Creates the Chatbot for a new session
+            on_evict: Called with (session_id, chatbot) for every eviction
+            loader: Rebuilds a session that is neither resident nor spilled,
+                returning None if it is unknown
+            clock: Time source, in seconds
+        """
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.factory = factory
+        self.on_evict = on_evict
+        self.loader = loader
+        self.clock = clock
+
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_messages = 0
+        self.total_bytes = 0
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str, create: bool = True) -> Optional[Chatbot]:
+        """
+        Look up a session, reloading it from disk or creating it if needed
+
+        Args:
+            session_id: Session identifier
+            create: Create a new session when none exists
+
+        Returns:
+            The session's Chatbot, or None if it does not exist and create is False
+        """
+        with self._lock:
+            self.evict_idle()
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry.last_access = self.clock()
+                self._sessions.move_to_end(session_id)
+                return entry.chatbot
+
+            chatbot = self._reload(session_id)
+            if chatbot is None and self.loader is not None:
+                chatbot = self.loader(session_id)
+                if chatbot is not None:
+                    self.reloads += 1
+            if chatbot is None:
+                if not create:
+                    return None
+                chatbot = self.factory()
+
+            self._track(session_id, _SessionEntry(chatbot, self.clock()))
+            return chatbot
+
+    def add_message(self, session_id: str, role: str, content: str) -> Dict:
+        """
+        Add a message to a session and enforce the memory caps
+
+        Returns:
+            The stored message dictionary
+        """
+        with self._lock:
+            chatbot = self.get(session_id)
+            message = chatbot.add_message(role, content)
+
+            entry = self._sessions[session_id]
+            size = _message_bytes(message)
+            entry.messages += 1
+            entry.bytes += size
+            self.total_messages += 1
+            self.total_bytes += size
+
+            self._enforce_caps(keep=session_id)
+            return message
+
+    def pin(self, session_id: str) -> Chatbot:
+        """
+        Look up or create a session and keep it resident until unpinned
+
+        Pins nest; a pinned session is skipped by TTL and cap eviction, so
+        the caps may be exceeded while sessions are pinned.
+
+        Returns:
+            The session's Chatbot
+        """
+        with self._lock:
+            chatbot = self.get(session_id)
+            self._sessions[session_id].pins += 1
+            return chatbot
+
+    def unpin(self, session_id: str):
+        """Release one pin of a session and enforce the caps again"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or not entry.pins:
+                raise ValueError(f"Session is not pinned: {session_id}")
+            entry.pins -= 1
+            self._enforce_caps(keep=None)
+
+    def touch(self, session_id: str):
+        """Refresh accounting after a session's history was changed directly"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            self.total_messages -= entry.messages
+            self.total_bytes -= entry.bytes
+            entry.recount()
+            self.total_messages += entry.messages
+            self.total_bytes += entry.bytes
+            entry.last_access = self.clock()
+            self._sessions.move_to_end(session_id)
+            self._enforce_caps(keep=session_id)
+
+    def remove(self, session_id: str):
+        """Forget a session entirely, including any spilled copy"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._untrack(entry)
+            if self.spill_dir:
+                try:
+                    os.remove(self._spill_path(session_id))
+                except FileNotFoundError:
+                    pass
+
+    def evict_idle(self) -> List[str]:
+        """
+        Evict sessions that have not been accessed within idle_ttl
+
+        Returns:
+            IDs of the evicted sessions
+        """
+        if self.idle_ttl is None:
+            return []
+
+        evicted = []
+        with self._lock:
+            deadline = self.clock() - self.idle_ttl
+            for session_id, entry in list(self._sessions.items()):
+                if entry.last_access > deadline:
+                    break
+                if entry.pins:
+                    continue
+                self._evict(session_id)
+                evicted.append(session_id)
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Return session, memory and eviction counters"""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'messages': self.total_messages,
+                'bytes': self.total_bytes,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'reloads': self.reloads
+            }
+
+    def _track(self, session_id: str, entry: _SessionEntry):
+        self._sessions[session_id] = entry
+        self.total_messages += entry.messages
+        self.total_bytes += entry.bytes
+        self._enforce_caps(keep=session_id)
+
+    def _untrack(self, entry: _SessionEntry):
+        self.total_messages -= entry.messages
+        self.total_bytes -= entry.bytes
+
+    def _over_caps(self) -> bool:
+        return (
+            (self.max_sessions is not None and len(self._sessions) > self.max_sessions)
+            or (self.max_messages is not None and self.total_messages > self.max_messages)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        )
+
+    def _enforce_caps(self, keep: Optional[str]):
+        """Evict least recently used sessions, never the one in use or pinned, until within caps"""
+        while self._over_caps():
+            victim = next((sid for sid, entry in self._sessions.items()
+                           if sid != keep and not entry.pins), None)
+            if victim is None:
+                break
+            self._evict(victim)
+
+    def _evict(self, session_id: str):
+        entry = self._sessions.pop(session_id)
+        self._untrack(entry)
+        self.evictions += 1
+        if self.spill_dir:
+            self._spill(session_id, entry.chatbot)
+        if self.on_evict is not None:
+            self.on_evict(session_id, entry.chatbot)
+
+    def _spill_path(self, session_id: str) -> str:
+        digest = hashlib.sha1(str(session_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _spill(self, session_id: str, chatbot: Chatbot):
+        """Write a session to disk atomically"""
+        path = self._spill_path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'session_id': session_id, 'chatbot': chatbot.to_dict()}, f)
+        os.replace(tmp_path, path)
+        self.spills += 1
+
+    def _reload(self, session_id: str) -> Optional[Chatbot]:
+        """Load and delete a spilled session, if one exists"""
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        self.reloads += 1
+        return Chatbot.from_dict(data['chatbot'])
@@ -0,0 +1,84 @@
+"""
+Tests for the hot path benchmark suite
+Covers regression detection between results documents and the compare command
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.bench_suite import compare, main
+
+
+def results(**cases):
+    """Results document holding the given case metrics"""
+    return {"meta": {}, "results": cases}
+
+
+def metrics(p50_ms=1.0, throughput=1000.0, peak_kib=10.0):
+    return {"p50_ms": p50_ms, "throughput": throughput, "peak_kib": peak_kib}
+
+
+class TestCompare(unittest.TestCase):
+    """Test regression detection"""
+
+    def test_threshold(self):
+        """Only changes beyond the threshold in the worse direction are regressions"""
+        baseline = results(case=metrics())
+        self.assertEqual(compare(baseline, results(case=metrics(p50_ms=1.09))), [])
+        self.assertEqual(compare(baseline, results(case=metrics(p50_ms=1.5))),
+                         ["case: p50 latency worse by 50%"])
+        self.assertEqual(compare(baseline, results(case=metrics(throughput=800.0))),
+                         ["case: throughput worse by 20%"])
+        self.assertEqual(compare(baseline, results(case=metrics(peak_kib=20.0)), threshold=0.5),
+                         ["case: peak memory worse by 100%"])
+        self.assertEqual(compare(baseline, results(case=metrics(p50_ms=0.1, throughput=5000.0,
+                                                                peak_kib=1.0))), [])
+
+    def test_missing_cases(self):
+        """Cases missing from either side are not compared"""
+        baseline = results(old_only=metrics(), both=metrics())
+        current = results(new_only=metrics(p50_ms=100.0), both=metrics(p50_ms=2.0))
+        self.assertEqual(compare(baseline, current), ["both: p50 latency worse by 100%"])
+
+    def test_zero_or_missing_baseline_metric(self):
+        """Metrics without a usable baseline value are skipped"""
+        baseline = results(zero=metrics(p50_ms=0.0, peak_kib=0.0),
+                           partial={"throughput": 1000.0})
+        current = results(zero=metrics(p50_ms=5.0, peak_kib=50.0),
+                          partial=metrics(p50_ms=5.0, throughput=500.0))
+        self.assertEqual(compare(baseline, current), ["partial: throughput worse by 50%"])
+        self.assertEqual(compare(results(case=metrics()), results(case={"p50_ms": 1.0})), [])
+
+    def test_exit_status(self):
+        """The compare command exits with 1 on a regression and 0 otherwise"""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {}
+            for name, document in (("baseline", results(case=metrics())),
+                                   ("same", results(case=metrics())),
+                                   ("slower", results(case=metrics(p50_ms=3.0)))):
+                paths[name] = os.path.join(tmp, f"{name}.json")
+                with open(paths[name], "w") as f:
+                    json.dump(document, f)
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(main(["compare", paths["baseline"], paths["same"]]), 0)
+                self.assertEqual(main(["compare", paths["baseline"], paths["slower"]]), 1)
+                self.assertEqual(main(["compare", paths["baseline"], paths["slower"],
+                                       "--threshold", "3"]), 0)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "No regressions beyond 10%")
+        self.assertEqual(lines[1], "REGRESSION case: p50 latency worse by 200%")
+        self.assertEqual(lines[2], "No regressions beyond 300%")
+
+
+if __name__ == '__main__':
+    unittest.main()
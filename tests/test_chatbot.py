@@ -7,7 +7,7 @@ Date: 2025
 """
 
 import unittest
-from chatbot import Chatbot
+from chatbot import Chatbot, ConversationHistory, DEFAULT_TEMPLATES, ResponseEngine
 
 
 class TestChatbot(unittest.TestCase):
@@ -126,5 +126,144 @@ class TestChatbot(unittest.TestCase):
         self.assertEqual(msg['content'], long_text)
 
 
+class TestConversationHistory(unittest.TestCase):
+    """Test the compact history store"""
+
+    def test_dict_view(self):
+        """Messages read back as role/content/timestamp dicts"""
+        history = ConversationHistory()
+        history.add('user', 'Hello', timestamp_ns=1_700_000_000_123_456_000)
+        history.add('assistant', 'Hi')
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history[0]['role'], 'user')
+        self.assertEqual(history[-1]['content'], 'Hi')
+        self.assertTrue(history[0]['timestamp'].endswith('.123456'))
+        self.assertEqual([msg['role'] for msg in history], ['user', 'assistant'])
+        self.assertEqual(history[0:1], [history[0]])
+        with self.assertRaises(IndexError):
+            history[2]
+
+    def test_indexes(self):
+        """Role counts and user positions are maintained on insert"""
+        history = ConversationHistory()
+        self.assertIsNone(history.last_user_content())
+        for role, content in [('user', 'a'), ('assistant', 'b'), ('user', 'c')]:
+            history.add(role, content)
+        self.assertEqual(history.role_count('user'), 2)
+        self.assertEqual(history.role_count('assistant'), 1)
+        self.assertEqual(history.last_user_content(), 'c')
+        self.assertEqual(history.user_contents(), ['a', 'c'])
+
+    def test_unknown_roles_are_rejected(self):
+        """Only the known roles are stored; anything else raises ValueError"""
+        history = ConversationHistory()
+        history.add('system', 'setup')
+        self.assertEqual(history[0]['role'], 'system')
+        for role in ('bot', 'User', ''):
+            with self.assertRaises(ValueError):
+                history.add(role, 'text')
+        self.assertEqual(len(history), 1)
+
+    def test_round_trip(self):
+        """A history rebuilt from its dict view is equal to the original"""
+        chatbot = Chatbot()
+        chatbot.add_message('user', 'I love this')
+        chatbot.add_message('assistant', 'Great!')
+        restored = Chatbot.from_dict(chatbot.to_dict())
+        self.assertEqual(restored.get_history(), chatbot.get_history())
+        self.assertEqual(restored.get_history().timestamp_ns(0),
+                         chatbot.get_history().timestamp_ns(0))
+        self.assertEqual(restored.get_context(), 'I love this')
+
+    def test_rolling_history(self):
+        """A rolling history keeps the last messages and counts all of them"""
+        chatbot = Chatbot(max_history=4)
+        positions = [chatbot.get_history().add('user' if index % 2 == 0 else 'assistant',
+                                               f"message {index}")
+                     for index in range(11)]
+        history = chatbot.get_history()
+        self.assertEqual(positions, list(range(11)))
+        self.assertEqual([msg['content'] for msg in history],
+                         ['message 7', 'message 8', 'message 9', 'message 10'])
+        self.assertEqual(history.user_contents(), ['message 8', 'message 10'])
+        self.assertEqual(history.user_positions(), [8, 10])
+        self.assertEqual(history.content(9), 'message 9')
+        with self.assertRaises(IndexError):
+            history.content(6)
+        self.assertEqual(history.content(-1), 'message 10')
+        self.assertEqual(history.timestamp_ns(-4), history.timestamp_ns(7))
+        with self.assertRaises(IndexError):
+            history.content(-5)
+        self.assertEqual(history.rolled_up, 7)
+
+        summary = chatbot.get_summary()
+        self.assertEqual(summary['total_messages'], 11)
+        self.assertEqual(summary['user_messages'], 6)
+        self.assertEqual(summary['retained_messages'], 4)
+
+        restored = Chatbot.from_dict(chatbot.to_dict())
+        self.assertEqual(restored.get_history(), history)
+        self.assertEqual(restored.get_summary()['user_messages'], 6)
+        self.assertEqual(restored.get_history().add('user', 'next'), 11)
+
+
+class TestResponseEngine(unittest.TestCase):
+    """Test precompiled response selection"""
+
+    def setUp(self):
+        """Create an engine with the default tables"""
+        self.engine = ResponseEngine()
+
+    def test_categories_by_label(self):
+        """Keywords refine the category chosen for each sentiment label"""
+        self.assertEqual(self.engine.select_category("Can you fix it", "NEGATIVE"),
+                         'negative_support')
+        self.assertEqual(self.engine.select_category("It broke", "NEGATIVE"), 'negative_empathy')
+        self.assertEqual(self.engine.select_category("I love it", "POSITIVE"),
+                         'positive_celebration')
+        self.assertEqual(self.engine.select_category("Where is it?", "NEUTRAL"),
+                         'neutral_inquiry')
+        self.assertEqual(self.engine.select_category("hello there"), 'neutral_inquiry')
+        self.assertEqual(self.engine.select_category("so bad"), 'negative_empathy')
+        self.assertEqual(self.engine.select_category("ok"), 'default')
+
+    def test_whole_token_matching(self):
+        """Keywords no longer match inside other words"""
+        self.assertEqual(self.engine.select_category("this works"), 'default')
+        self.assertEqual(self.engine.select_category("I cannot", "NEGATIVE"), 'negative_empathy')
+        self.assertEqual(self.engine.select_category("I can't", "NEGATIVE"), 'negative_empathy')
+
+    def test_rule_order_wins(self):
+        """Earlier rules take priority regardless of token position"""
+        self.assertEqual(self.engine.select_category("great, hello"), 'neutral_inquiry')
+
+    def test_custom_rules_and_phrases(self):
+        """Pluggable tables support multi-word keywords"""
+        engine = ResponseEngine(
+            templates={**DEFAULT_TEMPLATES, 'refund': ["Let me start your refund."]},
+            rules={None: ([(['money back'], 'refund')], 'default')}
+        )
+        self.assertEqual(engine.respond("I want my money back!"), "Let me start your refund.")
+        self.assertEqual(engine.select_category("money"), 'default')
+        with self.assertRaises(ValueError):
+            ResponseEngine(rules={None: ([], 'missing')})
+
+    def test_contractions_and_hyphens(self):
+        """Contractions are whole words, while hyphenated words split into their parts"""
+        self.assertEqual(self.engine.select_category("What's going on", "NEUTRAL"),
+                         'neutral_acknowledge')
+        self.assertEqual(self.engine.select_category("hi-five this"), 'neutral_inquiry')
+        self.assertEqual(self.engine.select_category("high-five this"), 'default')
+        self.assertEqual(self.engine.select_category("I can't", "NEGATIVE"), 'negative_empathy')
+
+    def test_seeded_chatbots_repeat(self):
+        """Chatbots with the same seed give the same responses"""
+        first = [Chatbot(seed=7).generate_response('hello') for _ in range(5)]
+        second = [Chatbot(seed=7).generate_response('hello') for _ in range(5)]
+        self.assertEqual(first, second)
+        bot = Chatbot(seed=7)
+        self.assertEqual(len({bot.generate_response('hello') for _ in range(20)}), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
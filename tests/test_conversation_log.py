@@ -0,0 +1,105 @@
+"""
+Tests for the append-only conversation log
+Covers appending, session reload, clearing and torn-write recovery
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from chatbot import Chatbot
+from conversation_log import ConversationLog
+
+
+class TestConversationLog(unittest.TestCase):
+    """Test logging and resuming sessions"""
+
+    def setUp(self):
+        """Create a log file in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "chat.log")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_sessions(self):
+        """Messages and sentiments of every session survive a reopen"""
+        with ConversationLog(self.path, sync_every=2) as log:
+            for session_id in ("a", "b"):
+                chatbot = Chatbot()
+                chatbot.attach_log(log, session_id)
+                chatbot.add_message("user", f"hello from {session_id}")
+                chatbot.record_sentiment(0, {"label": "Neutral"})
+                chatbot.add_message("assistant", "Hi!")
+            original = chatbot.get_history()
+
+        with ConversationLog(self.path) as log:
+            self.assertEqual(sorted(log.session_ids()), ["a", "b"])
+            chatbot, sentiments = log.load_session("b")
+            self.assertIsNone(log.load_session("missing"))
+
+        self.assertEqual(chatbot.get_history(), original)
+        self.assertEqual(chatbot.get_history().user_contents(), ["hello from b"])
+        self.assertEqual(sentiments, {0: {"label": "Neutral"}})
+
+    def test_reads_see_unsynced_writes(self):
+        """A session can be reloaded while its records are still buffered"""
+        with ConversationLog(self.path, sync_every=1000, sync_interval=60) as log:
+            chatbot = Chatbot()
+            chatbot.attach_log(log, "a")
+            chatbot.add_message("user", "one")
+            self.assertEqual(len(log.load_session("a")[0].get_history()), 1)
+            chatbot.add_message("user", "two")
+            self.assertEqual(len(log.load_session("a")[0].get_history()), 2)
+
+    def test_records_survive_a_process_crash(self):
+        """Appended records reach the file before any fsync is due"""
+        script = (
+            "import os, sys\n"
+            "from conversation_log import ConversationLog\n"
+            "log = ConversationLog(sys.argv[1], sync_every=1000, sync_interval=60)\n"
+            "for n in range(5):\n"
+            "    log.append_message('a', 'user', str(n), n)\n"
+            "os._exit(1)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", script, self.path], cwd=root, check=False)
+
+        with ConversationLog(self.path) as log:
+            chatbot, _ = log.load_session("a")
+        self.assertEqual(chatbot.get_history().user_contents(), ["0", "1", "2", "3", "4"])
+
+    def test_clear_history_is_logged(self):
+        """Clearing a history resets it on reload"""
+        with ConversationLog(self.path) as log:
+            chatbot = Chatbot()
+            chatbot.attach_log(log, "a")
+            chatbot.add_message("user", "old")
+            chatbot.clear_history()
+            chatbot.add_message("user", "new")
+
+        with ConversationLog(self.path) as log:
+            chatbot, _ = log.load_session("a")
+        self.assertEqual(chatbot.get_history().user_contents(), ["new"])
+
+    def test_torn_last_record_is_dropped(self):
+        """A partial record from a crash is cut off before appending resumes"""
+        with ConversationLog(self.path) as log:
+            log.append_message("a", "user", "complete", 0)
+        with open(self.path, "ab") as f:
+            f.write(b'"a"\t{"role": "user", "cont')
+
+        with ConversationLog(self.path) as log:
+            log.append_message("a", "user", "after crash", 1)
+        with ConversationLog(self.path) as log:
+            chatbot, _ = log.load_session("a")
+        self.assertEqual(chatbot.get_history().user_contents(), ["complete", "after crash"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for fleet analytics
+Covers input formats, mergeable aggregates, worker shards and checkpoints
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fleet_analytics
+from chatbot import Chatbot
+from fleet_analytics import FleetAggregate, find_session_files, load_session, run_job
+from sentiment_analyzer import SentimentAnalyzer, export_results
+
+
+class TestFleetAnalytics(unittest.TestCase):
+    """Test map-reduce statistics over session files"""
+
+    def setUp(self):
+        """Write sessions in every supported format"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        analyzer = SentimentAnalyzer()
+
+        happy = analyzer.analyze_conversation([
+            {'role': 'user', 'content': 'I love this, it is great'},
+            {'role': 'user', 'content': 'Wonderful support'},
+        ])
+        export_results(happy, self._path('exports', 'happy.json'))
+        angry = analyzer.analyze_conversation([
+            {'role': 'user', 'content': 'This is terrible'},
+            {'role': 'user', 'content': 'I hate waiting'},
+        ])
+        export_results(angry, self._path('exports', 'angry.jsonl.gz'), lines=True)
+
+        with open(self._path('raw', 'list.json'), 'w') as f:
+            json.dump([{'role': 'user', 'content': 'It is broken and awful'},
+                       {'role': 'assistant', 'content': 'Sorry'}], f)
+        bot = Chatbot()
+        bot.add_message('user', 'thanks, that was helpful')
+        with open(self._path('raw', 'bot.json'), 'w') as f:
+            json.dump(bot.to_dict(), f)
+        with open(self._path('raw', 'broken.json'), 'w') as f:
+            f.write('{not json')
+        with open(self._path('raw', 'notes.txt'), 'w') as f:
+            f.write('ignored')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, *parts):
+        path = os.path.join(self.dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def test_find_and_load_formats(self):
+        """Directories are searched recursively for session files of any format"""
+        files = find_session_files([self.dir])
+        self.assertEqual(len(files), 5)
+        kinds = {os.path.basename(path): load_session(path)[0]
+                 for path in files if not path.endswith('broken.json')}
+        self.assertEqual(kinds, {'happy.json': 'analysis', 'angry.jsonl.gz': 'analysis',
+                                 'list.json': 'messages', 'bot.json': 'messages'})
+        kind, analysis = load_session(self._path('exports', 'angry.jsonl.gz'))
+        self.assertEqual(len(analysis['message_sentiments']), 2)
+
+    def test_report(self):
+        """Distributions, trends and worst sessions cover every readable session"""
+        report = run_job([self.dir], shard_size=2, top_k=2)
+        self.assertEqual(report['sessions'], 4)
+        self.assertEqual(report['messages'], 6)
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(report['session_labels'], {'Positive': 2, 'Negative': 2})
+        self.assertEqual(sum(report['message_labels'].values()), 6)
+        self.assertEqual(sum(report['session_score_histogram']), 4)
+        self.assertEqual(sum(report['message_score_histogram']), 6)
+        self.assertEqual(sum(report['trends']['trend'].values()), 4)
+        worst = report['worst_sessions']
+        self.assertEqual(len(worst), 2)
+        self.assertLessEqual(worst[0]['overall_score'], worst[1]['overall_score'])
+        self.assertTrue(all(entry['overall_score'] < 0 for entry in worst))
+
+    def test_rescore_matches_reuse(self):
+        """Rescoring exports gives the scores that were exported"""
+        exports = os.path.join(self.dir, 'exports')
+        self.assertEqual(run_job([exports], rescore=True)['session_labels'],
+                         run_job([exports])['session_labels'])
+
+    def test_partials_merge_in_any_order(self):
+        """Merging shard partials equals aggregating everything at once"""
+        analyzer = SentimentAnalyzer()
+        files = find_session_files([self.dir])
+        whole = fleet_analytics.analyze_shard(files, analyzer, top_k=3)
+        left = fleet_analytics.analyze_shard(files[3:], analyzer, top_k=3)
+        right = fleet_analytics.analyze_shard(files[:3], analyzer, top_k=3)
+        merged = FleetAggregate.from_dict(left.merge(right).to_dict())
+        self.assertEqual(merged.report(), whole.report())
+
+    def test_resume_from_checkpoint(self):
+        """An interrupted job continues where it stopped"""
+        checkpoint = os.path.join(self.dir, 'job.ckpt')
+        expected = run_job([self.dir], shard_size=2)
+
+        original = fleet_analytics.analyze_shard
+        calls = []
+
+        def interrupted(paths, *args, **kwargs):
+            calls.append(paths)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return original(paths, *args, **kwargs)
+
+        with mock.patch.object(fleet_analytics, 'analyze_shard', side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                run_job([self.dir], shard_size=2, checkpoint=checkpoint)
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f)['done'], [0])
+
+        with mock.patch.object(fleet_analytics, 'analyze_shard', side_effect=original) as shard:
+            self.assertEqual(run_job([self.dir], shard_size=2, checkpoint=checkpoint), expected)
+            self.assertEqual(shard.call_count, 2)
+
+        with self.assertRaises(ValueError):
+            run_job([self.dir], shard_size=3, checkpoint=checkpoint)
+
+    def test_checkpoint_invalidated_by_settings_and_inputs(self):
+        """Scoring settings, top_k and edited files all invalidate a checkpoint"""
+        checkpoint = os.path.join(self.dir, 'job.ckpt')
+        run_job([self.dir], shard_size=2, checkpoint=checkpoint)
+        run_job([self.dir], shard_size=2, checkpoint=checkpoint)
+
+        for changed in ({'rescore': True}, {'top_k': 3}, {'engine': 'vader'}):
+            with self.subTest(**changed):
+                with self.assertRaises(ValueError):
+                    run_job([self.dir], shard_size=2, checkpoint=checkpoint, **changed)
+
+        with open(self._path('raw', 'list.json'), 'a') as f:
+            f.write('\n')
+        with self.assertRaises(ValueError):
+            run_job([self.dir], shard_size=2, checkpoint=checkpoint)
+
+    def test_worker_processes(self):
+        """Shards mapped in worker processes reduce to the same report"""
+        parallel = run_job([self.dir], workers=2, shard_size=1)
+        serial = run_job([self.dir], shard_size=2)
+        # Shards finish in any order, so float sums may differ in the last bits
+        for key in ('average_session_score', 'average_confidence'):
+            self.assertAlmostEqual(parallel.pop(key), serial.pop(key))
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for analyzer instrumentation
+Covers histograms, runtime toggling, Prometheus output and profiling
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import pstats
+import threading
+import time
+import unittest
+
+from instrumentation import Histogram, Metrics
+from sentiment_analyzer import SentimentAnalyzer
+
+
+class TestHistogram(unittest.TestCase):
+    """Test bucket accounting"""
+
+    def test_cumulative_buckets(self):
+        """Buckets count observations at or below their bound"""
+        histogram = Histogram([1, 10, float('inf')])
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [2, 3, 4])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.to_dict()['buckets']['+Inf'], 4)
+
+
+class TestAnalyzerMetrics(unittest.TestCase):
+    """Test instrumentation of SentimentAnalyzer"""
+
+    def setUp(self):
+        """Create a cached analyzer with metrics enabled"""
+        self.analyzer = SentimentAnalyzer(cache_size=10, instrument=True)
+
+    def test_disabled_records_nothing(self):
+        """Metrics are off by default"""
+        analyzer = SentimentAnalyzer()
+        analyzer.analyze_statement("Great service")
+        snapshot = analyzer.metrics_snapshot()
+        self.assertFalse(snapshot['enabled'])
+        self.assertEqual(snapshot['counters'], {})
+        self.assertEqual(snapshot['stages'], {})
+
+    def test_stage_timings_and_counters(self):
+        """Statements and conversations record stages, calls and lengths"""
+        self.analyzer.analyze_statement("Great service")
+        self.analyzer.analyze_statement("Great service")
+        self.analyzer.analyze_conversation([
+            {'role': 'user', 'content': 'I love it'},
+            {'role': 'user', 'content': 'This is awful'},
+        ])
+        snapshot = self.analyzer.metrics_snapshot()
+
+        self.assertEqual(snapshot['counters']['analyze_statement_calls'], 2)
+        self.assertEqual(snapshot['counters']['analyze_conversation_messages'], 2)
+        for stage in ('vader', 'preprocess', 'textblob_sentiment', 'label', 'serialize'):
+            self.assertIn(stage, snapshot['stages'])
+        self.assertEqual(snapshot['stages']['vader']['count'], 3)
+        self.assertEqual(snapshot['message_length']['count'], 3)
+        self.assertEqual(snapshot['cache']['hits'], 1)
+
+    def test_runtime_toggle(self):
+        """Disabling keeps collected data and stops collecting"""
+        self.analyzer.analyze_statement("one")
+        self.analyzer.metrics.disable()
+        self.analyzer.analyze_statement("two")
+        self.assertEqual(self.analyzer.metrics.counters['analyze_statement_calls'], 1)
+        self.analyzer.metrics.reset()
+        self.assertEqual(self.analyzer.metrics.counters, {})
+
+    def test_prometheus_text(self):
+        """The text dump uses Prometheus exposition syntax"""
+        self.analyzer.analyze_statement("Great service")
+        text = self.analyzer.metrics_text()
+        self.assertIn('# TYPE sentimentbot_stage_seconds histogram', text)
+        self.assertIn('sentimentbot_stage_seconds_count{stage="vader"} 1', text)
+        self.assertIn('sentimentbot_events_total{event="analyze_statement_calls"} 1', text)
+        self.assertIn('sentimentbot_cache_misses 1', text)
+
+    def test_profile_sampling(self):
+        """Every Nth call runs under cProfile"""
+        metrics = Metrics(enabled=True, profile_every=2)
+        self.analyzer.metrics = metrics
+        for text in ("a b", "c d", "e f", "g h"):
+            self.analyzer.analyze_statement(text)
+        self.assertEqual(metrics.profiled_calls, 2)
+        self.assertIn('analyze_statement', metrics.profile_report())
+
+    def test_profile_calls_from_threads(self):
+        """Profiled calls from several threads are recorded without interleaving"""
+        metrics = Metrics(enabled=True, profile_every=1)
+
+        def work():
+            time.sleep(0.0005)
+            return sum(range(2000))
+
+        def run():
+            for _ in range(25):
+                metrics.profile_call(work)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(metrics.profiled_calls, 200)
+        calls = {function[2]: stats[:2]
+                 for function, stats in pstats.Stats(metrics.profiler).stats.items()}
+        # (primitive calls, total calls): overlapping calls would look recursive
+        self.assertEqual(calls['work'], (200, 200))
+
+
+if __name__ == '__main__':
+    unittest.main()
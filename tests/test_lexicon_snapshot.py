@@ -0,0 +1,78 @@
+"""
+Tests for binary lexicon snapshots
+Covers building, mapped lookups and score equality with the parsed lexicons
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import os
+import tempfile
+import unittest
+
+from lexicon_snapshot import LexiconSnapshot, build_from_installed, build_snapshot
+from sentiment_analyzer import SentimentAnalyzer
+
+
+class TestLexiconSnapshot(unittest.TestCase):
+    """Test the memory-mapped lexicon snapshot"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Compile the installed lexicons once"""
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'lexicons.bin')
+        build_from_installed(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_vader_lookups(self):
+        """The mapped lexicon behaves like NLTK's dict"""
+        snapshot = LexiconSnapshot(self.path)
+        lexicon = SentimentAnalyzer().vader_analyzer.lexicon
+        self.assertEqual(len(snapshot.vader), len(lexicon))
+        self.assertEqual(dict(snapshot.vader.items()), lexicon)
+        self.assertEqual(snapshot.vader['good'], lexicon['good'])
+        self.assertIn(':)', snapshot.vader)
+        self.assertNotIn('qwertyuiop', snapshot.vader)
+        self.assertIsNone(snapshot.vader.get('qwertyuiop'))
+        with self.assertRaises(KeyError):
+            snapshot.vader['qwertyuiop']
+
+    def test_scores_match_parsed_lexicons(self):
+        """Analyzers on the snapshot score exactly like analyzers on the parsed lexicons"""
+        texts = ["I love it!!", "This is NOT good :(", "really not bad", "terribly slow",
+                 "kind of ok", "The café was naïve 😀", "meh"]
+        plain = SentimentAnalyzer()
+        mapped = SentimentAnalyzer(lexicon_snapshot=self.path)
+        for text in texts:
+            self.assertEqual(mapped.analyze_statement(text), plain.analyze_statement(text))
+        with mapped:
+            self.assertEqual(mapped.analyze_batch(texts, workers=2),
+                             plain.analyze_batch(texts, workers=1))
+
+    def test_vader_only_snapshot(self):
+        """Without the pattern lexicon TextBlob falls back to its own"""
+        path = os.path.join(self.tmp.name, 'vader.bin')
+        build_snapshot(path, {'good': 1.9, 'bad': -2.5})
+        snapshot = LexiconSnapshot(path)
+        self.assertIsNone(snapshot.pattern)
+        with self.assertRaises(ValueError):
+            snapshot.pattern_sentiment()
+        analyzer = SentimentAnalyzer(lexicon_snapshot=path)
+        self.assertEqual(analyzer.analyze_statement("good").label, 'Positive')
+        self.assertEqual(analyzer.analyze_statement("great").vader_scores['compound'], 0.0)
+
+    def test_invalid_file_raises_error(self):
+        """Files that are not snapshots are rejected"""
+        path = os.path.join(self.tmp.name, 'other.bin')
+        with open(path, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        with self.assertRaises(ValueError):
+            LexiconSnapshot(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Tests for the multi-session load test
+Covers traffic mixes, synthesis, replay of recorded histories and the driver
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.load_test import (
+    InProcessTarget, SessionScript, TrafficMix, drive, load_recorded, parse_weights, synthesize
+)
+from sentiment_analyzer import SentimentAnalyzer
+from server import SentimentServer
+
+
+class TestTrafficMix(unittest.TestCase):
+    """Test weight parsing, mix validation and synthesis"""
+
+    def test_parse_weights(self):
+        """Weights parse from name=weight lists"""
+        self.assertEqual(parse_weights("short=0.7, medium=0.25,long=0.05,"),
+                         {"short": 0.7, "medium": 0.25, "long": 0.05})
+        self.assertEqual(parse_weights(""), {})
+        with self.assertRaises(ValueError):
+            parse_weights("short")
+        with self.assertRaises(ValueError):
+            parse_weights("short=many")
+
+    def test_mix_validation(self):
+        """Unknown classes, bad weights and bad turn ranges are rejected"""
+        TrafficMix({"short": 1}, {"neutral": 1}, (1, 1))
+        for kwargs in ({"lengths": {"huge": 1}},
+                       {"sentiment": {"angry": 1}},
+                       {"lengths": {"short": -1, "long": 2}},
+                       {"sentiment": {"positive": 0, "negative": 0}},
+                       {"turns": (0, 3)},
+                       {"turns": (5, 2)}):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    TrafficMix(**kwargs)
+
+    def test_synthesis_is_deterministic(self):
+        """The same seed gives the same scripts"""
+        mix = TrafficMix(turns=(2, 4))
+        scripts = synthesize(10, mix, seed=3)
+        self.assertEqual(scripts, synthesize(10, mix, seed=3))
+        self.assertNotEqual(scripts, synthesize(10, mix, seed=4))
+        self.assertEqual([script.session_id for script in scripts],
+                         [f"load-{index}" for index in range(10)])
+        self.assertTrue(all(2 <= len(script.messages) <= 4 for script in scripts))
+
+
+class TestLoadRecorded(unittest.TestCase):
+    """Test replay of recorded histories"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, relative, lines):
+        path = os.path.join(self.dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(lines)
+        return path
+
+    def test_conversation_files(self):
+        """Same-named files in different directories stay separate sessions"""
+        for folder, text in (("a", "I love it"), ("b", "This is awful")):
+            self._write(os.path.join(folder, "session.json"), json.dumps([
+                {"role": "user", "content": text},
+                {"role": "assistant", "content": "Thanks"},
+            ]))
+        self._write("records.jsonl", "\n".join(json.dumps(record) for record in [
+            {"session_id": "c1", "messages": [{"role": "user", "content": "hello"}]},
+            {"messages": [{"role": "user", "content": "bye"},
+                          {"role": "assistant", "content": "ok"}]},
+        ]) + "\n")
+
+        scripts = load_recorded([self.dir])
+        self.assertEqual(scripts, [
+            SessionScript("a/session.json", ["I love it"]),
+            SessionScript("b/session.json", ["This is awful"]),
+            SessionScript("c1", ["hello"]),
+            SessionScript("records.jsonl:2", ["bye"]),
+        ])
+
+    def test_message_records(self):
+        """Message records group by session_id, or by file without one"""
+        grouped = self._write("grouped.jsonl", "\n".join(json.dumps(record) for record in [
+            {"session_id": "x", "content": "one"},
+            {"session_id": "y", "text": "two"},
+            {"session_id": "x", "role": "assistant", "content": "skipped"},
+            {"session_id": "x", "content": "three"},
+        ]) + "\n")
+        plain = self._write(os.path.join("sub", "plain.jsonl"), '"first"\n\n{"text": "second"}\n')
+
+        self.assertEqual(load_recorded([grouped, plain]), [
+            SessionScript("x", ["one", "three"]),
+            SessionScript("y", ["two"]),
+            SessionScript("sub/plain.jsonl", ["first", "second"]),
+        ])
+        self.assertEqual(load_recorded([plain]),
+                         [SessionScript("plain.jsonl", ["first", "second"])])
+
+    def test_nothing_to_replay(self):
+        """Inputs without user messages are an error"""
+        empty = self._write("empty.json", json.dumps([{"role": "assistant", "content": "hi"}]))
+        with self.assertRaises(ValueError):
+            load_recorded([empty])
+        with self.assertRaises(ValueError):
+            load_recorded([os.path.join(self.dir, "missing")])
+
+
+class TestDrive(unittest.IsolatedAsyncioTestCase):
+    """Test the driver against an in-process server"""
+
+    async def test_turn_and_analysis_counts(self):
+        """Every message is a turn and every second turn posts an analysis"""
+        server = SentimentServer(SentimentAnalyzer(), port=0)
+        scripts = [
+            SessionScript("s1", ["I love this", "great", "thanks", "bye"]),
+            SessionScript("s2", ["This is awful", "still awful"]),
+            SessionScript("s3", ["hello", "ok", "fine", "good", "done"]),
+        ]
+        try:
+            report = await drive(InProcessTarget(server), scripts, concurrency=2,
+                                 analysis_every=2)
+        finally:
+            await server.close()
+
+        self.assertEqual(report["sessions"], 3)
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(report["turn_latency"]["count"], 11)
+        self.assertEqual(report["analysis_latency"]["count"], 5)
+        self.assertEqual(len(server.sessions["s3"].chatbot.get_history()), 10)
+
+        with self.assertRaises(ValueError):
+            await drive(InProcessTarget(server), scripts, concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the interactive interface
+Covers background scoring, precomputed conversation snapshots and the pipelined loop
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from main import ChatbotInterface, SentimentPipeline
+from sentiment_analyzer import ConversationAggregator, SentimentAnalyzer
+
+
+class TestSentimentPipeline(unittest.TestCase):
+    """Test background scoring of user messages"""
+
+    def setUp(self):
+        """Initialize analyzer and pipeline for each test"""
+        self.analyzer = SentimentAnalyzer()
+        self.pipeline = SentimentPipeline(ConversationAggregator(self.analyzer))
+
+    def tearDown(self):
+        self.pipeline.close()
+
+    def test_snapshot_matches_full_analysis(self):
+        """Messages are folded in submission order"""
+        messages = [
+            {'role': 'user', 'content': 'I love this'},
+            {'role': 'assistant', 'content': 'Great!'},
+            {'role': 'user', 'content': 'but the app is slow'},
+            {'role': 'user', 'content': 'terrible support'},
+        ]
+        futures = [self.pipeline.submit(message) for message in messages]
+        self.assertEqual(self.pipeline.snapshot(), self.analyzer.analyze_conversation(messages))
+        self.assertIsNone(futures[1].result())
+        self.assertEqual(futures[0].result().label, 'Positive')
+
+    def test_scoring_does_not_block_submit(self):
+        """submit() returns while the message is still being scored"""
+        release = threading.Event()
+        score = self.analyzer.analyze_statement
+
+        def slow_score(text):
+            release.wait(5)
+            return score(text)
+
+        with mock.patch.object(self.analyzer, 'analyze_statement', side_effect=slow_score):
+            future = self.pipeline.submit({'role': 'user', 'content': 'happy'})
+            self.assertFalse(future.done())
+            release.set()
+            self.assertEqual(self.pipeline.snapshot().total_messages, 1)
+
+    def test_snapshot_built_on_demand(self):
+        """The snapshot is built once per scored message, not after every message"""
+        with mock.patch.object(self.pipeline.conversation, 'snapshot',
+                               wraps=self.pipeline.conversation.snapshot) as snapshot:
+            for text in ['good', 'bad', 'fine']:
+                self.pipeline.submit({'role': 'user', 'content': text})
+            first = self.pipeline.snapshot()
+            self.assertIs(self.pipeline.snapshot(), first)
+            self.assertEqual(snapshot.call_count, 1)
+            self.pipeline.submit({'role': 'user', 'content': 'great'})
+            self.assertEqual(self.pipeline.snapshot().total_messages, 4)
+            self.assertEqual(snapshot.call_count, 2)
+
+    def test_empty_snapshot_raises_error(self):
+        """Without scored user messages there is nothing to report"""
+        with self.assertRaises(ValueError):
+            self.pipeline.snapshot()
+        self.pipeline.submit({'role': 'assistant', 'content': 'Hello'})
+        with self.assertRaises(ValueError):
+            self.pipeline.snapshot()
+
+
+class TestChatbotInterface(unittest.TestCase):
+    """Test the interactive loop in both modes"""
+
+    def run_session(self, lines, **kwargs):
+        """Run the loop over scripted input and return the printed output"""
+        interface = ChatbotInterface(**kwargs)
+        out = io.StringIO()
+        with mock.patch('builtins.input', side_effect=lines), redirect_stdout(out):
+            interface.run()
+        return interface, out.getvalue()
+
+    def test_pipelined_session(self):
+        """Replies print before their panel and the summary covers every message"""
+        lines = ['I love this', 'analysis', 'This is awful', 'quit']
+        interface, output = self.run_session(lines)
+        self.assertEqual(output.count('[TIER 2: Statement-Level Sentiment Analysis]'), 2)
+        self.assertLess(output.index('Bot:'), output.index('[TIER 2'))
+        self.assertIn('Total:    2', output)
+        self.assertEqual(interface.conversation.total_messages, 2)
+
+    def test_background_failures_are_reported(self):
+        """Unexpected scoring errors are printed, not lost in the callback"""
+        with mock.patch.object(SentimentAnalyzer, 'analyze_statement',
+                               side_effect=RuntimeError('engine crashed')):
+            _, output = self.run_session(['hello', 'quit'])
+        self.assertIn('Error analyzing statement: RuntimeError: engine crashed', output)
+
+    def test_modes_agree(self):
+        """Pipelined and synchronous sessions reach the same analysis"""
+        lines = ['great day', 'the bus was late', 'fine', 'quit']
+        pipelined, _ = self.run_session(list(lines))
+        synchronous, _ = self.run_session(list(lines), pipelined=False)
+        self.assertEqual(pipelined.conversation_snapshot(), synchronous.conversation_snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
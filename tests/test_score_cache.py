@@ -0,0 +1,122 @@
+"""
+Tests for the persistent score cache
+Covers bulk lookups, sharing between connections, compaction and analyzer warm restarts
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from score_cache import PersistentScoreCache, cache_key
+from sentiment_analyzer import SentimentAnalyzer
+
+
+class TestPersistentScoreCache(unittest.TestCase):
+    """Test the SQLite store"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'scores.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keys_normalize_whitespace_and_version(self):
+        """Whitespace does not change the key; the scoring version does"""
+        self.assertEqual(cache_key('v1', ' so  good\n'), cache_key('v1', 'so good'))
+        self.assertNotEqual(cache_key('v1', 'so good'), cache_key('v2', 'so good'))
+        self.assertNotEqual(cache_key('v1', 'so good'), cache_key('v1', 'So good'))
+
+    def test_bulk_lookup_across_connections(self):
+        """Committed records are visible to other connections in one query"""
+        keys = [cache_key('v', f"text {index}") for index in range(1200)]
+        with PersistentScoreCache(self.path, write_batch=10000) as writer:
+            writer.put_many((key, {'score': index}) for index, key in enumerate(keys))
+            self.assertEqual(writer.get(keys[5]), {'score': 5})
+            with PersistentScoreCache(self.path) as reader:
+                self.assertEqual(reader.get_many(keys), {})
+                writer.flush()
+                found = reader.get_many(keys + [cache_key('v', 'missing')])
+                self.assertEqual(len(found), 1200)
+                self.assertEqual(found[keys[1100]], {'score': 1100})
+                self.assertEqual(reader.info()['hits'], 1200)
+
+    def test_compaction_keeps_recently_used(self):
+        """The table stays within max_entries and keeps recently used rows"""
+        with PersistentScoreCache(self.path, max_entries=100, write_batch=1) as cache:
+            first = cache_key('v', 'first')
+            cache.put(first, {'score': 1})
+            for index in range(300):
+                cache.put(cache_key('v', str(index)), {'score': index})
+                if index % 50 == 0:
+                    self.assertIsNotNone(cache.get(first))
+            cache.compact(vacuum=True)
+            self.assertLessEqual(len(cache), 100)
+            self.assertIsNotNone(cache.get(first))
+            self.assertIsNone(cache.get(cache_key('v', '0')))
+            self.assertGreater(cache.info()['compactions'], 0)
+
+    def test_invalid_size_raises_error(self):
+        """max_entries must be positive"""
+        with self.assertRaises(ValueError):
+            PersistentScoreCache(self.path, max_entries=0)
+
+
+class TestAnalyzerPersistentCache(unittest.TestCase):
+    """Test warm restarts of SentimentAnalyzer"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'scores.db')
+        self.messages = [
+            {'role': 'user', 'content': 'I love this'},
+            {'role': 'assistant', 'content': 'Great!'},
+            {'role': 'user', 'content': 'but the app is slow'},
+            {'role': 'user', 'content': 'ok thanks'},
+        ]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_warm_restart_skips_scoring(self):
+        """A new analyzer on the same file reuses the stored scores"""
+        with SentimentAnalyzer(persistent_cache=self.path) as cold:
+            expected = cold.analyze_conversation(self.messages)
+        self.assertEqual(cold.persistent_cache.info()['writes'], 3)
+
+        warm = SentimentAnalyzer(persistent_cache=self.path)
+        with mock.patch.object(warm, '_score_statement', side_effect=AssertionError("rescored")):
+            self.assertEqual(warm.analyze_conversation(self.messages), expected)
+            result = warm.analyze_statement('  I love   this ')
+        self.assertEqual(result.text, '  I love   this ')
+        self.assertEqual(result.score, expected.message_sentiments[0]['score'])
+        self.assertEqual(warm.persistent_cache.info()['hits'], 4)
+
+    def test_long_text_chunks_are_not_stored(self):
+        """Chunks scored on the worker pool bypass the workers' caches"""
+        text = "\n\n".join(["I love this product. It works great."] * 12)
+        with SentimentAnalyzer(persistent_cache=self.path, long_text_threshold=200,
+                               chunk_size=100) as analyzer:
+            result = analyzer.analyze_long_text(text, workers=2)
+        self.assertGreater(result.chunk_count, 2)
+        with PersistentScoreCache(self.path) as cache:
+            self.assertEqual(len(cache), 0)
+
+    def test_settings_change_misses(self):
+        """Scores stored under other settings are not reused"""
+        with SentimentAnalyzer(persistent_cache=self.path) as analyzer:
+            analyzer.analyze_statement('ok thanks')
+        other = SentimentAnalyzer(persistent_cache=self.path, engine='vader')
+        other.analyze_statement('ok thanks')
+        self.assertEqual(other.persistent_cache.info()['hits'], 0)
+        other.threshold_positive = 0.5
+        self.assertNotEqual(other.scoring_version(),
+                            SentimentAnalyzer(engine='vader').scoring_version())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,8 +6,19 @@ Author: Assignment Solution
 Date: 2025
 """
 
+import gzip
+import io
+import json
+import os
+import tempfile
 import unittest
-from sentiment_analyzer import SentimentAnalyzer, SentimentLabel
+from unittest import mock
+
+from chatbot import Chatbot
+from sentiment_analyzer import (
+    ConversationAggregator, EngineMode, MessageSentimentColumns, MissingResourceError,
+    SentimentAnalyzer, SentimentLabel, SentimentResult, export_results, iter_text_chunks
+)
 
 
 class TestSentimentAnalyzer(unittest.TestCase):
@@ -165,6 +176,541 @@ class TestSentimentAnalyzer(unittest.TestCase):
         self.assertEqual(result1.score, result2.score)
 
 
+
+class TestConversationAggregator(unittest.TestCase):
+    """Test incremental conversation-level analysis"""
+
+    def setUp(self):
+        """Initialize analyzer for each test"""
+        self.analyzer = SentimentAnalyzer()
+        self.messages = [
+            {'role': 'user', 'content': 'Terrible start'},
+            {'role': 'assistant', 'content': 'Response'},
+            {'role': 'user', 'content': '   '},
+            {'role': 'user', 'content': 'Getting better'},
+            {'role': 'user', 'content': 'Excellent now!'},
+        ]
+
+    def test_matches_full_recompute(self):
+        """Tier 1: Incremental snapshot equals analyze_conversation"""
+        aggregator = ConversationAggregator(self.analyzer)
+        for msg in self.messages:
+            aggregator.add_message(msg)
+        expected = self.analyzer.analyze_conversation(self.messages)
+        self.assertEqual(aggregator.snapshot(), expected)
+
+    def test_snapshot_after_each_message(self):
+        """Tier 1: Snapshots stay consistent as messages arrive"""
+        aggregator = ConversationAggregator(self.analyzer)
+        for i, msg in enumerate(self.messages):
+            aggregator.add_message(msg)
+            if aggregator.total_messages:
+                expected = self.analyzer.analyze_conversation(self.messages[:i + 1])
+                self.assertEqual(aggregator.snapshot(), expected)
+
+    def test_ignores_non_user_messages(self):
+        """Tier 1: Assistant and blank messages are not scored"""
+        aggregator = ConversationAggregator(self.analyzer)
+        self.assertIsNone(aggregator.add_message({'role': 'assistant', 'content': 'Hi'}))
+        self.assertIsNone(aggregator.add_message({'role': 'user', 'content': ''}))
+        self.assertEqual(aggregator.total_messages, 0)
+
+    def test_empty_snapshot_raises_error(self):
+        """Tier 1: Snapshot without user messages is an error"""
+        with self.assertRaises(ValueError):
+            ConversationAggregator(self.analyzer).snapshot()
+
+    def feed(self, aggregator, scores):
+        for score in scores:
+            aggregator.add_result(SentimentResult(
+                text='x', label=self.analyzer._label_for(score), score=score,
+                confidence=abs(score), vader_scores={}
+            ))
+
+    def test_window_trend_sees_recent_drop(self):
+        """Tier 1: A recent drop shows in the window trend, not the halves"""
+        aggregator = ConversationAggregator(self.analyzer, window_size=5)
+        self.feed(aggregator, [0.5] * 495 + [-0.8] * 5)
+        analysis = aggregator.snapshot()
+        self.assertTrue(analysis.trend.startswith("Stable"))
+        self.assertTrue(analysis.window_trend.startswith("Declining"))
+        self.assertAlmostEqual(analysis.window_score, -0.8)
+        self.assertTrue(analysis.ewma_trend.startswith("Declining"))
+
+    def test_ewma_half_life(self):
+        """Tier 1: A score's weight halves after half_life messages"""
+        aggregator = ConversationAggregator(self.analyzer, half_life=2)
+        self.feed(aggregator, [1.0, 0.0, 0.0])
+        self.assertAlmostEqual(aggregator.ewma, 0.5)
+
+    def test_short_conversation_trends(self):
+        """Tier 1: Trends need earlier messages to compare against"""
+        aggregator = ConversationAggregator(self.analyzer, window_size=3)
+        self.feed(aggregator, [0.5])
+        analysis = aggregator.snapshot()
+        self.assertEqual(analysis.window_trend, "Insufficient data for trend analysis")
+        self.assertEqual(analysis.ewma_trend, "Insufficient data for trend analysis")
+        with self.assertRaises(ValueError):
+            ConversationAggregator(self.analyzer, window_size=0)
+
+
+class TestRollingAggregator(unittest.TestCase):
+    """Test bounded-memory aggregation of endless sessions"""
+
+    def setUp(self):
+        """Initialize analyzer and a conversation longer than the window"""
+        self.analyzer = SentimentAnalyzer()
+        texts = ['I love this', 'Terrible service', 'ok', 'Great job', 'awful again',
+                 'fine thanks', 'really happy now']
+        self.messages = [{'role': 'user', 'content': text} for text in texts * 3]
+
+    def test_aggregates_cover_whole_session(self):
+        """Rolling snapshots match full ones apart from the dropped detail"""
+        rolling = ConversationAggregator(self.analyzer, max_messages=5)
+        for message in self.messages:
+            rolling.add_message(message)
+        analysis = rolling.snapshot()
+        expected = self.analyzer.analyze_conversation(self.messages)
+        self.assertEqual(analysis.rolled_up_messages, 16)
+        self.assertEqual(analysis.message_sentiments, expected.message_sentiments[-5:])
+        self.assertEqual(analysis.emotional_progression, expected.emotional_progression[-5:])
+        for name in ('overall_score', 'total_messages', 'positive_count', 'trend',
+                     'window_trend', 'ewma_score', 'label_transitions'):
+            self.assertEqual(getattr(analysis, name), getattr(expected, name))
+        self.assertEqual(sum(expected.label_transitions.values()), 20)
+        self.assertEqual(expected.label_transitions['Positive->Negative'], 6)
+
+    def test_thinned_prefix_sums(self):
+        """Very long sessions keep a bounded number of prefix sums"""
+        rolling = ConversationAggregator(self.analyzer, max_messages=10)
+        full = ConversationAggregator(self.analyzer)
+        for index in range(5000):
+            score = 0.5 if index < 2600 else -0.5
+            result = SentimentResult('x', self.analyzer._label_for(score), score, 0.5, {})
+            rolling.add_result(result)
+            full.add_result(result)
+        self.assertLessEqual(len(rolling._prefix_sums), 1025)
+        self.assertEqual(rolling.snapshot().trend, full.snapshot().trend)
+        self.assertEqual(len(rolling.snapshot().message_sentiments), 10)
+
+    def test_analyze_conversation_continues_rollup(self):
+        """analyze_conversation can continue a rolled-up session"""
+        rolled_up = ConversationAggregator(self.analyzer, max_messages=3)
+        for message in self.messages[:14]:
+            rolled_up.add_message(message)
+        continued = self.analyzer.analyze_conversation(self.messages[14:], rolled_up=rolled_up)
+        expected = self.analyzer.analyze_conversation(self.messages)
+        self.assertEqual(rolled_up.total_messages, 14)
+        self.assertEqual(continued.total_messages, 21)
+        self.assertAlmostEqual(continued.overall_score, expected.overall_score)
+        self.assertEqual(continued.label_transitions, expected.label_transitions)
+        self.assertEqual(self.analyzer.analyze_conversation([], rolled_up=rolled_up).total_messages,
+                         14)
+
+    def test_rolled_history_matches_unrolled(self):
+        """A rolling chatbot's history analyzes like the whole session"""
+        rolled = Chatbot(max_history=5, rolled_up_sentiment=ConversationAggregator(
+            self.analyzer, max_messages=5))
+        full = Chatbot()
+        for message in self.messages:
+            for chatbot in (rolled, full):
+                chatbot.add_message('user', message['content'])
+                chatbot.add_message('assistant', 'Noted.')
+        history = rolled.get_history()
+        self.assertEqual(len(history), 5)
+
+        analysis = self.analyzer.analyze_conversation(history)
+        expected = self.analyzer.analyze_conversation(full.get_history())
+        self.assertEqual(analysis.rolled_up_messages, 16)
+        self.assertEqual(analysis.message_sentiments, expected.message_sentiments[-5:])
+        for name in ('overall_score', 'overall_label', 'total_messages', 'positive_count',
+                     'negative_count', 'neutral_count', 'average_confidence', 'trend',
+                     'window_trend', 'ewma_score', 'ewma_trend', 'label_transitions'):
+            self.assertEqual(getattr(analysis, name), getattr(expected, name), name)
+        self.assertEqual(self.analyzer.analyze_conversation(
+            history, rolled_up=history.rolled_up_sentiment), analysis)
+
+        rolled.clear_history()
+        self.assertEqual(rolled.get_history().rolled_up_sentiment.total_messages, 0)
+
+    def test_rolled_history_without_aggregate_raises_error(self):
+        """A rolled history never silently stands in for the whole session"""
+        chatbot = Chatbot(max_history=2)
+        for message in self.messages[:3]:
+            chatbot.add_message('user', message['content'])
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze_conversation(chatbot.get_history())
+
+    def test_invalid_settings_raise_error(self):
+        """The window must be positive and cannot be columnar"""
+        with self.assertRaises(ValueError):
+            ConversationAggregator(self.analyzer, max_messages=0)
+        with self.assertRaises(ValueError):
+            ConversationAggregator(self.analyzer, max_messages=5, columnar=True)
+
+
+class TestColumnarResults(unittest.TestCase):
+    """Test columnar and summary-only conversation results"""
+
+    def setUp(self):
+        """Initialize a conversation with a chunked long message"""
+        self.analyzer = SentimentAnalyzer(long_text_threshold=40, chunk_size=20)
+        self.messages = [
+            {'role': 'user', 'content': 'I love this'},
+            {'role': 'assistant', 'content': 'Great!'},
+            {'role': 'user', 'content': 'The delivery was awful. Support was kind. It is fine now.'},
+            {'role': 'user', 'content': 'ok'},
+        ]
+
+    def test_columns_match_dicts(self):
+        """Columnar results read and serialize exactly like the dictionaries"""
+        for engine in ('both', 'vader', 'textblob'):
+            self.analyzer.engine = EngineMode(engine)
+            expected = self.analyzer.analyze_conversation(self.messages)
+            columnar = self.analyzer.analyze_conversation(self.messages, columnar=True)
+            self.assertIsInstance(columnar.message_sentiments, MessageSentimentColumns)
+            self.assertEqual(columnar, expected)
+            self.assertEqual(columnar.to_dict(), expected.to_dict())
+            self.assertEqual(columnar.message_sentiments[-1], expected.message_sentiments[-1])
+            self.assertEqual(columnar.message_sentiments[1:], expected.message_sentiments[1:])
+            for options in ({'indent': 2}, {'indent': None}, {'lines': True}):
+                expected_out, columnar_out = io.StringIO(), io.StringIO()
+                export_results(expected, expected_out, **options)
+                export_results(columnar, columnar_out, **options)
+                self.assertEqual(columnar_out.getvalue(), expected_out.getvalue())
+
+    def test_snapshot_views_are_stable(self):
+        """A snapshot keeps its length while the aggregator grows"""
+        aggregator = ConversationAggregator(self.analyzer, columnar=True)
+        aggregator.add_message(self.messages[0])
+        first = aggregator.snapshot()
+        aggregator.add_message(self.messages[3])
+        self.assertEqual(len(first.message_sentiments), 1)
+        self.assertEqual(len(aggregator.snapshot().message_sentiments), 2)
+        self.assertEqual(first.message_sentiments.labels(), ['Positive'])
+        self.assertEqual(list(first.message_sentiments.column('score')), [first.overall_score])
+        with self.assertRaises(ValueError):
+            first.message_sentiments.append(self.analyzer.analyze_statement('more'))
+        with self.assertRaises(IndexError):
+            first.message_sentiments[1]
+
+    def test_summary_only(self):
+        """Summary-only results keep the aggregates and drop per-message detail"""
+        expected = self.analyzer.analyze_conversation(self.messages)
+        summary = self.analyzer.analyze_conversation(self.messages, summary_only=True)
+        self.assertEqual(summary.message_sentiments, [])
+        self.assertEqual(summary.emotional_progression, [])
+        self.assertEqual(summary.total_messages, 3)
+        self.assertEqual(summary.overall_score, expected.overall_score)
+        self.assertEqual(summary.trend, expected.trend)
+        self.assertEqual(summary.ewma_trend, expected.ewma_trend)
+
+
+class TestStatementCache(unittest.TestCase):
+    """Test the in-memory LRU statement cache"""
+
+    def test_cache_disabled_by_default(self):
+        """Without a cache size nothing is cached"""
+        analyzer = SentimentAnalyzer()
+        analyzer.analyze_statement("thanks")
+        analyzer.analyze_statement("thanks")
+        self.assertEqual(analyzer.cache_info()['size'], 0)
+        self.assertEqual(analyzer.cache_info()['hits'], 0)
+
+    def test_repeated_text_is_cache_hit(self):
+        """Identical text is scored once"""
+        analyzer = SentimentAnalyzer(cache_size=8)
+        first = analyzer.analyze_statement("not working")
+        second = analyzer.analyze_statement("not working")
+        self.assertIs(first, second)
+        info = analyzer.cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted first"""
+        analyzer = SentimentAnalyzer(cache_size=2)
+        analyzer.analyze_statement("ok")
+        analyzer.analyze_statement("thanks")
+        analyzer.analyze_statement("ok")
+        analyzer.analyze_statement("great")
+        info = analyzer.cache_info()
+        self.assertEqual(info['evictions'], 1)
+        self.assertEqual(info['size'], 2)
+        analyzer.analyze_statement("ok")
+        self.assertEqual(analyzer.cache_info()['hits'], 2)
+
+    def test_threshold_change_is_cache_miss(self):
+        """Changing analyzer settings does not reuse stale results"""
+        analyzer = SentimentAnalyzer(cache_size=8)
+        analyzer.analyze_statement("ok")
+        analyzer.threshold_positive = 0.5
+        analyzer.analyze_statement("ok")
+        self.assertEqual(analyzer.cache_info()['misses'], 2)
+
+    def test_conversation_uses_cache(self):
+        """Tier 1 analysis shares the statement cache"""
+        analyzer = SentimentAnalyzer(cache_size=8)
+        analyzer.analyze_statement('thanks')
+        messages = [
+            {'role': 'user', 'content': 'thanks'},
+            {'role': 'user', 'content': 'thanks'},
+        ]
+        analyzer.analyze_conversation(messages)
+        info = analyzer.cache_info()
+        self.assertEqual(info['hits'], 2)
+        self.assertEqual(info['misses'], 1)
+
+    def test_negative_cache_size_raises_error(self):
+        """Cache size must not be negative"""
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(cache_size=-1)
+
+
+class TestPreprocessing(unittest.TestCase):
+    """Test the shared preprocessing step"""
+
+    def test_tokens_score_like_textblob(self):
+        """Scoring the shared tokens matches TextBlob on the raw text"""
+        from textblob import TextBlob
+        analyzer = SentimentAnalyzer(engine='textblob')
+        for text in ["I can't believe it's NOT great!", "Hello there :)", "What's up? ok..."]:
+            result = analyzer.analyze_statement(text)
+            sentiment = TextBlob(text).sentiment
+            self.assertEqual(result.textblob_polarity, sentiment.polarity)
+            self.assertEqual(result.textblob_subjectivity, sentiment.subjectivity)
+
+    def test_preprocess_is_cached(self):
+        """A message is normalized and tokenized once"""
+        analyzer = SentimentAnalyzer(preprocess_cache_size=2)
+        prepared = analyzer.preprocess("Not BAD at all")
+        self.assertEqual(prepared.words, ["Not", "BAD", "at", "all"])
+        self.assertEqual(prepared.tokens, ["not", "bad", "at", "all"])
+        self.assertIs(analyzer.preprocess("Not BAD at all"), prepared)
+        analyzer.analyze_statement("Not BAD at all")
+        info = analyzer.preprocess_info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 2)
+
+        analyzer.analyze_batch(["one", "two", "three"], workers=1)
+        # Only the two short texts are cached; chunks bypass the caches
+        self.assertEqual(analyzer.preprocess_info()['size'], 2)
+        analyzer.clear_cache()
+        self.assertEqual(analyzer.preprocess_info()['size'], 0)
+
+    def test_negative_preprocess_cache_size_raises_error(self):
+        """Preprocessing cache size must not be negative"""
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(preprocess_cache_size=-1)
+
+
+class TestAnalyzeBatch(unittest.TestCase):
+    """Test multi-process batch analysis"""
+
+    def setUp(self):
+        """Initialize analyzer for each test"""
+        self.analyzer = SentimentAnalyzer()
+        self.texts = ["I love this!", "This is terrible", "The sky is blue", "Great job!"] * 5
+
+    def tearDown(self):
+        """Shut down any worker pool"""
+        self.analyzer.close()
+
+    def test_batch_matches_statements_in_order(self):
+        """Batch results equal single-statement results in input order"""
+        results = self.analyzer.analyze_batch(self.texts, workers=2, chunksize=3)
+        expected = [self.analyzer.analyze_statement(t) for t in self.texts]
+        self.assertEqual(results, expected)
+
+    def test_single_worker_runs_in_process(self):
+        """One worker scores without starting a pool"""
+        results = self.analyzer.analyze_batch(self.texts, workers=1)
+        self.assertEqual(len(results), len(self.texts))
+        self.assertIsNone(self.analyzer._executor)
+
+    def test_small_batches_reuse_the_pool(self):
+        """Batches of any size share the pool started for the worker count"""
+        self.analyzer.analyze_batch(self.texts, workers=4)
+        executor = self.analyzer._executor
+        for size in (3, 20, 2, 1):
+            results = self.analyzer.analyze_batch(self.texts[:size], workers=4)
+            self.assertEqual(len(results), size)
+            self.assertIs(self.analyzer._executor, executor)
+
+    def test_batch_empty_text_raises_error(self):
+        """Empty texts are rejected before any work is done"""
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze_batch(["fine", ""], workers=2)
+
+    def test_empty_batch(self):
+        """An empty batch returns no results"""
+        self.assertEqual(self.analyzer.analyze_batch([], workers=2), [])
+
+
+class TestLongText(unittest.TestCase):
+    """Test chunked analysis of long texts"""
+
+    def setUp(self):
+        """Build a text of many paragraphs"""
+        paragraphs = ["I love this product. It works great and support was helpful."] * 20
+        paragraphs += ["The update broke everything. This is terrible and slow."] * 10
+        self.text = "\n\n".join(paragraphs)
+
+    def test_chunks_respect_size_and_boundaries(self):
+        """Chunks stay within the size and end at paragraph or sentence breaks"""
+        spans = list(iter_text_chunks(self.text, 200))
+        self.assertTrue(all(end - start <= 200 for start, end in spans))
+        self.assertEqual("".join(self.text[start:end] for start, end in spans), self.text)
+        for start, end in spans[:-1]:
+            self.assertTrue(self.text[:end].rstrip().endswith('.'))
+        self.assertEqual(list(iter_text_chunks("x" * 10, 4)), [(0, 4), (4, 8), (8, 10)])
+        with self.assertRaises(ValueError):
+            list(iter_text_chunks("text", 0))
+
+    def test_long_text_is_length_weighted(self):
+        """Chunk scores are combined weighted by chunk length"""
+        analyzer = SentimentAnalyzer(long_text_threshold=500, chunk_size=200, chunk_details=True)
+        result = analyzer.analyze_statement(self.text)
+        self.assertGreater(result.chunk_count, 1)
+        self.assertEqual(len(result.chunks), result.chunk_count)
+        weights = [len(self.text[chunk['start']:chunk['end']].strip()) for chunk in result.chunks]
+        expected = sum(chunk['score'] * weight
+                       for chunk, weight in zip(result.chunks, weights)) / sum(weights)
+        self.assertAlmostEqual(result.score, expected)
+        self.assertEqual(result.label, 'Positive')
+        self.assertEqual(result.text, self.text)
+
+        with analyzer:
+            parallel = analyzer.analyze_long_text(self.text, workers=2)
+        self.assertAlmostEqual(parallel.score, result.score)
+
+    def test_threshold_and_details(self):
+        """Short texts are scored whole; details are optional"""
+        analyzer = SentimentAnalyzer(long_text_threshold=500, chunk_size=200)
+        self.assertEqual(type(analyzer.analyze_statement("I love it")), SentimentResult)
+        batch = analyzer.analyze_batch([self.text, "ok"], workers=1)
+        self.assertIsNone(batch[0].chunks)
+        self.assertGreater(batch[0].chunk_count, 1)
+        detailed = analyzer.analyze_long_text(self.text, details=True)
+        self.assertEqual(len(detailed.chunks), detailed.chunk_count)
+        # Only the two short texts are cached; chunks bypass the caches
+        self.assertEqual(analyzer.preprocess_info()['size'], 2)
+
+    def test_invalid_settings_raise_error(self):
+        """Chunk settings are validated"""
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(chunk_size=0)
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(long_text_threshold=100, chunk_size=200)
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer().analyze_long_text("  ")
+
+
+class TestEngineModes(unittest.TestCase):
+    """Test selectable sentiment engines"""
+
+    def test_vader_mode_skips_textblob(self):
+        """VADER-only mode matches the default label and score"""
+        text = "I love this! It's wonderful!"
+        fast = SentimentAnalyzer(engine='vader').analyze_statement(text)
+        full = SentimentAnalyzer().analyze_statement(text)
+        self.assertEqual(fast.label, full.label)
+        self.assertEqual(fast.score, full.score)
+        self.assertIsNone(fast.textblob_polarity)
+        self.assertIsNone(fast.textblob_subjectivity)
+
+    def test_textblob_mode_scores_by_polarity(self):
+        """TextBlob-only mode scores by polarity and skips VADER"""
+        result = SentimentAnalyzer(engine=EngineMode.TEXTBLOB).analyze_statement("This is terrible")
+        self.assertEqual(result.score, result.textblob_polarity)
+        self.assertEqual(result.label, SentimentLabel.NEGATIVE.value)
+        self.assertEqual(result.vader_scores, {})
+
+    def test_engine_is_part_of_cache_key(self):
+        """Results from different engines are cached separately"""
+        analyzer = SentimentAnalyzer(cache_size=8, engine='vader')
+        analyzer.analyze_statement("Great job!")
+        analyzer.engine = EngineMode.BOTH
+        result = analyzer.analyze_statement("Great job!")
+        self.assertIsNotNone(result.textblob_polarity)
+
+    def test_unknown_engine_raises_error(self):
+        """Unknown engine names are rejected"""
+        with self.assertRaises(ValueError):
+            SentimentAnalyzer(engine='bert')
+
+
+class TestLazyResources(unittest.TestCase):
+    """Test deferred resource loading"""
+
+    def test_construction_does_not_load_lexicon(self):
+        """Constructing an analyzer is free of lexicon loading"""
+        analyzer = SentimentAnalyzer()
+        self.assertIsNone(analyzer._vader_analyzer)
+
+    def test_prepare_loads_resources(self):
+        """prepare() loads the VADER lexicon up front"""
+        analyzer = SentimentAnalyzer().prepare()
+        self.assertIsNotNone(analyzer._vader_analyzer)
+
+    def test_textblob_mode_never_loads_vader(self):
+        """TextBlob-only analyzers do not need the VADER lexicon"""
+        analyzer = SentimentAnalyzer(engine='textblob').prepare()
+        analyzer.analyze_statement("Great job!")
+        self.assertIsNone(analyzer._vader_analyzer)
+
+    def test_missing_lexicon_raises_clear_error(self):
+        """Missing NLTK data raises MissingResourceError"""
+        with mock.patch('nltk.sentiment.SentimentIntensityAnalyzer', side_effect=LookupError):
+            with self.assertRaises(MissingResourceError) as context:
+                SentimentAnalyzer().prepare()
+        self.assertIn("nltk.downloader vader_lexicon", str(context.exception))
+
+
+class TestExportResults(unittest.TestCase):
+    """Test the export formats"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Analyze one conversation shared by all export tests"""
+        cls.analysis = SentimentAnalyzer().analyze_conversation([
+            {'role': 'user', 'content': 'I love this'},
+            {'role': 'assistant', 'content': 'Great!'},
+            {'role': 'user', 'content': 'But the delivery was awful'},
+        ])
+
+    def test_document_matches_to_dict(self):
+        """Indented and compact documents both decode to to_dict()"""
+        for indent in (2, None):
+            out = io.StringIO()
+            export_results(self.analysis, out, indent=indent)
+            self.assertEqual(json.loads(out.getvalue()), self.analysis.to_dict())
+        self.assertNotIn('\n', out.getvalue())
+
+    def test_json_lines(self):
+        """JSON Lines start with the summary, then one record per message"""
+        out = io.StringIO()
+        export_results(self.analysis, out, lines=True)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[0]['type'], 'summary')
+        self.assertEqual(records[0]['total_messages'], 2)
+        self.assertEqual([record['index'] for record in records[1:]], [0, 1])
+        self.assertEqual(records[2]['text'], 'But the delivery was awful')
+
+    def test_compression_from_suffix(self):
+        """A .gz filename selects gzip compression"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'analysis.jsonl.gz')
+            export_results(self.analysis, path, lines=True)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                self.assertEqual(len(f.readlines()), 3)
+
+    def test_unknown_compression(self):
+        """Unsupported compression is rejected"""
+        with self.assertRaises(ValueError):
+            export_results(self.analysis, 'unused.json', compression='rar')
+
+
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and special scenarios"""
 
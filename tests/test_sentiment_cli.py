@@ -0,0 +1,83 @@
+"""
+Tests for the streaming JSON Lines scoring interface
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import io
+import json
+import unittest
+from contextlib import redirect_stderr
+
+from sentiment_analyzer import SentimentAnalyzer
+from sentiment_cli import StreamScorer, main, parse_record
+
+
+class TestStreamScorer(unittest.TestCase):
+    """Test batch-by-batch scoring of JSON Lines input"""
+
+    def setUp(self):
+        """Initialize analyzer for each test"""
+        self.analyzer = SentimentAnalyzer()
+
+    def score(self, lines, **kwargs):
+        """Run the scorer over lines and return the decoded output records"""
+        out = io.StringIO()
+        errors = StreamScorer(self.analyzer, out, **kwargs).run(lines)
+        return errors, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_message_records(self):
+        """Messages produce statement results in input order"""
+        lines = ['{"id": "a", "text": "I love this!"}\n', '"This is terrible"\n']
+        errors, records = self.score(lines, batch_size=1)
+        self.assertEqual(errors, 0)
+        self.assertEqual(records[0]['id'], 'a')
+        self.assertEqual(records[0]['label'], 'Positive')
+        self.assertEqual(records[1]['label'], 'Negative')
+
+    def test_conversation_record(self):
+        """Conversations produce conversation-level results"""
+        conversation = {'messages': [
+            {'role': 'user', 'content': 'Terrible start'},
+            {'role': 'assistant', 'content': 'Response'},
+            {'role': 'user', 'content': 'Excellent now!'},
+        ]}
+        _, records = self.score([json.dumps(conversation)])
+        expected = self.analyzer.analyze_conversation(conversation['messages'])
+        self.assertEqual(records[0], json.loads(json.dumps(expected.to_dict())))
+
+    def test_invalid_lines_produce_errors(self):
+        """Bad lines are reported in place without stopping the stream"""
+        lines = ['not json\n', '{"text": ""}\n', '\n', '"fine"\n']
+        errors, records = self.score(lines)
+        self.assertEqual(errors, 2)
+        self.assertEqual([r.get('line') for r in records], [1, 2, None])
+        self.assertIn('label', records[2])
+
+    def test_field_selection(self):
+        """Only the requested fields are written"""
+        _, records = self.score(['"great"'], fields=['label', 'score'])
+        self.assertEqual(set(records[0]), {'label', 'score'})
+
+    def test_parse_record_rejects_non_objects(self):
+        """Numbers and lists are not scorable records"""
+        with self.assertRaises(ValueError):
+            parse_record('[1, 2]')
+
+
+class TestMain(unittest.TestCase):
+    """Test command line validation"""
+
+    def test_invalid_workers(self):
+        """A worker count below one is a usage error, not a traceback"""
+        for workers in ('0', '-2'):
+            err = io.StringIO()
+            with redirect_stderr(err):
+                status = main(['score', '--workers', workers])
+            self.assertEqual(status, 2)
+            self.assertIn('--workers must be at least 1', err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
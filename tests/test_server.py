@@ -0,0 +1,225 @@
+"""
+Tests for the asyncio HTTP service
+Uses a local client against a server bound to a free port
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+
+from conversation_log import ConversationLog
+from sentiment_analyzer import SentimentAnalyzer
+from server import SentimentServer
+from session_manager import SessionManager
+
+
+async def request(port, method, path, payload=None):
+    """Send one HTTP request and return (status, decoded JSON body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, json.loads(content)
+
+
+class TestSentimentServer(unittest.IsolatedAsyncioTestCase):
+    """Test the HTTP endpoints"""
+
+    async def asyncSetUp(self):
+        """Start a server on a free port"""
+        self.server = SentimentServer(SentimentAnalyzer(cache_size=100), port=0)
+        self.port = await self.server.start()
+
+    async def asyncTearDown(self):
+        """Stop the server"""
+        await self.server.close()
+
+    async def test_health(self):
+        """Health check responds"""
+        status, body = await request(self.port, "GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "ok")
+
+    async def test_analyze_statement(self):
+        """Tier 2: statement scoring endpoint"""
+        status, body = await request(self.port, "POST", "/analyze/statement",
+                                     {"text": "I love this!"})
+        self.assertEqual(status, 200)
+        self.assertEqual(body["label"], "Positive")
+
+    async def test_analyze_conversation(self):
+        """Tier 1: conversation scoring endpoint"""
+        messages = [
+            {"role": "user", "content": "Your service is terrible"},
+            {"role": "assistant", "content": "We apologize."},
+            {"role": "user", "content": "This is unacceptable!"},
+        ]
+        status, body = await request(self.port, "POST", "/analyze/conversation",
+                                     {"messages": messages})
+        self.assertEqual(status, 200)
+        self.assertEqual(body["overall_label"], "Negative")
+        self.assertEqual(body["total_messages"], 2)
+
+        status, summary = await request(self.port, "POST", "/analyze/conversation",
+                                        {"messages": messages, "summary_only": True})
+        self.assertEqual(status, 200)
+        self.assertEqual(summary["message_sentiments"], [])
+        self.assertEqual(summary["overall_score"], body["overall_score"])
+
+    async def test_chat_sessions(self):
+        """Chat turns keep per-session history and analysis"""
+        status, first = await request(self.port, "POST", "/chat", {"message": "This is awful"})
+        self.assertEqual(status, 200)
+        session_id = first["session_id"]
+        self.assertEqual(first["sentiment"]["label"], "Negative")
+
+        await request(self.port, "POST", "/chat",
+                      {"session_id": session_id, "message": "Now it is great!"})
+        status, analysis = await request(self.port, "GET", f"/chat/{session_id}/analysis")
+        self.assertEqual(status, 200)
+        self.assertEqual(analysis["total_messages"], 2)
+        self.assertEqual(len(self.server.sessions[session_id].chatbot.get_history()), 4)
+
+    async def test_concurrent_requests(self):
+        """Concurrent sessions are all served"""
+        replies = await asyncio.gather(*[
+            request(self.port, "POST", "/chat", {"session_id": f"s{i}", "message": "hello"})
+            for i in range(20)
+        ])
+        self.assertTrue(all(status == 200 for status, _ in replies))
+        self.assertEqual(len(self.server.sessions), 20)
+
+    async def test_errors(self):
+        """Bad input maps to client errors"""
+        status, _ = await request(self.port, "POST", "/analyze/statement", {"text": ""})
+        self.assertEqual(status, 400)
+        status, _ = await request(self.port, "GET", "/analyze/statement")
+        self.assertEqual(status, 405)
+        status, _ = await request(self.port, "GET", "/nope")
+        self.assertEqual(status, 404)
+        status, _ = await request(self.port, "GET", "/chat/unknown/analysis")
+        self.assertEqual(status, 404)
+
+
+class TestManagedSessions(unittest.IsolatedAsyncioTestCase):
+    """Test chat sessions under a bounded session manager"""
+
+    async def test_spilled_session_is_rebuilt(self):
+        """A session evicted to disk keeps its history and analysis"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            manager = SessionManager(max_sessions=1, spill_dir=spill_dir)
+            server = SentimentServer(SentimentAnalyzer(), port=0, session_manager=manager)
+            port = await server.start()
+            try:
+                await request(port, "POST", "/chat", {"session_id": "a", "message": "This is awful"})
+                await request(port, "POST", "/chat", {"session_id": "b", "message": "hello"})
+                self.assertNotIn("a", server.sessions)
+
+                status, analysis = await request(port, "GET", "/chat/a/analysis")
+                _, health = await request(port, "GET", "/health")
+            finally:
+                await server.close()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(analysis["total_messages"], 1)
+        self.assertEqual(analysis["overall_label"], "Negative")
+        self.assertEqual(health["sessions"], 1)
+        self.assertEqual(health["reloads"], 1)
+
+    async def test_sessions_in_flight_are_not_evicted(self):
+        """Concurrent turns over the session cap keep both sides of every turn"""
+        manager = SessionManager(max_sessions=1)
+        server = SentimentServer(SentimentAnalyzer(), port=0, session_manager=manager)
+        evicted = {}
+        on_evict = manager.on_evict
+
+        def record_eviction(session_id, chatbot):
+            evicted[session_id] = [msg["role"] for msg in chatbot.get_history()]
+            on_evict(session_id, chatbot)
+
+        manager.on_evict = record_eviction
+        port = await server.start()
+        try:
+            await asyncio.gather(*[
+                request(port, "POST", "/chat", {"session_id": sid, "message": "This is awful"})
+                for sid in ("a", "b", "c")
+            ])
+            resident = {sid: [msg["role"] for msg in manager.get(sid).get_history()]
+                        for sid in ("a", "b", "c") if sid in manager}
+        finally:
+            await server.close()
+
+        self.assertEqual(len(resident), 1)
+        self.assertEqual(set(evicted) | set(resident), {"a", "b", "c"})
+        for roles in list(evicted.values()) + list(resident.values()):
+            self.assertEqual(roles, ["user", "assistant"])
+
+    async def test_logged_sessions_resume_after_restart(self):
+        """A new server resumes a session from the conversation log"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/chat.log"
+            server = SentimentServer(SentimentAnalyzer(), port=0, log=ConversationLog(path))
+            port = await server.start()
+            try:
+                await request(port, "POST", "/chat", {"session_id": "a", "message": "This is awful"})
+            finally:
+                await server.close()
+
+            server = SentimentServer(SentimentAnalyzer(), port=0, log=ConversationLog(path))
+            port = await server.start()
+            try:
+                status, analysis = await request(port, "GET", "/chat/a/analysis")
+                await request(port, "POST", "/chat", {"session_id": "a", "message": "Thanks"})
+                history = server.sessions["a"].chatbot.get_history()
+            finally:
+                await server.close()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(analysis["overall_label"], "Negative")
+        self.assertEqual(len(history), 4)
+
+
+    async def test_idle_log_is_synced(self):
+        """Records of an idle session are fsync'ed within the sync interval"""
+        with tempfile.TemporaryDirectory() as tmp:
+            log = ConversationLog(f"{tmp}/chat.log", sync_every=1000, sync_interval=0.05)
+            server = SentimentServer(SentimentAnalyzer(), port=0, log=log)
+            port = await server.start()
+            try:
+                await request(port, "POST", "/chat", {"session_id": "a", "message": "hello"})
+                self.assertGreater(log._pending, 0)
+                await asyncio.sleep(0.2)
+                self.assertEqual(log._pending, 0)
+            finally:
+                await server.close()
+
+
+class TestProcessPoolServer(unittest.IsolatedAsyncioTestCase):
+    """Test scoring on worker processes"""
+
+    async def test_statement_on_worker_processes(self):
+        """Scoring through the process pool returns the same result"""
+        server = SentimentServer(SentimentAnalyzer(), port=0, workers=2)
+        port = await server.start()
+        try:
+            status, body = await request(port, "POST", "/analyze/statement",
+                                         {"text": "This is terrible"})
+        finally:
+            await server.close()
+        self.assertEqual(status, 200)
+        self.assertEqual(body["label"], "Negative")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for the session manager
+Covers lookup, TTL and LRU eviction, memory caps and disk spilling
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import os
+import tempfile
+import unittest
+
+from chatbot import Chatbot
+from session_manager import SessionManager
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionManager(unittest.TestCase):
+    """Test session lifecycle and eviction"""
+
+    def setUp(self):
+        """Create a manager with a controllable clock"""
+        self.clock = FakeClock()
+        self.evicted = []
+
+    def make_manager(self, **kwargs):
+        return SessionManager(clock=self.clock,
+                              on_evict=lambda sid, bot: self.evicted.append(sid), **kwargs)
+
+    def test_get_creates_and_reuses(self):
+        """The same session ID returns the same chatbot"""
+        manager = self.make_manager()
+        chatbot = manager.get("a")
+        self.assertIsInstance(chatbot, Chatbot)
+        self.assertIs(manager.get("a"), chatbot)
+        self.assertIsNone(manager.get("b", create=False))
+        self.assertEqual(len(manager), 1)
+
+    def test_idle_ttl_eviction(self):
+        """Sessions idle for longer than the TTL are evicted"""
+        manager = self.make_manager(idle_ttl=10)
+        manager.get("old")
+        self.clock.now = 5
+        manager.get("new")
+        self.clock.now = 12
+        self.assertEqual(manager.evict_idle(), ["old"])
+        self.assertNotIn("old", manager)
+        self.assertIn("new", manager)
+        self.assertEqual(self.evicted, ["old"])
+
+    def test_max_sessions_evicts_least_recently_used(self):
+        """The session cap evicts the least recently used session"""
+        manager = self.make_manager(max_sessions=2)
+        manager.get("a")
+        manager.get("b")
+        manager.get("a")
+        manager.get("c")
+        self.assertEqual(self.evicted, ["b"])
+        self.assertEqual(len(manager), 2)
+
+    def test_message_and_byte_caps(self):
+        """Global message and byte caps are enforced across sessions"""
+        manager = self.make_manager(max_messages=3)
+        manager.add_message("a", "user", "one")
+        manager.add_message("a", "user", "two")
+        manager.add_message("b", "user", "three")
+        manager.add_message("b", "user", "four")
+        self.assertEqual(self.evicted, ["a"])
+        self.assertEqual(manager.stats()['messages'], 2)
+
+        manager = self.make_manager(max_bytes=10)
+        manager.add_message("x", "user", "12345")
+        manager.add_message("y", "user", "123456")
+        self.assertIn("x", self.evicted)
+        self.assertEqual(manager.stats()['bytes'], 6)
+
+    def test_session_in_use_is_never_evicted(self):
+        """A single session over the cap keeps its history"""
+        manager = self.make_manager(max_messages=1)
+        manager.add_message("a", "user", "one")
+        manager.add_message("a", "user", "two")
+        self.assertIn("a", manager)
+        self.assertEqual(len(manager.get("a").get_history()), 2)
+
+    def test_pinned_sessions_are_not_evicted(self):
+        """Pinned sessions survive the caps and the TTL until released"""
+        manager = self.make_manager(max_sessions=1, idle_ttl=10)
+        chatbot = manager.pin("a")
+        manager.add_message("b", "user", "hello")
+        self.clock.now = 20
+        manager.evict_idle()
+        self.assertIs(manager.get("a", create=False), chatbot)
+        self.assertEqual(self.evicted, ["b"])
+
+        manager.get("c")
+        manager.unpin("a")
+        self.assertEqual(self.evicted, ["b", "a"])
+        self.assertEqual(len(manager), 1)
+        with self.assertRaises(ValueError):
+            manager.unpin("c")
+
+    def test_spill_and_reload(self):
+        """Evicted sessions are saved to disk and reloaded on access"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            manager = self.make_manager(max_sessions=1, spill_dir=spill_dir)
+            manager.add_message("a", "user", "I love this")
+            manager.add_message("a", "assistant", "Great!")
+            manager.get("b")
+            self.assertNotIn("a", manager)
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+
+            history = manager.get("a").get_history()
+            self.assertEqual([msg['content'] for msg in history], ["I love this", "Great!"])
+            self.assertEqual(manager.stats()['reloads'], 1)
+            self.assertEqual(manager.stats()['messages'], 2)
+
+            manager.remove("b")
+            manager.remove("a")
+            self.assertEqual(os.listdir(spill_dir), [])
+            self.assertEqual(len(manager), 0)
+
+    def test_touch_recounts_history(self):
+        """Direct history changes are picked up by touch"""
+        manager = self.make_manager()
+        manager.get("a").add_message("user", "hello")
+        manager.touch("a")
+        self.assertEqual(manager.stats()['messages'], 1)
+        self.assertEqual(manager.stats()['bytes'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
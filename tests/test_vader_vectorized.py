@@ -0,0 +1,114 @@
+"""
+Tests for the vectorized VADER scoring engine
+Checks agreement with NLTK's polarity_scores on a validation corpus
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import random
+import unittest
+
+from sentiment_analyzer import SentimentAnalyzer
+from vader_vectorized import SCORE_TOLERANCE, VectorizedVader
+
+
+VALIDATION_TEXTS = [
+    "I love this! It's wonderful!",
+    "This is terrible and disappointing",
+    "The weather is cloudy today",
+    "not bad at all",
+    "It is not very good",
+    "I am never so happy",
+    "never this good, really",
+    "at least it works",
+    "this is the least helpful answer",
+    "very least good",
+    "GREAT job but the food was BAD",
+    "The service was good, but the app is awful!!!",
+    "good good good not good",
+    "I don't like it",
+    "It isn't great, but it's okay",
+    "kind of good",
+    "The food here is the bomb",
+    "yeah right, that was helpful",
+    "Really?? Are you sure???",
+    "WOW!!!! AMAZING!!!!!",
+    ":) thanks",
+    "'hello' (world) \"quoted\" great!",
+    "barely acceptable and hardly useful",
+    "",
+    "   ",
+    "a",
+]
+
+
+class TestVectorizedVader(unittest.TestCase):
+    """Test the NumPy VADER engine against the reference analyzer"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Compile the lexicon once for all tests"""
+        cls.reference = SentimentAnalyzer().vader_analyzer
+        cls.engine = VectorizedVader(cls.reference)
+
+    def assertScoresClose(self, texts):
+        """Every text must match polarity_scores within SCORE_TOLERANCE"""
+        batch = self.engine.polarity_scores_batch(texts)
+        self.assertEqual(len(batch), len(texts))
+        for text, scores in zip(texts, batch):
+            expected = self.reference.polarity_scores(text)
+            for key, value in expected.items():
+                self.assertAlmostEqual(scores[key], value, delta=SCORE_TOLERANCE,
+                                       msg=f"{key} differs for {text!r}")
+
+    def test_validation_corpus(self):
+        """Hand-picked sentences exercise every VADER rule"""
+        self.assertScoresClose(VALIDATION_TEXTS)
+
+    def test_random_corpus(self):
+        """Random mixes of lexicon words, boosters, negations and punctuation"""
+        rng = random.Random(7)
+        lexicon = sorted(self.reference.lexicon)
+        extras = ["not", "never", "so", "this", "but", "least", "at", "very",
+                  "extremely", "barely", "isn't", "the", "it", "was", "kinda"]
+        texts = []
+        for _ in range(500):
+            words = []
+            for _ in range(rng.randint(0, 15)):
+                word = rng.choice(lexicon) if rng.random() < 0.4 else rng.choice(extras)
+                if rng.random() < 0.1:
+                    word = word.upper()
+                if rng.random() < 0.1:
+                    word += rng.choice(["!", "?", ".", ",", "!!", "'"])
+                words.append(word)
+            texts.append(" ".join(words))
+        self.assertScoresClose(texts)
+
+    def test_vocabulary_bounded_by_lexicon(self):
+        """Out-of-lexicon words share IDs, so the table does not grow with the input"""
+        engine = VectorizedVader(self.reference)
+        size = engine.vocabulary.size
+        texts = [f"the zorb{n} was GLIMP{n} and wasn't{n} good" for n in range(2000)]
+        self.assertScoresClose(texts[:50])
+        engine.polarity_scores_batch(texts)
+        self.assertEqual(engine.vocabulary.size, size)
+
+    def test_single_text(self):
+        """Single-text scoring matches batch scoring"""
+        text = "The support team was extremely helpful!"
+        self.assertEqual(self.engine.polarity_scores(text),
+                         self.engine.polarity_scores_batch([text])[0])
+
+    def test_vectorized_analyzer_matches_default(self):
+        """A vectorized analyzer produces the same conversation analysis"""
+        messages = [{'role': 'user', 'content': text} for text in VALIDATION_TEXTS]
+        expected = SentimentAnalyzer().analyze_conversation(messages)
+        actual = SentimentAnalyzer(vectorized=True).analyze_conversation(messages)
+        self.assertEqual(actual.emotional_progression, expected.emotional_progression)
+        self.assertAlmostEqual(actual.overall_score, expected.overall_score,
+                               delta=SCORE_TOLERANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,354 @@
+"""
+Vectorized VADER Scoring Engine
+
+Batch re-implementation of NLTK's SentimentIntensityAnalyzer.polarity_scores:
+- The VADER lexicon is compiled into integer token IDs and NumPy feature arrays
+- A batch of texts is tokenized once into flat ID arrays
+- Lexicon lookup, capitalization, booster, negation, "least" and "but"
+  adjustments and compound normalization run as array operations
+
+Texts that contain a multi-word idiom or booster ("kind of", "cut the
+mustard", ...) are rare and are delegated to the reference analyzer, so
+every text matches polarity_scores within SCORE_TOLERANCE.
+
+Author: Assignment Solution
+Date: 2025
+"""
+
+import re
+import string
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Maximum absolute difference from polarity_scores for any returned score
+SCORE_TOLERANCE = 1e-3
+
+# One lowercase word from every multi-word idiom or booster phrase; texts
+# containing any of them take the reference path
+_DELEGATE_WORDS = frozenset({
+    'shit', 'bomb', 'ass', 'yeah', 'mustard', 'kiss', 'mouth', 'enough', 'kind', 'sort'
+})
+
+# Words the negation, "least" and "but" rules test for
+_RULE_WORDS = frozenset({'never', 'so', 'this', 'least', 'at', 'very', 'but'})
+
+_PUNCTUATION = string.punctuation
+
+_ANY_PUNCTUATION = re.compile(f"[{re.escape(_PUNCTUATION)}]")
+
+
+class _Vocabulary:
+    """
+    Token ID table with per-token feature arrays that grow on demand
+
+    Only spellings of words the rules know about (lexicon words, boosters,
+    negations and the few words the rules test for) get their own ID. Any
+    other token scores as plain neutral text, so it shares one of four
+    unknown IDs that carry just its negation and ALL CAPS flags, and the
+    table stays bounded by the lexicon however many distinct words the
+    input holds.
+    """
+
+    _FEATURES = (
+        ('valence', np.float64),
+        ('in_lexicon', np.bool_),
+        ('booster', np.float64),
+        ('negation', np.bool_),
+        ('upper', np.bool_),
+        ('never', np.bool_),
+        ('so_this', np.bool_),
+        ('least', np.bool_),
+        ('at_very', np.bool_),
+        ('but', np.bool_),
+    )
+
+    def __init__(self, lexicon: Dict[str, float], constants):
+        self.lexicon = lexicon
+        self.constants = constants
+        self.ids: Dict[str, int] = {}
+        # Spellings of the _DELEGATE_WORDS seen so far
+        self.delegate_tokens = set()
+        self.size = 0
+        self.arrays = {name: np.zeros(1024, dtype=dtype) for name, dtype in self._FEATURES}
+
+        # Compile every word the rules know about up front
+        for word in list(lexicon) + list(constants.BOOSTER_DICT) + list(constants.NEGATE) \
+                + sorted(_RULE_WORDS | _DELEGATE_WORDS):
+            if word not in self.ids:
+                self._add(word)
+
+        # Shared IDs of out-of-lexicon tokens, keyed by (negation, upper)
+        self.unknown = {
+            (negation, upper): self._append({'negation': negation, 'upper': upper})
+            for negation in (False, True) for upper in (False, True)
+        }
+
+    def lookup(self, token: str) -> int:
+        """Return the ID of a token, adding known spellings to the table if unseen"""
+        token_id = self.ids.get(token)
+        if token_id is None:
+            lower = token.lower()
+            if lower in self.ids:
+                token_id = self._add(token)
+            else:
+                token_id = self.unknown["n't" in lower, token.isupper()]
+        return token_id
+
+    def _add(self, token: str) -> int:
+        lower = token.lower()
+        valence = self.lexicon.get(lower)
+        token_id = self._append({
+            'valence': valence or 0.0,
+            'in_lexicon': valence is not None,
+            'booster': self.constants.BOOSTER_DICT.get(lower, 0.0),
+            'negation': lower in self.constants.NEGATE or "n't" in lower,
+            'upper': token.isupper(),
+            'never': token == 'never',
+            'so_this': token == 'so' or token == 'this',
+            'least': lower == 'least',
+            'at_very': lower == 'at' or lower == 'very',
+            'but': lower == 'but',
+        })
+
+        if lower in _DELEGATE_WORDS:
+            self.delegate_tokens.add(token)
+
+        self.ids[token] = token_id
+        return token_id
+
+    def _append(self, values: Dict[str, object]) -> int:
+        """Add a row of features (unset ones are zero) and return its ID"""
+        token_id = self.size
+        if token_id == len(self.arrays['valence']):
+            for name in self.arrays:
+                self.arrays[name] = np.resize(self.arrays[name], 2 * token_id)
+        for name, array in self.arrays.items():
+            array[token_id] = values.get(name, 0)
+        self.size += 1
+        return token_id
+
+
+class VectorizedVader:
+    """Batch VADER scorer producing the same dictionaries as polarity_scores"""
+
+    def __init__(self, reference_analyzer):
+        """
+        Compile the lexicon of a reference analyzer
+
+        Args:
+            reference_analyzer: nltk SentimentIntensityAnalyzer whose lexicon
+                and constants are compiled, and which scores delegated texts
+        """
+        self.reference = reference_analyzer
+        self.constants = reference_analyzer.constants
+        self.vocabulary = _Vocabulary(reference_analyzer.lexicon, self.constants)
+        self._punc_list = frozenset(self.constants.PUNC_LIST)
+        self._remove_punctuation = self.constants.REGEX_REMOVE_PUNCTUATION
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """Score a single text"""
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, texts: Sequence[str],
+                              words: Optional[Sequence[List[str]]] = None
+                              ) -> List[Dict[str, float]]:
+        """
+        Score a batch of texts
+
+        Args:
+            texts: Texts to score
+            words: Each text already split on whitespace, if available
+
+        Returns:
+            One polarity_scores-style dictionary per text, in input order
+        """
+        results: List[Dict[str, float]] = [None] * len(texts)
+        token_ids: List[int] = []
+        segments: List[int] = []
+        vector_texts: List[int] = []
+
+        vocabulary = self.vocabulary
+        known_ids = vocabulary.ids.get
+        delegate_tokens = vocabulary.delegate_tokens
+        # Out-of-lexicon tokens of this batch only, so the cache never outlives it
+        batch_ids: Dict[str, int] = {}
+
+        def lookup(token: str) -> int:
+            token_id = batch_ids.get(token)
+            if token_id is None:
+                token_id = batch_ids[token] = vocabulary.lookup(token)
+            return token_id
+
+        for index, text in enumerate(texts):
+            tokens = self._tokenize(text.split() if words is None else words[index])
+            ids = [known_ids(token) for token in tokens]
+            if None in ids:
+                ids = [lookup(token) if token_id is None else token_id
+                       for token_id, token in zip(ids, tokens)]
+
+            if not delegate_tokens.isdisjoint(tokens):
+                results[index] = self.reference.polarity_scores(text)
+                continue
+
+            segments.extend([len(vector_texts)] * len(ids))
+            vector_texts.append(index)
+            token_ids.extend(ids)
+
+        if vector_texts:
+            scores = self._score_arrays(
+                np.array(token_ids, dtype=np.int64),
+                np.array(segments, dtype=np.int64),
+                [texts[index] for index in vector_texts]
+            )
+            for index, score in zip(vector_texts, scores):
+                results[index] = score
+
+        return results
+
+    def _tokenize(self, words: List[str]) -> List[str]:
+        """Turn whitespace-split words into nltk's SentiText.words_and_emoticons"""
+        strip = self._strip_punctuation
+        return [
+            strip(token) if token[0] in _PUNCTUATION or token[-1] in _PUNCTUATION else token
+            for token in words if len(token) > 1
+        ]
+
+    def _strip_punctuation(self, token: str) -> str:
+        """
+        Remove one leading or trailing PUNC_LIST entry from a word
+
+        SentiText only strips when the remaining word survives its
+        punctuation removal pass, i.e. is at least two characters long
+        and contains no punctuation itself.
+        """
+        stripped = token.lstrip(_PUNCTUATION)
+        if stripped != token:
+            if token[:len(token) - len(stripped)] in self._punc_list and len(stripped) > 1 \
+                    and not _ANY_PUNCTUATION.search(stripped):
+                return stripped
+            return token
+        stripped = token.rstrip(_PUNCTUATION)
+        if token[len(stripped):] in self._punc_list and len(stripped) > 1 \
+                and not _ANY_PUNCTUATION.search(stripped):
+            return stripped
+        return token
+
+    def _score_arrays(self, ids: np.ndarray, segments: np.ndarray,
+                      texts: List[str]) -> List[Dict[str, float]]:
+        """Apply the VADER rules to a flattened batch of token IDs"""
+        constants = self.constants
+        features = self.vocabulary.arrays
+        count = len(texts)
+
+        valence = features['valence']
+        in_lexicon = features['in_lexicon']
+        booster = features['booster']
+        negation = features['negation']
+        upper = features['upper']
+        never = features['never']
+        so_this = features['so_this']
+
+        starts = np.zeros(count, dtype=np.int64)
+        lengths = np.bincount(segments, minlength=count)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        positions = np.arange(len(ids)) - starts[segments]
+
+        # polarity_scores locates each token with list.index(), so a repeated
+        # token is scored in the context of its first occurrence in the text
+        keys = segments * self.vocabulary.size + ids
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        context = first[inverse]
+        contexts = context - starts[segments]
+
+        # Some but not all tokens ALL CAPS
+        upper_counts = np.bincount(segments, weights=upper[ids], minlength=count)
+        cap_diff = ((upper_counts > 0) & (upper_counts < lengths))[segments]
+
+        def previous(k: int):
+            valid = contexts >= k
+            return valid, ids[np.where(valid, context - k, 0)]
+
+        token = ids[context]
+        active = in_lexicon[token] & (booster[token] == 0)
+        values = np.where(active, valence[token], 0.0)
+        capped = active & upper[token] & cap_diff
+        values = np.where(capped, np.where(values > 0, values + constants.C_INCR,
+                                           values - constants.C_INCR), values)
+
+        _, prev1 = previous(1)
+        _, prev2 = previous(2)
+        for k, damping in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            valid, prev = previous(k)
+            applies = active & valid & ~in_lexicon[prev]
+
+            scalar = np.where(values < 0, -booster[prev], booster[prev])
+            boost_cap = (booster[prev] != 0) & upper[prev] & cap_diff
+            scalar = np.where(boost_cap, np.where(values > 0, scalar + constants.C_INCR,
+                                                  scalar - constants.C_INCR), scalar)
+            boosted = values + scalar * damping
+
+            if k == 1:
+                emphasis = np.zeros(len(ids), dtype=np.bool_)
+                factor = 1.0
+            elif k == 2:
+                emphasis = never[prev] & so_this[prev1]
+                factor = 1.5
+            else:
+                emphasis = (never[prev] & so_this[prev2]) | so_this[prev1]
+                factor = 1.25
+            boosted = np.where(emphasis, boosted * factor,
+                               np.where(negation[prev], boosted * constants.N_SCALAR, boosted))
+            values = np.where(applies, boosted, values)
+
+        valid1, prev1 = previous(1)
+        _, prev2 = previous(2)
+        least = valid1 & ~in_lexicon[prev1] & features['least'][prev1]
+        least &= (contexts == 1) | ~features['at_very'][prev2]
+        values = np.where(active & least, values * constants.N_SCALAR, values)
+
+        # "but" dampens everything before the first "but" and boosts everything after
+        no_but = np.iinfo(np.int64).max
+        but_positions = np.full(count, no_but, dtype=np.int64)
+        np.minimum.at(but_positions, segments, np.where(features['but'][ids], positions, no_but))
+        but_position = but_positions[segments]
+        has_but = but_position != no_but
+        values = np.where(has_but & (positions < but_position), values * 0.5, values)
+        values = np.where(has_but & (positions > but_position), values * 1.5, values)
+
+        sums = np.bincount(segments, weights=values, minlength=count)
+        pos_sums = np.bincount(segments, weights=np.where(values > 0, values + 1, 0.0),
+                               minlength=count)
+        neg_sums = np.bincount(segments, weights=np.where(values < 0, values - 1, 0.0),
+                               minlength=count)
+        neu_counts = np.bincount(segments, weights=values == 0, minlength=count)
+
+        # Punctuation emphasis
+        exclamations = np.minimum([text.count("!") for text in texts], 4)
+        questions = np.array([text.count("?") for text in texts])
+        amplifier = exclamations * 0.292 + np.where(
+            questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0)
+
+        sums = np.where(sums > 0, sums + amplifier, np.where(sums < 0, sums - amplifier, sums))
+        compound = sums / np.sqrt(sums * sums + 15)
+
+        pos_wins = pos_sums > np.abs(neg_sums)
+        neg_wins = pos_sums < np.abs(neg_sums)
+        pos_sums = np.where(pos_wins, pos_sums + amplifier, pos_sums)
+        neg_sums = np.where(neg_wins, neg_sums - amplifier, neg_sums)
+
+        total = pos_sums + np.abs(neg_sums) + neu_counts
+        total = np.where(lengths > 0, total, 1.0)
+        columns = zip(
+            np.abs(neg_sums / total).tolist(),
+            np.abs(neu_counts / total).tolist(),
+            np.abs(pos_sums / total).tolist(),
+            compound.tolist(),
+        )
+
+        # Python's round() on Python floats, exactly as polarity_scores does
+        return [
+            {"neg": round(neg, 3), "neu": round(neu, 3), "pos": round(pos, 3),
+             "compound": round(comp, 4)}
+            for neg, neu, pos, comp in columns
+        ]